@@ -0,0 +1,52 @@
+"""
+Benchmark id allocation and bulk completion.
+
+Compares the indexed TaskStore against the plain-list code path:
+
+    python -m benchmarks.bench_ids
+"""
+import time
+
+from src.store import TaskStore
+from src.tasks import add_task_with_category, bulk_complete_tasks, generate_unique_id
+
+
+def _timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def bench_store_inserts(n):
+    store = TaskStore()
+    return _timed(lambda: [add_task_with_category(store, f"Task {i}", "Work")
+                           for i in range(n)]), store
+
+
+def bench_list_inserts(n):
+    """The old allocation pattern: max() over the list for every insert."""
+    tasks = []
+
+    def run():
+        for i in range(n):
+            tasks.append({"id": generate_unique_id(tasks), "title": f"Task {i}"})
+
+    return _timed(run)
+
+
+def bench_bulk_complete(store, k):
+    ids = list(range(1, k + 1))
+    return _timed(lambda: bulk_complete_tasks(store, ids))
+
+
+def main():
+    elapsed, store = bench_store_inserts(100_000)
+    print(f"{'TaskStore: 100k inserts':<36}{elapsed:8.3f}s")
+    print(f"{'TaskStore: bulk complete 10k ids':<36}{bench_bulk_complete(store, 10_000):8.3f}s")
+    for n in (2_000, 10_000):
+        label = f"list: {n // 1000}k inserts (max scan)"
+        print(f"{label:<36}{bench_list_inserts(n):8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Measure memory per task for the dict, Task and TaskTable representations.
+
+    python -m benchmarks.bench_memory
+"""
+import gc
+import json
+import random
+import tracemalloc
+from datetime import datetime, timedelta
+
+from src.model import Task, TaskTable
+
+N = 100_000
+
+
+def make_json(n, seed=0):
+    """Serialized synthetic tasks, so every representation is parsed fresh."""
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    tasks = [
+        {
+            "id": i,
+            "title": f"Task {i}",
+            "description": f"Description of task {i}",
+            "priority": rng.choice(["High", "Medium", "Low"]),
+            "category": rng.choice(["Work", "Personal", "School", "Other"]),
+            "due_date": (start + timedelta(days=rng.randrange(365))).strftime("%Y-%m-%d"),
+            "completed": rng.random() < 0.3,
+            "created_at": (start + timedelta(seconds=rng.randrange(10**7))).strftime(
+                "%Y-%m-%d %H:%M:%S"),
+        }
+        for i in range(1, n + 1)
+    ]
+    return json.dumps(tasks)
+
+
+def bytes_per_task(build, text, n):
+    gc.collect()
+    tracemalloc.start()
+    result = build(text)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current / n
+
+
+def main():
+    text = make_json(N)
+    print(f"{'dict (json.loads)':<24}{bytes_per_task(json.loads, text, N):8.0f} bytes/task")
+    # The parsed dicts are transient here: only what stays alive is counted
+    to_tasks = lambda t: [Task.from_dict(task) for task in json.loads(t)]
+    to_table = lambda t: TaskTable.from_dicts(json.loads(t))
+    print(f"{'Task (__slots__)':<24}{bytes_per_task(to_tasks, text, N):8.0f} bytes/task")
+    print(f"{'TaskTable (columns)':<24}{bytes_per_task(to_table, text, N):8.0f} bytes/task")
+
+
+if __name__ == "__main__":
+    main()
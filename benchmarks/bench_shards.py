@@ -0,0 +1,152 @@
+"""
+Benchmark per-tenant shards: memory of the hot-shard LRU, write contention
+and fan-out queries.
+
+    python -m benchmarks.bench_shards --tenants 10000
+    python -m benchmarks.bench_shards --tenants 10000 --capacity 256 --writers 16
+
+Reports three things:
+
+- memory while touching every tenant in random order: it grows until
+  capacity shards are hot and then stays flat
+- journal writes per second and latency of a writer alone, of all writers
+  on one tenant's file (serialized by its lock, fsyncs shared by group
+  commit) and of each writer on its own tenant (independent locks)
+- the global overdue summary in-process versus over a process pool (which
+  only pays off with several CPUs)
+"""
+import argparse
+import gc
+import random
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from src import journal
+from src.shards import ShardManager, global_summary, shard_paths, tenant_path
+from src.tasks import save_tasks
+
+from .bench_tasks import generate_tasks
+
+
+def seed_tenants(root, tenants, tasks_per_tenant, seed=0):
+    """Write tasks_per_tenant synthetic tasks for each of tenants tenants."""
+    tasks = generate_tasks(tasks_per_tenant, seed)
+    fsync, journal.FSYNC = journal.FSYNC, False  # setup only, not measured
+    try:
+        for i in range(tenants):
+            save_tasks(tasks, tenant_path(f"tenant{i}", root))
+    finally:
+        journal.FSYNC = fsync
+
+
+def memory_profile(manager, tenants, checkpoints=4, seed=0):
+    """
+    Touch every tenant once in random order through the manager.
+
+    Returns:
+        list: (tenants touched, traced MiB) at evenly spaced checkpoints
+    """
+    order = [f"tenant{i}" for i in range(tenants)]
+    random.Random(seed).shuffle(order)
+    step = max(1, tenants // checkpoints)
+    samples = []
+    gc.collect()
+    tracemalloc.start()
+    try:
+        for n, tenant in enumerate(order, 1):
+            manager.store(tenant)
+            if n % step == 0 or n == tenants:
+                gc.collect()
+                samples.append((n, tracemalloc.get_traced_memory()[0] / 2**20))
+    finally:
+        tracemalloc.stop()
+    return samples
+
+
+def write_throughput(root, writers, writes, shared):
+    """
+    Append one-task journal records from several threads at once.
+
+    Args:
+        root (str): Directory of the shards
+        writers (int): Concurrent writer threads
+        writes (int): Appends per writer
+        shared (bool): All writers on one tenant instead of one tenant each
+
+    Returns:
+        dict: Appends per second and the p99 latency of one append
+    """
+    paths = [
+        tenant_path("shared" if shared else f"writer{writers}-{w}", root)
+        for w in range(writers)
+    ]
+    latencies = []
+    barrier = threading.Barrier(writers)
+
+    def write(w):
+        barrier.wait()
+        for i in range(writes):
+            record = journal.add_record({"id": w * writes + i + 1, "title": "Write"})
+            start = time.perf_counter()
+            journal.append_records(paths[w], [record])
+            latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=write, args=(w,)) for w in range(writers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "writes_per_second": writers * writes / seconds,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tenants", type=int, default=10_000)
+    parser.add_argument("--tasks", type=int, default=20, help="tasks per tenant")
+    parser.add_argument("--capacity", type=int, default=256, help="hot shards kept in memory")
+    parser.add_argument("--writers", type=int, default=8, help="concurrent writer threads")
+    parser.add_argument("--writes", type=int, default=200, help="appends per writer")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        start = time.perf_counter()
+        seed_tenants(root, args.tenants, args.tasks)
+        print(f"seeded {args.tenants} tenants x {args.tasks} tasks "
+              f"in {time.perf_counter() - start:.1f}s")
+
+        manager = ShardManager(root, capacity=args.capacity)
+        print(f"\nmemory, capacity {args.capacity} shards")
+        for touched, mib in memory_profile(manager, args.tenants):
+            print(f"  {touched:>8} tenants touched {mib:10.1f} MiB")
+        print(f"  {manager.stats()}")
+        manager.close()
+
+        print(f"\njournal appends, {args.writers} writers x {args.writes}")
+        for label, writers, shared in (
+            ("one writer alone", 1, False),
+            ("one shared tenant", args.writers, True),
+            ("one tenant each", args.writers, False),
+        ):
+            result = write_throughput(root, writers, args.writes, shared)
+            print(f"  {label:<20}{result['writes_per_second']:10.0f}/s"
+                  f"  p99 {result['p99_ms']:7.2f}ms")
+
+        paths = shard_paths(root)
+        print(f"\nglobal summary over {len(paths)} shards")
+        for label, workers in (("in-process", 1), ("process pool", None)):
+            start = time.perf_counter()
+            summary = global_summary(paths, workers=workers)
+            print(f"  {label:<20}{(time.perf_counter() - start) * 1000:10.0f}ms"
+                  f"  overdue {summary['overdue']}")
+
+
+if __name__ == "__main__":
+    main()
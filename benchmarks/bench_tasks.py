@@ -0,0 +1,355 @@
+"""
+Benchmark the core task operations at several scales and gate regressions.
+
+Times and memory-profiles the src/tasks.py entry points on synthetic task
+lists, writes the results as JSON to reports/benchmarks/ and compares them
+with a stored baseline:
+
+    python -m benchmarks.bench_tasks --sizes 1k,100k
+    python -m benchmarks.bench_tasks --sizes 1k,100k,1m --save-baseline
+    python -m benchmarks.bench_tasks --threshold 0.3   # exit 1 on >30% slowdowns
+
+Each report also records the cold import time of the app's modules, measured
+with ``python -X importtime`` in a fresh interpreter.
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from src.tasks import (
+    load_tasks, save_tasks, generate_unique_id, filter_tasks_by_priority,
+    filter_tasks_by_completion, filter_tasks_by_category, search_tasks,
+    get_overdue_tasks, get_due_soon_tasks, bulk_complete_tasks, get_task, query
+)
+from src import journal
+from src.binary import BINARY_SUFFIX
+from src.feed import FeedView
+
+REPORT_DIR = os.path.join("reports", "benchmarks")
+BASELINE_FILE = os.path.join(REPORT_DIR, "baseline.json")
+
+# Slowdown (relative to the baseline) that counts as a regression
+DEFAULT_THRESHOLD = 0.25
+# Timings below this are too noisy to gate on
+MIN_GATED_SECONDS = 0.001
+# Target wall time per case when choosing the number of repeats
+TARGET_SECONDS = 0.5
+
+# Modules whose cold import time is reported (src.app only where streamlit is installed)
+IMPORT_MODULES = ("src.tasks", "src.views", "src.testrunner", "src.app")
+
+_SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+_PRIORITIES = (("High", 20), ("Medium", 50), ("Low", 30))
+_CATEGORIES = (
+    ("Work", 35), ("Personal", 25), ("School", 15), ("Shopping", 10),
+    ("Health", 7), ("Finance", 5), ("Other", 3),
+)
+_WORDS = (
+    "report", "review", "call", "email", "buy", "plan", "fix", "write", "read",
+    "book", "meeting", "invoice", "groceries", "project", "exam", "doctor",
+)
+
+
+def parse_size(text):
+    """Parse "1k", "100k", "1m" or a plain number of tasks."""
+    text = text.strip().lower()
+    return _SIZES.get(text) or int(text)
+
+
+def generate_tasks(n, seed=0, today=None):
+    """
+    Build n synthetic tasks with realistic field distributions.
+
+    Priorities and categories are skewed (most tasks are Medium / Work), about
+    a third are completed, due dates spread from a month ago to three months
+    ahead (clustered around the next two weeks) and one in ten has none.
+
+    Args:
+        n (int): Number of tasks
+        seed (int): Random seed, so runs are comparable
+        today (datetime): Reference date for due dates
+
+    Returns:
+        list: Task dictionaries with ids 1..n
+    """
+    rng = random.Random(seed)
+    today = today or datetime.now()
+    priorities, priority_weights = zip(*_PRIORITIES)
+    categories, category_weights = zip(*_CATEGORIES)
+    tasks = []
+    for i in range(1, n + 1):
+        words = rng.sample(_WORDS, 3)
+        task = {
+            "id": i,
+            "title": f"{words[0].capitalize()} {words[1]} {i}",
+            "description": f"Remember to {words[2]} before the {words[1]}",
+            "priority": rng.choices(priorities, priority_weights)[0],
+            "category": rng.choices(categories, category_weights)[0],
+            "completed": rng.random() < 0.35,
+            "created_at": (today - timedelta(seconds=rng.randrange(90 * 86400))).strftime(
+                "%Y-%m-%d %H:%M:%S"),
+        }
+        if rng.random() < 0.9:
+            offset = min(90, max(-30, int(rng.gauss(7, 20))))
+            task["due_date"] = (today + timedelta(days=offset)).strftime("%Y-%m-%d")
+        tasks.append(task)
+    return tasks
+
+
+def _time(func, setup=None):
+    """Best wall time of func over enough repeats to fill TARGET_SECONDS."""
+    arg = setup() if setup else None
+    start = time.perf_counter()
+    func(arg)
+    best = time.perf_counter() - start
+    repeats = min(20, int(TARGET_SECONDS / max(best, 1e-9)))
+    for _ in range(repeats):
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        func(arg)
+        best = min(best, time.perf_counter() - start)
+    return best, repeats + 1
+
+
+def _peak_memory(func, setup=None):
+    """Peak bytes allocated during one call of func."""
+    arg = setup() if setup else None
+    tracemalloc.start()
+    try:
+        func(arg)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def cases(tasks, path):
+    """
+    The benchmarked operations as (name, setup, func) triples.
+
+    setup (or None) builds a fresh argument for every repeat, outside the timing.
+    """
+    ids = [task["id"] for task in tasks[::100]]
+    binary_path = os.path.splitext(path)[0] + BINARY_SUFFIX
+    views = []
+
+    def changed_view():
+        # One view for every repeat, a task changed behind its back each time
+        if not views:
+            views.append(FeedView(path))
+        record = journal.update_record(ids[0], {"description": "changed"}, {"description": ""})
+        journal.append_records(path, [record])
+        return views[0]
+
+    return [
+        ("load_tasks", None, lambda _: load_tasks(path)),
+        ("save_tasks", None, lambda _: save_tasks(tasks, path)),
+        ("get_task", None, lambda _: get_task(ids[-1], path)),
+        # The same file as a binary snapshot (written by the first case)
+        ("save_tasks_binary", None, lambda _: save_tasks(tasks, binary_path)),
+        ("load_tasks_binary", None, lambda _: load_tasks(binary_path)),
+        ("get_task_binary", None, lambda _: get_task(ids[-1], binary_path)),
+        ("generate_unique_id", None, lambda _: generate_unique_id(tasks)),
+        ("filter_tasks_by_priority", None, lambda _: filter_tasks_by_priority(tasks, "High")),
+        ("filter_tasks_by_completion", None, lambda _: filter_tasks_by_completion(tasks, False)),
+        ("filter_tasks_by_category", None, lambda _: filter_tasks_by_category(tasks, "Work")),
+        ("search_tasks", None, lambda _: search_tasks(tasks, "review")),
+        ("get_overdue_tasks", None, lambda _: get_overdue_tasks(tasks)),
+        ("get_due_soon_tasks", None, lambda _: get_due_soon_tasks(tasks)),
+        # Every list filter at once, top 50 by due date
+        ("query", None, lambda _: query(tasks, priority="High", category="Work", completed=False,
+                                        text="review", sort="due_date", limit=50)),
+        # Pulls one change from the feed into an indexed view (vs. load_tasks)
+        ("refresh_view", changed_view, lambda view: view.refresh()),
+        # Completes 1% of the tasks of a freshly loaded list (journal append)
+        ("bulk_complete_tasks", lambda: load_tasks(path),
+         lambda loaded: bulk_complete_tasks(loaded, ids)),
+    ]
+
+
+def import_time(module, top=5):
+    """
+    Measure the cold import of a module in a fresh interpreter.
+
+    Args:
+        module (str): Dotted module name
+        top (int): Number of slowest imported modules to report
+
+    Returns:
+        dict: Total microseconds, module count and the slowest imports, or
+            None if the module cannot be imported here
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=root, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return None
+    # Lines look like "import time:  self [us] | cumulative | imported package"
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) == 3 and fields[0].strip().isdigit():
+            entries.append((fields[2].strip(), int(fields[0]), int(fields[1])))
+    total = next((cumulative for name, _, cumulative in reversed(entries) if name == module), 0)
+    slowest = sorted(entries, key=lambda entry: -entry[1])[:top]
+    return {
+        "total_us": total,
+        "modules": len(entries),
+        "slowest": [{"module": name, "self_us": own} for name, own, _ in slowest],
+    }
+
+
+def import_times(modules=IMPORT_MODULES, stream=sys.stdout):
+    """Cold import time of each module that imports here, keyed by module name."""
+    times = {}
+    for module in modules:
+        result = import_time(module)
+        if result is None:
+            continue
+        times[module] = result
+        if stream is not None:
+            slowest = ", ".join(entry["module"] for entry in result["slowest"][:3])
+            stream.write(f"import {module:<22}{result['total_us'] / 1000:9.1f} ms"
+                         f"{result['modules']:>6} modules  (slowest: {slowest})\n")
+            stream.flush()
+    return times
+
+
+def run_benchmarks(sizes, memory=True, seed=0, stream=sys.stdout):
+    """
+    Run every case at every size.
+
+    Args:
+        sizes (iterable): Task counts
+        memory (bool): Also measure peak memory per case
+        seed (int): Seed for the synthetic tasks
+        stream (file): Progress output, None for silence
+
+    Returns:
+        dict: Report with metadata and one result per (case, size)
+    """
+    results = []
+    directory = tempfile.mkdtemp(prefix="bench-")
+    try:
+        for n in sizes:
+            tasks = generate_tasks(n, seed)
+            path = os.path.join(directory, f"tasks-{n}.json")
+            save_tasks(tasks, path)
+            for name, setup, func in cases(tasks, path):
+                seconds, repeats = _time(func, setup)
+                result = {"case": name, "size": n, "seconds": seconds, "repeats": repeats}
+                if memory:
+                    result["peak_bytes"] = _peak_memory(func, setup)
+                results.append(result)
+                if stream is not None:
+                    peak = result.get("peak_bytes")
+                    peak = f"{peak / 2**20:9.1f} MiB" if peak is not None else ""
+                    stream.write(f"{name:<28}{n:>9}{seconds * 1000:12.3f} ms{peak}\n")
+                    stream.flush()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "sizes": list(sizes),
+        "results": results,
+        "import_times": import_times(stream=stream),
+    }
+
+
+def compare(report, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Find cases that got slower than the baseline by more than threshold.
+
+    Args:
+        report (dict): Current run, from run_benchmarks
+        baseline (dict): Earlier run to compare against
+        threshold (float): Allowed relative slowdown, e.g. 0.25 for 25%
+
+    Returns:
+        list: (case, size, baseline seconds, current seconds) per regression
+    """
+    before = {(r["case"], r["size"]): r["seconds"] for r in baseline["results"]}
+    regressions = []
+    for result in report["results"]:
+        old = before.get((result["case"], result["size"]))
+        new = result["seconds"]
+        if old is None or max(old, new) < MIN_GATED_SECONDS:
+            continue
+        if new > old * (1 + threshold):
+            regressions.append((result["case"], result["size"], old, new))
+    return regressions
+
+
+def write_report(report, report_dir=REPORT_DIR):
+    """Write a report as a timestamped JSON file plus latest.json; returns the path."""
+    os.makedirs(report_dir, exist_ok=True)
+    stamp = report["timestamp"].replace(":", "").replace("-", "")
+    path = os.path.join(report_dir, f"bench-{stamp}.json")
+    for target in (path, os.path.join(report_dir, "latest.json")):
+        with open(target, "w") as f:
+            json.dump(report, f, indent=2)
+    return path
+
+
+def load_history(report_dir=REPORT_DIR):
+    """Return every stored report, oldest first."""
+    history = []
+    for path in sorted(glob.glob(os.path.join(report_dir, "bench-*.json"))):
+        with open(path, "r") as f:
+            history.append(json.load(f))
+    return history
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the core task operations")
+    parser.add_argument("--sizes", default="1k,100k",
+                        help="comma-separated task counts, e.g. 1k,100k,1m")
+    parser.add_argument("--no-memory", action="store_true", help="skip memory profiling")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="baseline report to compare with")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="relative slowdown that fails the run")
+    args = parser.parse_args(argv)
+
+    sizes = [parse_size(size) for size in args.sizes.split(",")]
+    report = run_benchmarks(sizes, memory=not args.no_memory)
+    print(f"Report written to {write_report(report)}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare with (run with --save-baseline)")
+        return 0
+    with open(args.baseline, "r") as f:
+        baseline = json.load(f)
+    regressions = compare(report, baseline, args.threshold)
+    for case, size, old, new in regressions:
+        print(f"REGRESSION {case} @ {size}: {old * 1000:.3f} ms -> {new * 1000:.3f} ms "
+              f"(+{(new / old - 1) * 100:.0f}%)")
+    if regressions:
+        return 1
+    print(f"No regressions over {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
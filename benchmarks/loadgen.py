@@ -0,0 +1,148 @@
+"""
+Load generator for the task service.
+
+Opens many concurrent keep-alive connections and reports latency
+percentiles and throughput:
+
+    python -m benchmarks.loadgen --clients 1000 --requests 20
+    python -m benchmarks.loadgen --url http://127.0.0.1:8765
+
+Without --url an in-process service is started on a temporary tasks file.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+from src.service import TaskService
+from src.tasks import new_task_dict, save_tasks
+
+# Request mix: (weight, method, path, body)
+_MIX = (
+    (50, "GET", "/tasks?priority=High&limit=20", None),
+    (20, "GET", "/tasks/search?q=123&limit=10", None),
+    (10, "GET", "/tasks/due-soon?limit=20", None),
+    (20, "POST", "/tasks", {"title": "Load test task", "category": "Work"}),
+)
+
+
+def _raise_fd_limit():
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+async def _request(reader, writer, method, path, body):
+    data = json.dumps(body).encode() if body is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: loadgen\r\n"
+        f"Content-Length: {len(data)}\r\n\r\n".encode() + data
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def _client(host, port, requests, latencies, errors, rng):
+    reader, writer = await asyncio.open_connection(host, port)
+    weights = [weight for weight, *_ in _MIX]
+    try:
+        for _ in range(requests):
+            _, method, path, body = rng.choices(_MIX, weights)[0]
+            start = time.perf_counter()
+            status = await _request(reader, writer, method, path, body)
+            latencies.append(time.perf_counter() - start)
+            if status >= 400:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run_load(url, clients, requests, seed=0):
+    """
+    Run the load and collect per-request latencies.
+
+    Args:
+        url (str): Service base URL
+        clients (int): Concurrent connections
+        requests (int): Requests per connection
+        seed (int): Seed for the request mix
+
+    Returns:
+        dict: Request count, errors, elapsed seconds, rps, p50/p99 in ms
+    """
+    target = urlsplit(url)
+    latencies, errors = [], []
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        _client(target.hostname, target.port, requests, latencies, errors,
+                random.Random(rng.random()))
+        for _ in range(clients)
+    ))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "elapsed": elapsed,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": percentile(0.50),
+        "p99_ms": percentile(0.99),
+    }
+
+
+def _seed_file(directory, n):
+    path = os.path.join(directory, "tasks.json")
+    priorities = ("High", "Medium", "Low")
+    save_tasks([
+        new_task_dict(i, f"Task {i}", "Work", priority=priorities[i % 3])
+        for i in range(1, n + 1)
+    ], path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="service to load (default: start one in-process)")
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=20, help="requests per client")
+    parser.add_argument("--tasks", type=int, default=10_000, help="tasks in the in-process service")
+    args = parser.parse_args()
+    _raise_fd_limit()
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = args.url
+        if url is None:
+            service = TaskService(_seed_file(directory, args.tasks))
+            url = f"http://127.0.0.1:{service.run_in_thread()}"
+        result = asyncio.run(run_load(url, args.clients, args.requests))
+
+    print(f"{args.clients} clients x {args.requests} requests against {url}")
+    print(f"{'requests':<12}{result['requests']:>10}")
+    print(f"{'errors':<12}{result['errors']:>10}")
+    print(f"{'rps':<12}{result['rps']:>10.0f}")
+    print(f"{'p50':<12}{result['p50_ms']:>8.1f}ms")
+    print(f"{'p99':<12}{result['p99_ms']:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,13 @@
-from behave import fixture
-from src.tasks import clear_tasks, save_tasks
+import shutil
+import tempfile
 import os
-
-@fixture
-def clean_tasks_before_scenario(context):
-    # Runs before each scenario
-    clear_tasks()
-    yield
-    # Runs after each scenario
-    if os.path.exists("test_tasks.json"):
-        os.remove("test_tasks.json")
+from src.tasks import clear_tasks
 
 def before_scenario(context, scenario):
-    clean_tasks_before_scenario(context)
-    context.tasks_file = "test_tasks.json"  # Use test file
\ No newline at end of file
+    # Each scenario works on its own tasks file, so scenarios can run in parallel
+    context.tasks_dir = tempfile.mkdtemp(prefix="bdd-")
+    context.tasks_file = os.path.join(context.tasks_dir, "tasks.json")
+    clear_tasks(context.tasks_file)
+
+def after_scenario(context, scenario):
+    shutil.rmtree(context.tasks_dir, ignore_errors=True)
@@ -1,12 +1,12 @@
 from behave import *
 from datetime import datetime, timedelta
+from src.session import task_session
 from src.tasks import (
     load_tasks, 
-    save_tasks, 
-    add_task_with_category,
+    clear_tasks, 
     filter_tasks_by_priority,
     get_overdue_tasks,
-    bulk_complete_tasks
+    get_task_by_title
 )
 
 def parse_due_date(due_date_str):
@@ -21,94 +21,92 @@ def parse_due_date(due_date_str):
 
 @given('I start with an empty task list')
 def step_impl(context):
-    context.tasks = []
-    save_tasks(context.tasks)
+    clear_tasks(context.tasks_file)
 
 @given('I have a task "{title}" in my list')
 def step_impl(context, title):
-    context.tasks = load_tasks()
-    if not any(t['title'] == title for t in context.tasks):
-        add_task_with_category(
-            context.tasks,
-            title,
-            "General",
-            due_date=(datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
-        )
-        save_tasks(context.tasks)
+    with task_session(context.tasks_file) as session:
+        if not session.find(title):
+            session.add(
+                title,
+                "General",
+                due_date=(datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+            )
 
 @given('I have these tasks')
 def step_impl(context):
-    for row in context.table:
-        add_task_with_category(
-            context.tasks,
-            row['Title'],
-            "General",
-            priority=row.get('Priority', 'Medium'),
-            due_date=parse_due_date(row.get('Due Date', 'Tomorrow'))
-        )
-    save_tasks(context.tasks)
+    # One write for the whole table instead of one per row
+    with task_session(context.tasks_file) as session:
+        for row in context.table:
+            session.add(
+                row['Title'],
+                "General",
+                priority=row.get('Priority', 'Medium'),
+                due_date=parse_due_date(row.get('Due Date', 'Tomorrow'))
+            )
 
 @given('I have a task "{title}" due yesterday')
 def step_impl(context, title):
     yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
-    add_task_with_category(
-        context.tasks,
-        title,
-        "General",
-        due_date=yesterday
-    )
-    save_tasks(context.tasks)
+    with task_session(context.tasks_file) as session:
+        session.add(title, "General", due_date=yesterday)
 
 @when('I add a task "{title}" with')
 def step_impl(context, title):
     task_data = {row['Field']: row['Value'] for row in context.table}
-    add_task_with_category(
-        context.tasks,
-        title,
-        task_data.get('Category', 'General'),
-        priority=task_data.get('Priority', 'Medium'),
-        due_date=parse_due_date(task_data.get('Due Date', 'Tomorrow'))
-    )
-    save_tasks(context.tasks)
+    context.current_title = title
+    with task_session(context.tasks_file) as session:
+        session.add(
+            title,
+            task_data.get('Category', 'General'),
+            priority=task_data.get('Priority', 'Medium'),
+            due_date=parse_due_date(task_data.get('Due Date', 'Tomorrow'))
+        )
 
 @when('I mark "{title}" as completed')
 def step_impl(context, title):
-    tasks = load_tasks()
-    task_ids = [t['id'] for t in tasks if t['title'] == title]
-    bulk_complete_tasks(tasks, task_ids)
+    context.current_title = title
+    with task_session(context.tasks_file) as session:
+        session.complete(*[t['id'] for t in session.find(title)])
 
 @when('I filter by "{priority}" priority')
 def step_impl(context, priority):
-    context.filtered_tasks = filter_tasks_by_priority(load_tasks(), priority)
+    context.filtered_tasks = filter_tasks_by_priority(load_tasks(context.tasks_file), priority)
 
 @when('I delete "{title}"')
 def step_impl(context, title):
-    tasks = [t for t in load_tasks() if t['title'] != title]
-    save_tasks(tasks)
+    with task_session(context.tasks_file) as session:
+        for task in session.find(title):
+            session.delete(task['id'])
 
 @when('I view overdue tasks')
 def step_impl(context):
-    context.overdue_tasks = get_overdue_tasks(load_tasks())
+    context.overdue_tasks = get_overdue_tasks(load_tasks(context.tasks_file))
 
 @then('I should see "{title}" in my tasks')
 def step_impl(context, title):
-    tasks = load_tasks()
+    tasks = load_tasks(context.tasks_file)
     assert any(t['title'] == title for t in tasks), f"Task '{title}' not found"
 
+def current_task(context):
+    """The task the last When step acted on, looked up by title"""
+    task = get_task_by_title(context.current_title, context.tasks_file)
+    assert task is not None, f"Task '{context.current_title}' not found"
+    return task
+
 @then('it should have priority "{priority}"')
 def step_impl(context, priority):
-    tasks = load_tasks()
-    assert tasks[-1]['priority'] == priority, f"Expected {priority}, got {tasks[-1]['priority']}"
+    task = current_task(context)
+    assert task['priority'] == priority, f"Expected {priority}, got {task['priority']}"
 
 @then('it should belong to category "{category}"')
 def step_impl(context, category):
-    tasks = load_tasks()
-    assert tasks[-1]['category'] == category, f"Expected {category}, got {tasks[-1]['category']}"
+    task = current_task(context)
+    assert task['category'] == category, f"Expected {category}, got {task['category']}"
 
 @then('the task should show as completed')
 def step_impl(context):
-    tasks = load_tasks()
-    assert tasks[-1]['completed'] is True, "Task was not completed"
+    assert current_task(context)['completed'] is True, "Task was not completed"
 
 @then('I should only see "{title}"')
 def step_impl(context, title):
@@ -117,7 +115,7 @@ def step_impl(context, title):
 
 @then('it should not appear in my tasks')
 def step_impl(context):
-    tasks = load_tasks()
+    tasks = load_tasks(context.tasks_file)
     assert len(tasks) == 0, f"Tasks still exist: {tasks}"
 
 @then('I should see "{title}" in the overdue list')
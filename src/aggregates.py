@@ -0,0 +1,176 @@
+from datetime import datetime
+
+# Task fields the counters depend on; update records carry their previous
+# values (see journal.update_record) so a change can be counted on its own
+AGGREGATE_FIELDS = ("category", "priority", "completed", "due_date")
+
+# Key for a missing category, priority or due date
+MISSING_KEY = ""
+
+
+def _key(value):
+    return MISSING_KEY if value is None else str(value)
+
+
+class Aggregates:
+    """
+    Task counters maintained incrementally from journal records.
+
+    Counts the tasks in total, per category and priority, completed and
+    pending, and pending tasks per due date. The due-date buckets answer
+    overdue counts for any day without looking at tasks; pending tasks
+    without a due date sit in the MISSING_KEY bucket and count as overdue,
+    like get_overdue_tasks.
+    """
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self.total = 0
+        self.completed = 0
+        self.by_category = {}
+        self.by_priority = {}
+        self.pending_by_due = {}
+
+    @property
+    def pending(self):
+        return self.total - self.completed
+
+    @classmethod
+    def from_tasks(cls, tasks):
+        """Count tasks from scratch."""
+        aggregates = cls()
+        for task in tasks:
+            aggregates._count(task, 1)
+        return aggregates
+
+    @staticmethod
+    def _bump(counts, key, n):
+        value = counts.get(key, 0) + n
+        if value:
+            counts[key] = value
+        else:
+            del counts[key]
+
+    def _count(self, task, n):
+        """Add (n=1) or remove (n=-1) one task's contribution."""
+        self.total += n
+        self._bump(self.by_category, _key(task.get("category")), n)
+        self._bump(self.by_priority, _key(task.get("priority")), n)
+        if task.get("completed", False):
+            self.completed += n
+        else:
+            due_date = task.get("due_date", MISSING_KEY)
+            if isinstance(due_date, str):
+                self._bump(self.pending_by_due, due_date, n)
+
+    def apply(self, records):
+        """
+        Count the changes described by journal records.
+
+        Args:
+            records (list): Journal records in order
+
+        Returns:
+            bool: False if a record lacks what is needed to count it (an
+                update without the "was" fields); the counters are then
+                wrong and must be recomputed
+        """
+        for record in records:
+            op = record["op"]
+            if op == "add":
+                self._count(record["task"], 1)
+            elif op == "delete":
+                self._count(record["task"], -1)
+            elif op == "update":
+                changed = [field for field in AGGREGATE_FIELDS if field in record["set"]]
+                if not changed:
+                    continue
+                was = record.get("was")
+                if was is None:
+                    return False
+                self._count(was, -1)
+                self._count({**was, **{field: record["set"][field] for field in changed}}, 1)
+            elif op == "clear":
+                self._reset()
+        return True
+
+    def merge(self, other):
+        """Add the counters of other (e.g. another tenant's) into these."""
+        self.total += other.total
+        self.completed += other.completed
+        for name in ("by_category", "by_priority", "pending_by_due"):
+            counts = getattr(self, name)
+            for key, n in getattr(other, name).items():
+                self._bump(counts, key, n)
+        return self
+
+    def overdue(self, today=None):
+        """
+        Count pending tasks due before today.
+
+        Args:
+            today (str): Reference day ("%Y-%m-%d"), defaults to today
+
+        Returns:
+            int: Number of overdue tasks
+        """
+        if today is None:
+            today = datetime.now().strftime("%Y-%m-%d")
+        return sum(n for due_date, n in self.pending_by_due.items() if due_date < today)
+
+    def summary(self, today=None):
+        """The counters plus today's overdue count, as a dictionary."""
+        return {**self.to_dict(), "overdue": self.overdue(today)}
+
+    def to_dict(self):
+        return {
+            "total": self.total,
+            "completed": self.completed,
+            "pending": self.pending,
+            "by_category": dict(sorted(self.by_category.items())),
+            "by_priority": dict(sorted(self.by_priority.items())),
+            "pending_by_due": dict(sorted(self.pending_by_due.items())),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        aggregates = cls()
+        aggregates.total = data["total"]
+        aggregates.completed = data["completed"]
+        aggregates.by_category = dict(data["by_category"])
+        aggregates.by_priority = dict(data["by_priority"])
+        aggregates.pending_by_due = dict(data["pending_by_due"])
+        return aggregates
+
+    def __eq__(self, other):
+        return isinstance(other, Aggregates) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"Aggregates(total={self.total}, completed={self.completed})"
+
+
+def diff(stored, actual):
+    """
+    Compare two sets of counters.
+
+    Args:
+        stored (Aggregates): Maintained counters
+        actual (Aggregates): Counters recomputed from the tasks
+
+    Returns:
+        dict: (stored, actual) per differing counter, e.g.
+            {"by_category.Work": (3, 4)}; empty if they agree
+    """
+    mismatches = {}
+    left, right = stored.to_dict(), actual.to_dict()
+    for name, value in left.items():
+        if isinstance(value, dict):
+            for key in sorted(set(value) | set(right[name])):
+                a, b = value.get(key, 0), right[name].get(key, 0)
+                if a != b:
+                    mismatches[f"{name}.{key}"] = (a, b)
+        elif value != right[name]:
+            mismatches[name] = (value, right[name])
+    return mismatches
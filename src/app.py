@@ -1,73 +1,210 @@
 import streamlit as st
-import pandas as pd
-from datetime import datetime, timedelta
-import subprocess
 import os
 import sys
-import base64
-from tasks import load_tasks, save_tasks, filter_tasks_by_priority, filter_tasks_by_category
-from behave.__main__ import main as behave_main
-import shutil
+
+# Import the core logic as part of the src package so its relative imports work
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.cache import task_cache
+from src.client import service_client
+from src.feed import FeedView, feed_client
+from src.metrics import capture_profile, metrics, serve as serve_metrics
+from src.scheduler import LogSink, QueueSink, ReminderScheduler
+from src.shards import ShardManager
+from src.storage import DEFAULT_TASKS_FILE
+from src.tasks import check_task_stats, get_due_soon_tasks, task_stats
+
+# pandas (through src.views), the test runner and the benchmark harness are
+# imported inside the functions that use them, so a cold start only loads
+# what the first render needs
+
+@st.cache_resource
+def reminder_scheduler():
+    """One scheduler per server process, following tasks.json"""
+    scheduler = ReminderScheduler([LogSink()])
+    scheduler.follow()
+    scheduler.start()
+    return scheduler
+
+@st.cache_resource
+def task_view():
+    """Indexed tasks.json shared by the sessions of this server process, patched
+    from the change feed (a feed server's when TODO_FEED_ADDRESS is set)"""
+    return FeedView(DEFAULT_TASKS_FILE, feed=feed_client())
+
+def session_changes(version):
+    """Changes since this session's last rerun (None on its first one)"""
+    seen = st.session_state.get("seen_version")
+    st.session_state["seen_version"] = version
+    return None if seen is None else version - seen
+
+@st.cache_resource
+def shard_manager():
+    """Hot tenant shards of this server process (least recently used evicted)"""
+    return ShardManager()
+
+def session_tenant():
+    """Tenant of this session: ?tenant= in the URL, then the sidebar field"""
+    if "tenant" not in st.session_state:
+        st.session_state["tenant"] = st.query_params.get("tenant", "")
+    return st.sidebar.text_input("Task list", key="tenant").strip()
+
+def session_reminders():
+    """Reminders emitted since this session's last rerun"""
+    sink = st.session_state.get("reminder_sink")
+    if sink is None:
+        sink = st.session_state["reminder_sink"] = QueueSink()
+        reminder_scheduler().add_sink(sink)
+    return sink.drain()
 
 def run_pytest(test_args):
-    """Run pytest with given arguments"""
-    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    cmd = ["pytest", "--cov=src"] + test_args.split()
-    
-    result = subprocess.run(
-        cmd,
-        cwd=project_root,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-        env={**os.environ, "PYTHONPATH": project_root}
-    )
-    return result.stdout or result.stderr
+    """Run pytest with given arguments in the background test runner"""
+    from src.testrunner import pytest_command, test_runner
+    return test_runner.submit(f"pytest {test_args}", pytest_command(test_args.split()))
 
 def generate_html_report():
-    """Generate an HTML test report."""
-    try:
-        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        report_dir = os.path.join(project_root, "reports")
-        os.makedirs(report_dir, exist_ok=True)
-        
-        subprocess.run([
-            "pytest",
-            "tests/",
-            "--cov=src",
-            "--html=reports/pytest_report.html",
-            "--cov-report=html:reports/coverage",
-            "--self-contained-html"
-        ], check=True, cwd=project_root)
-        
-        return "HTML report generated successfully", os.path.join(report_dir, "pytest_report.html")
-    except subprocess.CalledProcessError as e:
-        return f"Report generation failed: {e.output}", None
+    """Generate an HTML test report (with coverage) in the background."""
+    from src.testrunner import pytest_command, test_runner
+    command = pytest_command([
+        "tests/",
+        "--html=reports/pytest_report.html",
+        "--cov-report=html:reports/coverage",
+        "--self-contained-html"
+    ], coverage=True)
+    return test_runner.submit("html report", command, outputs=("reports/pytest_report.html",))
 
 def run_bdd_tests():
-    """Run BDD tests and return output"""
-    try:
-        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        reports_dir = os.path.join(project_root, "reports")
-        os.makedirs(reports_dir, exist_ok=True)
-        
-        result = subprocess.run(
-            ["behave", "features/", "--format", "pretty", "--outfile", "reports/bdd_report.txt"],
-            cwd=project_root,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
+    """Run the feature files in parallel behave processes in the background"""
+    from src.testrunner import behave_command, test_runner
+    return test_runner.submit(
+        "behave", behave_command(outfile="reports/bdd_report.txt"),
+        outputs=("reports/bdd_report.txt",)
+    )
+
+def run_benchmarks():
+    """Run the task benchmarks (never cached: timings change without code changes)"""
+    from src.testrunner import test_runner
+    command = [sys.executable, "-m", "benchmarks.bench_tasks", "--sizes", "1k,100k"]
+    return test_runner.submit("benchmarks", command, cache=False)
+
+def show_benchmark_trend(size=100_000):
+    """Chart the timing of every benchmarked operation across stored runs"""
+    import pandas as pd
+    from benchmarks.bench_tasks import REPORT_DIR, load_history
+    from src.testrunner import test_runner
+    history = load_history(os.path.join(test_runner.root, REPORT_DIR))
+    rows = [
+        {"run": report["timestamp"], "case": result["case"], "ms": result["seconds"] * 1000}
+        for report in history for result in report["results"] if result["size"] == size
+    ]
+    if not rows:
+        st.info("No benchmark reports yet")
+        return
+    trend = pd.DataFrame(rows).pivot(index="run", columns="case", values="ms")
+    st.caption(f"Benchmark trend ({size:,} tasks, ms per call)")
+    st.line_chart(trend)
+
+def show_task_list(frame, from_cache=True, file_path=DEFAULT_TASKS_FILE):
+    """Paginated task table with server-side search, filters and sorting"""
+    from src.views import SORT_FIELDS, cached_sort_order, page_rows, select_rows, sort_order
+    st.subheader("Tasks")
+    search_col, priority_col, category_col, status_col = st.columns(4)
+    search = search_col.text_input("Search")
+    priority = priority_col.selectbox("Priority", ["All", "High", "Medium", "Low"])
+    categories = sorted(frame["category"].dropna().unique().tolist())
+    category = category_col.selectbox("Category", ["All"] + categories)
+    status = status_col.selectbox("Status", ["All", "Pending", "Completed"])
+    sort_col, order_col, size_col = st.columns(3)
+    sort_by = sort_col.selectbox("Sort by", SORT_FIELDS)
+    descending = order_col.checkbox("Descending")
+    page_size = size_col.selectbox("Rows per page", [25, 50, 100, 500], index=1)
+
+    with metrics.timer("app.task_list"):
+        if from_cache:
+            # Sorted afresh if the file changed since the frame was built
+            order = cached_sort_order(file_path=file_path, sort_by=sort_by,
+                                      descending=descending, frame=frame)
+        else:
+            order = sort_order(frame, sort_by, descending)
+        rows = select_rows(
+            frame, order,
+            search=search or None,
+            priority=None if priority == "All" else priority,
+            category=None if category == "All" else category,
+            completed=None if status == "All" else status == "Completed",
         )
-        
-        output = result.stdout or result.stderr
-        if os.path.exists(os.path.join(reports_dir, "bdd_report.txt")):
-            with open(os.path.join(reports_dir, "bdd_report.txt"), "r") as f:
-                output += "\n\n" + f.read()
-        return output
-    except Exception as e:
-        return f"Error running BDD tests: {str(e)}"
+    pages = max(1, -(-len(rows) // page_size))
+    page = st.number_input("Page", min_value=1, max_value=pages, value=1, step=1)
+    st.dataframe(page_rows(frame, rows, page - 1, page_size),
+                 hide_index=True, use_container_width=True)
+    st.caption(f"{len(rows):,} of {len(frame):,} tasks, page {page} of {pages}")
+
+def show_run(run):
+    """Stream a test run's output into the page until it finishes"""
+    placeholder = st.empty()
+    while not run.wait(0.25):
+        placeholder.code(run.output(), language="bash")
+    placeholder.code(run.output(), language="bash")
+    if run.status == "cached":
+        st.caption("Inputs unchanged since the last run: showing the cached result")
+    else:
+        st.caption(f"Finished in {run.elapsed:.1f}s")
+    return run
+
+def show_summary(summary, local=True, file_path=DEFAULT_TASKS_FILE):
+    """Task counts from the maintained counters (never a scan of the tasks)"""
+    total, pending, completed, overdue = st.columns(4)
+    total.metric("Tasks", summary["total"])
+    pending.metric("Pending", summary["pending"])
+    completed.metric("Completed", summary["completed"])
+    overdue.metric("Overdue", summary["overdue"])
+    with st.expander("By category and priority"):
+        category_col, priority_col = st.columns(2)
+        category_col.bar_chart(summary["by_category"])
+        priority_col.bar_chart(summary["by_priority"])
+        if local and st.button("Check counters"):
+            mismatches = check_task_stats(file_path, repair=True)
+            if mismatches:
+                st.warning(f"Counters were off and have been rebuilt: {mismatches}")
+            else:
+                st.success("Counters match a full recount")
+
+def show_performance_panel(profile):
+    """Sidebar panel with recorded metrics and an on-demand profile of one rerun"""
+    with st.sidebar.expander("Performance"):
+        metrics.enabled = st.checkbox("Record metrics", value=metrics.enabled)
+        if st.button("Profile next rerun"):
+            st.session_state["profile_rerun"] = True
+            st.rerun()
+        port = serve_metrics()
+        if port:
+            st.caption(f"Metrics endpoint: http://127.0.0.1:{port}/metrics")
+        snapshot = metrics.snapshot()
+        rows = [
+            {"name": name, "calls": h["count"], "mean ms": h["mean"], "p95 ms (bucket)": h["p95"]}
+            for name, h in snapshot["latency_ms"].items()
+        ]
+        if rows:
+            st.dataframe(rows, hide_index=True)
+        sizes = {name: h["mean"] for name, h in snapshot["sizes"].items()}
+        if sizes:
+            st.caption("Mean collection size per call")
+            st.json(sizes, expanded=False)
+        if snapshot["counters"]:
+            st.json(snapshot["counters"])
+        if st.button("Reset metrics"):
+            metrics.reset()
+    if profile.text:
+        with st.expander("Profile of this rerun"):
+            st.code(profile.text)
 
 def main():
+    # Profile this rerun when it was requested from the Performance panel
+    profiling = st.session_state.pop("profile_rerun", False)
+    with capture_profile(enabled=profiling) as profile, metrics.timer("app.rerun"):
+        render()
+    show_performance_panel(profile)
+
+def render():
     st.title("To-Do Application")
     
     # Testing section in sidebar
@@ -75,21 +212,19 @@ def main():
     
     # Basic testing buttons
     if st.sidebar.button("Run Unit Tests"):
-        output = run_pytest("tests/test_basic.py -v")
-        st.code(output, language="bash")
+        show_run(run_pytest("tests/test_basic.py -v"))
     
     if st.sidebar.button("Run Parameterized Tests"):
-        output = run_pytest("tests/test_advanced.py -k test_parametrized -v")
-        st.code(output, language="bash")
+        show_run(run_pytest("tests/test_advanced.py -k test_parametrized -v"))
     
     if st.sidebar.button("Run Mocking Tests"):
-        output = run_pytest("tests/test_advanced.py -k test_mock -v")
-        st.code(output, language="bash")
+        show_run(run_pytest("tests/test_advanced.py -k test_mock -v"))
     
     if st.sidebar.button("Generate HTML Report"):
-        status, report_path = generate_html_report()
-        st.code(status, language="bash")
-        if report_path and os.path.exists(report_path):
+        run = show_run(generate_html_report())
+        report_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                   "reports", "pytest_report.html")
+        if run.passed and os.path.exists(report_path):
             with open(report_path, "rb") as f:
                 st.download_button(
                     "Download Test Report",
@@ -102,32 +237,76 @@ def main():
     st.sidebar.header("Advanced Testing")
     
     if st.sidebar.button("Run TDD Tests"):
-        output = run_pytest("tests/test_tdd.py -v")
-        st.code(output, language="bash")
+        show_run(run_pytest("tests/test_tdd.py -v"))
     
     if st.sidebar.button("Run BDD Tests"):
-        output = run_bdd_tests()
-        st.code(output, language="bash")
-        if "scenarios passed" in output.lower():
+        run = show_run(run_bdd_tests())
+        if run.passed:
             st.success("BDD tests completed successfully!")
         else:
             st.error("Some BDD tests failed")
 
-    # Load existing tasks
-    tasks = load_tasks()
+    if st.sidebar.button("Run Benchmarks"):
+        run = show_run(run_benchmarks())
+        if not run.passed:
+            st.error("Benchmark regressions over the baseline threshold")
+        show_benchmark_trend()
+
+    # Each tenant has its own tasks file (shard); without one, tasks.json
+    tenant = session_tenant()
+    tasks_file = shard_manager().path(tenant) if tenant else DEFAULT_TASKS_FILE
+
+    # Load existing tasks from the task service when TODO_SERVICE_URL is set,
+    # otherwise from hot in-memory stores of the tasks file
+    client = service_client()
+    if client is not None:
+        with metrics.timer("app.load_tasks"):
+            tasks = client.list_tasks()
+        with metrics.timer("app.due_soon"):
+            due_soon = client.due_soon()
+        with metrics.timer("app.summary"):
+            summary = client.stats()
+        st.sidebar.caption(f"Task service: {client.host}:{client.port}")
+    else:
+        with metrics.timer("app.load_tasks"):
+            # Hot TaskStores: a tenant's shard, or the view patched with the
+            # changes since the last rerun instead of reloading tasks.json
+            if tenant:
+                store = shard_manager().store(tenant)
+            else:
+                view = task_view()
+                view.refresh()
+                changes = session_changes(view.version)
+                if changes:
+                    st.sidebar.caption(f"{changes} changes since your last rerun")
+        with metrics.timer("app.due_soon"):
+            # Both answer from their due-date index
+            due_soon = get_due_soon_tasks(store) if tenant else view.due_soon()
+        with metrics.timer("app.summary"):
+            summary = task_stats(tasks_file).summary()
+        cache_stats = task_cache.stats()
+        st.sidebar.caption(f"Task cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses")
+        if not tenant:
+            # The reminder scheduler follows tasks.json only
+            for reminder in session_reminders():
+                st.toast(f"'{reminder['title']}' is due {reminder['due_date']}")
     
+    show_summary(summary, local=client is None, file_path=tasks_file)
+
     # Display due soon notifications (TDD Feature 1)
-    due_soon = [t for t in tasks 
-               if not t["completed"] and "due_date" in t
-               and 0 < (datetime.strptime(t["due_date"], "%Y-%m-%d") - datetime.now()).days <= 1]
     if due_soon:
         with st.expander("Due Soon Notifications"):
             for task in due_soon:
                 st.warning(f"'{task['title']}' is due soon ({task['due_date']})")
 
-    # Rest of your existing task management UI...
-    # [Keep all your existing task creation/display/filtering code here]
-    # ...
+    # Task list: one frame per data version, only the visible page is materialized
+    from src.views import cached_task_frame, task_frame
+    if client is not None:
+        from src.model import TaskTable
+        frame = task_frame(TaskTable.from_dicts(tasks))
+    else:
+        frame = cached_task_frame(tasks_file)
+    show_task_list(frame, from_cache=client is None, file_path=tasks_file)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
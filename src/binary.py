@@ -0,0 +1,431 @@
+"""
+Compact binary task snapshots (.tbin), read through mmap.
+
+Layout (little-endian):
+
+    header      magic, format version, codec, records per block, task
+                count and the offsets of the sections below
+    blocks      per block: fixed-width records, then the block's string
+                heap (titles, descriptions, extra fields as JSON), the
+                whole block optionally compressed with zlib, zstd or lz4
+    directory   offset, stored size and raw size of every block
+    index       (id, row) pairs sorted by id, for binary search
+    dictionary  JSON lists of the priorities and categories the records'
+                codes refer to
+
+Opening a snapshot only maps the file and reads the header and dictionary,
+so it takes milliseconds at any size; a task is decoded when it is accessed.
+Uncompressed snapshots are read straight from the page cache, which every
+process mapping the file shares; compressed blocks are inflated per process
+(the most recent ones are kept).
+
+    python -m src.binary tasks.json tasks.tbin --codec zstd
+    python -m src.binary tasks.tbin tasks.json
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import threading
+from collections import OrderedDict
+
+from .model import CATEGORIES, MISSING, PRIORITIES, Interner, Task, ordinal_to_date
+
+# File extension of binary snapshots
+BINARY_SUFFIX = ".tbin"
+
+# Codec used when writing a new snapshot: none, zlib, zstd or lz4
+CODEC_ENV = "TODO_SNAPSHOT_CODEC"
+
+# Records per block (the unit of compression)
+BLOCK_SIZE = 4096
+
+MAGIC = b"TBIN"
+FORMAT_VERSION = 1
+
+CODECS = ("none", "zlib", "zstd", "lz4")
+
+# Decompressed blocks kept per open snapshot
+_CACHED_BLOCKS = 8
+
+# Length stored for an absent string
+_ABSENT = 0xFFFFFFFF
+
+_HEADER = struct.Struct("<4sHBxIQQQQQ")
+# id, priority, category, completed, due, created, then (offset, length) of
+# title, description and extra in the block's string heap
+_RECORD = struct.Struct("<qiib3xiq6I")
+# (offset, length) of the title, within a record
+_TITLE = struct.Struct("<2I")
+_TITLE_AT = 32
+_BLOCK = struct.Struct("<QII")
+_SECONDS_PER_DAY = 86400
+_INDEX = struct.Struct("<qI")
+
+
+def _codec(name):
+    """Return (compress, decompress) for a codec name; None for "none"."""
+    if name == "none":
+        return None
+    if name == "zlib":
+        import zlib
+        return zlib.compress, zlib.decompress
+    if name == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("The zstd codec needs the zstandard package") from None
+        return zstandard.ZstdCompressor().compress, zstandard.ZstdDecompressor().decompress
+    if name == "lz4":
+        try:
+            import lz4.frame
+        except ImportError:
+            raise ImportError("The lz4 codec needs the lz4 package") from None
+        return lz4.frame.compress, lz4.frame.decompress
+    raise ValueError(f"Unknown snapshot codec: {name}")
+
+
+def is_binary_path(file_path):
+    """True if file_path names a binary snapshot."""
+    return file_path.endswith(BINARY_SUFFIX)
+
+
+def _pack_string(heap, value):
+    if value is None:
+        return 0, _ABSENT
+    data = value.encode("utf-8")
+    offset = len(heap)
+    heap += data
+    return offset, len(data)
+
+
+def write_tasks(tasks, f, codec="none", block_size=BLOCK_SIZE):
+    """
+    Write tasks as a binary snapshot.
+
+    Args:
+        tasks (list): Task dictionaries
+        f (file): Binary file opened for writing, positioned at its start
+        codec (str): Block compression, one of CODECS
+        block_size (int): Records per block
+    """
+    codecs = _codec(codec)
+    compress = codecs[0] if codecs else None
+    priorities, categories = Interner(), Interner()
+    index = []
+    directory = []
+    f.write(bytes(_HEADER.size))
+    offset = _HEADER.size
+    for start in range(0, len(tasks), block_size):
+        block = tasks[start:start + block_size]
+        records = bytearray()
+        heap = bytearray()
+        for row, task in enumerate(block, start):
+            t = Task.from_dict(task)
+            title = _pack_string(heap, t.title)
+            description = _pack_string(heap, t.description)
+            extra = _pack_string(heap, json.dumps(t.extra) if t.extra else None)
+            records += _RECORD.pack(
+                t.id,
+                MISSING if t.priority == MISSING else priorities.code(PRIORITIES.value(t.priority)),
+                MISSING if t.category == MISSING else categories.code(CATEGORIES.value(t.category)),
+                t.completed, t.due, t.created, *title, *description, *extra,
+            )
+            index.append((t.id, row))
+        raw = bytes(records + heap)
+        data = compress(raw) if compress else raw
+        f.write(data)
+        directory.append(_BLOCK.pack(offset, len(data), len(raw)))
+        offset += len(data)
+    directory_offset = offset
+    f.write(b"".join(directory))
+    index_offset = directory_offset + len(directory) * _BLOCK.size
+    index.sort()
+    f.write(b"".join(_INDEX.pack(task_id, row) for task_id, row in index))
+    dictionary = json.dumps({
+        "priorities": priorities.values, "categories": categories.values,
+    }).encode("utf-8")
+    dictionary_offset = index_offset + len(index) * _INDEX.size
+    f.write(dictionary)
+    f.seek(0)
+    f.write(_HEADER.pack(
+        MAGIC, FORMAT_VERSION, CODECS.index(codec), block_size, len(tasks),
+        directory_offset, index_offset, dictionary_offset, len(dictionary),
+    ))
+    f.seek(0, os.SEEK_END)
+
+
+class BinarySnapshot:
+    """
+    Read-only, memory-mapped view of a binary snapshot.
+
+    Behaves like a sequence of task dictionaries (len, iteration, row(i))
+    and supports lookups by id; nothing is decoded until it is accessed.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        with open(file_path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, codec, self.block_size, self.count, self._directory,
+         self._index, dictionary, dictionary_len) = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._mm.close()
+            raise ValueError(f"{file_path} is not a version {FORMAT_VERSION} task snapshot")
+        self.codec = CODECS[codec]
+        codecs = _codec(self.codec)
+        self._decompress = codecs[1] if codecs else None
+        values = json.loads(self._mm[dictionary:dictionary + dictionary_len])
+        self._priorities = values["priorities"]
+        self._categories = values["categories"]
+        self._blocks = OrderedDict()
+        self._lock = threading.Lock()
+        # Day ordinal -> "%Y-%m-%d", shared by due dates and creation times
+        self._days = {}
+
+    def close(self):
+        self._mm.close()
+
+    def __len__(self):
+        return self.count
+
+    def _block(self, b):
+        """Return (buffer, number of records) for block b."""
+        offset, size, raw_size = _BLOCK.unpack_from(self._mm, self._directory + b * _BLOCK.size)
+        n = min(self.block_size, self.count - b * self.block_size)
+        if self._decompress is None:
+            return memoryview(self._mm)[offset:offset + size], n
+        with self._lock:
+            buf = self._blocks.get(b)
+            if buf is not None:
+                self._blocks.move_to_end(b)
+                return buf, n
+        buf = self._decompress(self._mm[offset:offset + size])
+        with self._lock:
+            self._blocks[b] = buf
+            if len(self._blocks) > _CACHED_BLOCKS:
+                self._blocks.popitem(last=False)
+        return buf, n
+
+    def _decode(self, buf, n, start, stop):
+        """
+        Decode records start..stop of a block into task dictionaries.
+
+        Builds the same dictionaries as Task.to_dict, with dates formatted
+        once per distinct day so whole-file loads stay fast. Strings are
+        decoded straight from the block buffer, so only they are copied.
+        """
+        heap = n * _RECORD.size
+        priorities, categories, days = self._priorities, self._categories, self._days
+        tasks = []
+        records = _RECORD.iter_unpack(buf[start * _RECORD.size:stop * _RECORD.size])
+        for (task_id, priority, category, completed, due, created,
+             title_at, title_len, description_at, description_len,
+             extra_at, extra_len) in records:
+            task = {"id": task_id}
+            if title_len != _ABSENT:
+                title_at += heap
+                task["title"] = str(buf[title_at:title_at + title_len], "utf-8")
+            if description_len != _ABSENT:
+                description_at += heap
+                task["description"] = str(buf[description_at:description_at + description_len], "utf-8")
+            if priority != MISSING:
+                task["priority"] = priorities[priority]
+            if category != MISSING:
+                task["category"] = categories[category]
+            if completed != MISSING:
+                task["completed"] = bool(completed)
+            if due != MISSING:
+                day = days.get(due)
+                if day is None:
+                    day = days[due] = ordinal_to_date(due)
+                task["due_date"] = day
+            if created != MISSING:
+                ordinal, rest = divmod(created, _SECONDS_PER_DAY)
+                day = days.get(ordinal)
+                if day is None:
+                    day = days[ordinal] = ordinal_to_date(ordinal)
+                hours, rest = divmod(rest, 3600)
+                task["created_at"] = f"{day} {hours:02d}:{rest // 60:02d}:{rest % 60:02d}"
+            if extra_len != _ABSENT:
+                extra_at += heap
+                task.update(json.loads(bytes(buf[extra_at:extra_at + extra_len])))
+            tasks.append(task)
+        return tasks
+
+    def row(self, i):
+        """Decode the task stored at row i (its offset in the snapshot)."""
+        if not 0 <= i < self.count:
+            raise IndexError(f"row {i} out of range")
+        buf, n = self._block(i // self.block_size)
+        i %= self.block_size
+        return self._decode(buf, n, i, i + 1)[0]
+
+    def row_of(self, task_id):
+        """Row of the task with the given id (binary search of the index), or None."""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            key, row = _INDEX.unpack_from(self._mm, self._index + mid * _INDEX.size)
+            if key < task_id:
+                lo = mid + 1
+            elif key > task_id:
+                hi = mid
+            else:
+                return row
+        return None
+
+    def get(self, task_id):
+        """Decode the task with the given id, or return None."""
+        row = self.row_of(task_id)
+        return None if row is None else self.row(row)
+
+    def iter_title(self, title):
+        """
+        Yield (row, task) for every task with exactly this title, in row order.
+
+        Titles are compared as raw bytes in the mapped blocks; only matching
+        records are decoded.
+        """
+        wanted = title.encode("utf-8")
+        for b in range(-(-self.count // self.block_size)):
+            buf, n = self._block(b)
+            heap = n * _RECORD.size
+            for i in range(n):
+                at, length = _TITLE.unpack_from(buf, i * _RECORD.size + _TITLE_AT)
+                if length == len(wanted) and buf[heap + at:heap + at + length] == wanted:
+                    yield b * self.block_size + i, self._decode(buf, n, i, i + 1)[0]
+
+    def __iter__(self):
+        for b in range(-(-self.count // self.block_size)):
+            buf, n = self._block(b)
+            yield from self._decode(buf, n, 0, n)
+
+
+# Snapshots kept mapped by open_snapshot, least recently used evicted first
+_OPEN_SNAPSHOTS = 128
+
+_open = OrderedDict()
+_open_lock = threading.Lock()
+
+
+def open_snapshot(file_path):
+    """
+    Get a mapped snapshot, shared by every caller until the file is replaced.
+
+    Args:
+        file_path (str): Path to the .tbin file
+
+    Returns:
+        BinarySnapshot: The snapshot, None if the file does not exist
+    """
+    key = os.path.abspath(file_path)
+    try:
+        st = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+    with _open_lock:
+        entry = _open.get(key)
+        if entry is not None and entry[0] == signature:
+            _open.move_to_end(key)
+            return entry[1]
+    snapshot = BinarySnapshot(file_path)
+    with _open_lock:
+        # A replaced or evicted snapshot is not closed: it stays mapped for
+        # readers still holding it and is unmapped once they drop it
+        _open[key] = (signature, snapshot)
+        _open.move_to_end(key)
+        while len(_open) > _OPEN_SNAPSHOTS:
+            _open.popitem(last=False)
+    return snapshot
+
+
+def snapshot_codec(file_path):
+    """Codec of an existing snapshot, or None if there is none."""
+    snapshot = open_snapshot(file_path)
+    return None if snapshot is None else snapshot.codec
+
+
+def resolve_codec(file_path, codec=None):
+    """
+    Pick the codec for writing a snapshot.
+
+    Args:
+        file_path (str): Snapshot about to be written
+        codec (str): Explicit choice, None to use TODO_SNAPSHOT_CODEC, then
+            the codec of the existing file, then "none"
+
+    Returns:
+        str: One of CODECS
+    """
+    codec = codec or os.environ.get(CODEC_ENV) or snapshot_codec(file_path) or "none"
+    if codec not in CODECS:
+        raise ValueError(f"Unknown snapshot codec: {codec}")
+    return codec
+
+
+def read_snapshot(file_path):
+    """Decode every task of a snapshot into a list; empty if there is no file."""
+    snapshot = open_snapshot(file_path)
+    return [] if snapshot is None else list(snapshot)
+
+
+def write_snapshot(file_path, tasks, codec=None):
+    """
+    Atomically replace a snapshot with the given tasks.
+
+    Args:
+        file_path (str): Path to the .tbin file
+        tasks (list): Task dictionaries
+        codec (str): Block compression, see resolve_codec
+
+    Returns:
+        int: Bytes written
+    """
+    from .journal import write_atomic
+    codec = resolve_codec(file_path, codec)
+    written = []
+
+    def write(f):
+        write_tasks(tasks, f, codec)
+        written.append(f.tell())
+
+    write_atomic(file_path, write, binary=True)
+    return written[0]
+
+
+def convert(source, target, codec=None):
+    """
+    Convert a tasks file between formats (JSON, SQLite, binary), journal included.
+
+    Args:
+        source (str): Existing tasks file
+        target (str): File to write; its extension picks the format
+        codec (str): Compression for a binary target
+
+    Returns:
+        int: Number of converted tasks
+    """
+    from .storage import get_storage
+    tasks = get_storage(source).load()
+    storage = get_storage(target)
+    if codec is not None:
+        storage.codec = codec
+    storage.save(tasks)
+    return len(tasks)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert tasks between JSON and .tbin snapshots")
+    parser.add_argument("source")
+    parser.add_argument("target")
+    parser.add_argument("--codec", choices=CODECS, help="compression for a .tbin target")
+    args = parser.parse_args(argv)
+    count = convert(args.source, args.target, args.codec)
+    print(f"Converted {count} tasks into {args.target}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import os
+import threading
+from collections import OrderedDict
+
+# Files whose metadata decides whether a cached task list is still current:
+# the tasks file itself, its change journal and a SQLite write-ahead log
+_WATCHED_SUFFIXES = ("", ".journal", "-wal")
+
+# Files whose tasks (and derived views) are kept; the least recently used
+# file is dropped first, so memory stays bounded however many tenants'
+# files the process touches
+CACHE_CAPACITY = 64
+
+
+def file_signature(file_path):
+    """
+    Describe the on-disk state of a tasks file and its companion files.
+
+    Args:
+        file_path (str): Path to the tasks file
+
+    Returns:
+        tuple: (mtime_ns, size, inode) per watched file, None for missing files
+    """
+    signature = []
+    for suffix in _WATCHED_SUFFIXES:
+        try:
+            st = os.stat(file_path + suffix)
+        except OSError:
+            signature.append(None)
+        else:
+            signature.append((st.st_mtime_ns, st.st_size, st.st_ino))
+    return tuple(signature)
+
+
+class TaskCache:
+    """
+    Process-wide cache of parsed task lists keyed on file metadata.
+
+    An entry is reused while the mtime, size and inode of the tasks file and
+    its journal are unchanged, so every Streamlit rerun and session in the
+    process shares one parsed copy. Cached lists are shared: change them only
+    through the mutation functions, which invalidate the entry. At most
+    capacity files are kept, evicting the least recently used.
+    """
+
+    def __init__(self, capacity=CACHE_CAPACITY):
+        self.capacity = capacity
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, file_path, loader):
+        """
+        Return the cached tasks for a file, loading them on a miss.
+
+        Args:
+            file_path (str): Path to the tasks file
+            loader (callable): Called with file_path to load the tasks
+
+        Returns:
+            list: The (shared) task list
+        """
+        key = os.path.abspath(file_path)
+        signature = file_signature(file_path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry[1]
+            self.misses += 1
+        tasks = loader(file_path)
+        with self._lock:
+            self._entries[key] = (signature, tasks, {})
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+        return tasks
+
+    def derived(self, file_path, name, loader, build):
+        """
+        Return a value computed from the cached tasks, rebuilt when they change.
+
+        Args:
+            file_path (str): Path to the tasks file
+            name (str): Name of the derived value (e.g. "table")
+            loader (callable): Loads the tasks on a cache miss
+            build (callable): Called with the tasks to compute the value
+
+        Returns:
+            object: The derived value for the current file contents
+        """
+        tasks = self.get(file_path, loader)
+        with self._lock:
+            entry = self._entries.get(os.path.abspath(file_path))
+            views = entry[2] if entry is not None and entry[1] is tasks else None
+            if views is not None and name in views:
+                return views[name]
+        value = build(tasks)
+        if views is not None:
+            with self._lock:
+                views[name] = value
+        return value
+
+    def invalidate(self, file_path=None):
+        """Drop the entry for file_path, or every entry if it is None."""
+        with self._lock:
+            if file_path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.abspath(file_path), None)
+
+    def stats(self):
+        """Return hit/miss counters and the number of cached files."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+# Shared by every caller in the process
+task_cache = TaskCache()
@@ -0,0 +1,149 @@
+import json
+import os
+import threading
+from urllib.parse import urlencode, urlsplit
+
+# Set to the service base URL (e.g. http://127.0.0.1:8765) to use the task service
+SERVICE_URL_ENV = "TODO_SERVICE_URL"
+
+
+class ServiceError(Exception):
+    """Error response from the task service."""
+
+    def __init__(self, status, message):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+
+
+class TaskServiceClient:
+    """
+    Blocking client for the task service HTTP/JSON API.
+
+    Each thread keeps one persistent (keep-alive) connection, so the client
+    can be shared between Streamlit sessions.
+    """
+
+    def __init__(self, base_url):
+        url = urlsplit(base_url)
+        self.host = url.hostname
+        self.port = url.port or 80
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Imported on first request: http.client (and the email parser it
+            # pulls in) is not needed by apps that never talk to the service
+            import http.client
+            conn = self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        return conn
+
+    def request(self, method, path, params=None, body=None):
+        """
+        Send one request and decode the JSON response.
+
+        Args:
+            method (str): HTTP method
+            path (str): Request path, e.g. "/tasks"
+            params (dict): Query parameters; None values are left out
+            body (object): JSON-serializable request body
+
+        Returns:
+            object: The decoded response body
+
+        Raises:
+            ServiceError: If the service answers with an error status
+        """
+        if params:
+            query = urlencode({k: v for k, v in params.items() if v is not None})
+            if query:
+                path = f"{path}?{query}"
+        from http.client import HTTPException
+        data = json.dumps(body).encode() if body is not None else None
+        headers = {"Content-Type": "application/json"} if data is not None else {}
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request(method, path, body=data, headers=headers)
+                response = conn.getresponse()
+                payload = json.loads(response.read() or b"null")
+                break
+            except (ConnectionError, HTTPException):
+                # The keep-alive connection was dropped; reconnect once
+                conn.close()
+                self._local.conn = None
+                if attempt:
+                    raise
+        if response.status >= 400:
+            raise ServiceError(response.status, (payload or {}).get("error", response.reason))
+        return payload
+
+    def health(self):
+        """Return the service status and task count."""
+        return self.request("GET", "/health")
+
+    def list_tasks(self, priority=None, category=None, completed=None, limit=None,
+                   text=None, overdue=False, sort=None, descending=False):
+        """Return tasks, optionally filtered and sorted like tasks.query."""
+        if completed is not None:
+            completed = "true" if completed else "false"
+        return self.request("GET", "/tasks", {
+            "priority": priority, "category": category,
+            "completed": completed, "limit": limit, "q": text,
+            "overdue": "true" if overdue else None, "sort": sort,
+            "desc": "true" if descending else None,
+        })
+
+    def get_task(self, task_id):
+        """Return one task by id."""
+        return self.request("GET", f"/tasks/{task_id}")
+
+    def search(self, query, mode=None, limit=None):
+        """Search tasks like search_tasks."""
+        return self.request("GET", "/tasks/search", {"q": query, "mode": mode, "limit": limit})
+
+    def overdue(self, limit=None):
+        """Return overdue tasks."""
+        return self.request("GET", "/tasks/overdue", {"limit": limit})
+
+    def due_soon(self, hours_threshold=24, limit=None):
+        """Return tasks due within the given number of hours."""
+        return self.request("GET", "/tasks/due-soon", {"hours": hours_threshold, "limit": limit})
+
+    def stats(self):
+        """Return the task counters summary (see Aggregates.summary)."""
+        return self.request("GET", "/stats")
+
+    def add_task(self, title, category, **kwargs):
+        """Add a task and return it with its assigned id."""
+        return self.request("POST", "/tasks", body={"title": title, "category": category, **kwargs})
+
+    def update_task(self, task_id, **changes):
+        """Change fields of a task and return the updated task."""
+        return self.request("PATCH", f"/tasks/{task_id}", body=changes)
+
+    def complete_tasks(self, task_ids):
+        """Mark tasks as completed; returns the ids that existed."""
+        return self.request("POST", "/tasks/complete", body={"ids": list(task_ids)})["completed"]
+
+    def delete_task(self, task_id):
+        """Delete a task."""
+        return self.request("DELETE", f"/tasks/{task_id}")
+
+    def close(self):
+        """Close this thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def service_client():
+    """
+    Return a client for the service named by TODO_SERVICE_URL.
+
+    Returns:
+        TaskServiceClient | None: None when the variable is not set
+    """
+    url = os.environ.get(SERVICE_URL_ENV)
+    return TaskServiceClient(url) if url else None
@@ -0,0 +1,574 @@
+"""
+Change feed: the stream of task changes made to a tasks file, by version.
+
+Every mutation function in src/tasks.py (and TaskSession, the task service
+and anything else appending to the journal) writes its changes as journal
+records. A ChangeFeed follows the journal and numbers the records with the
+data version they produce, the same version TaskList.version and
+TaskStorage.version() report:
+
+    {"version": 42, "op": "update", "id": 7, "set": {...}, "old": {...}}
+
+A reader that last saw version 41 asks for since(41) and gets only the
+records after it, which it can apply to the tasks it already holds
+(FeedView does that for an indexed TaskStore). A full save carries no
+per-task records, so after one since() answers None for older versions and
+the reader reloads.
+
+The feed reads the journal incrementally from the byte offset it stopped
+at, so it sees changes from every process, and FeedServer serves it over a
+local socket to workers that want to long-poll instead of polling the file.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import threading
+import time
+import weakref
+
+from . import journal
+from .metrics import metrics
+from .storage import DEFAULT_TASKS_FILE, JsonStorage, get_storage
+from .store import TaskStore
+
+# Events kept in memory per feed (between this and twice as many)
+FEED_CAPACITY = 10_000
+
+# How often waiting readers look at the journal for changes of other processes
+POLL_SECONDS = 0.05
+
+# Longest a feed request may wait for new events
+MAX_WAIT_SECONDS = 30
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8766
+
+# "host:port" or the path of a Unix socket served by FeedServer
+FEED_ADDRESS_ENV = "TODO_FEED_ADDRESS"
+
+# One feed per tasks file, dropped once nobody holds it
+_feeds = weakref.WeakValueDictionary()
+_feeds_lock = threading.Lock()
+
+
+def _stat(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def inverse_record(record):
+    """
+    Build the journal record that undoes an add, update or delete record.
+
+    An update is undone by setting the fields back to its "old" values
+    (fields that did not exist before come back as None).
+
+    Args:
+        record (dict): Journal record or feed event
+
+    Returns:
+        dict: The inverse journal record
+
+    Raises:
+        ValueError: For a record that cannot be undone ("clear")
+    """
+    op = record["op"]
+    if op == "add":
+        return journal.delete_record(record["task"])
+    if op == "delete":
+        return journal.add_record(record["task"])
+    if op == "update":
+        # The counted fields right after the update, for the inverse's "was"
+        after = {**record.get("was", {}), **record["set"]}
+        return journal.update_record(record["id"], record["old"], record["set"], after)
+    raise ValueError(f"Cannot undo a {op!r} change")
+
+
+class ChangeFeed:
+    """
+    Versioned events of one tasks file, read from its journal.
+
+    Events are journal records plus a "version" key; the feed keeps the
+    last capacity of them. Compactions do not interrupt the stream when the
+    feed has read every record they fold in; a full save (or records
+    compacted before the feed saw them) starts it over at the new version.
+
+    Events are shared between readers and must not be changed.
+    """
+
+    def __init__(self, file_path=DEFAULT_TASKS_FILE, capacity=FEED_CAPACITY):
+        self.file_path = file_path
+        self.capacity = capacity
+        self.version = 0
+        self._floor = 0
+        self._events = []
+        self._base = None
+        self._offset = 0
+        self._synced = None
+        self._cond = threading.Condition()
+
+    def _signature(self):
+        return (_stat(journal.journal_path(self.file_path)),
+                _stat(journal.meta_path(self.file_path)))
+
+    def _read_journal(self, restart):
+        """Complete journal lines from the last offset (or the start) on."""
+        try:
+            with open(journal.journal_path(self.file_path), "rb") as f:
+                if not restart and os.fstat(f.fileno()).st_size < self._offset:
+                    # Rewritten without a new snapshot version: nothing to follow
+                    return None
+                f.seek(0 if restart else self._offset)
+                data = f.read()
+        except FileNotFoundError:
+            return b"" if restart or not self._offset else None
+        if metrics.enabled:
+            metrics.add_bytes("read", len(data))
+        return data[:data.rfind(b"\n") + 1]
+
+    def sync(self):
+        """
+        Read the records appended to the journal since the last sync.
+
+        Costs two stat calls when nothing changed.
+
+        Returns:
+            int: The current version
+        """
+        if self._signature() == self._synced:
+            return self.version
+        with journal.locked(self.file_path, shared=True), self._cond:
+            signature = self._signature()
+            base = journal.read_meta(self.file_path).get("version", 0)
+            restart = base != self._base
+            data = self._read_journal(restart)
+            if data is None:
+                restart = True
+                data = self._read_journal(restart)
+            if restart:
+                if base != self.version or self._base is None:
+                    # Records the feed never saw were folded in: start over
+                    self._events.clear()
+                    self._floor = base
+                self.version = base
+                self._base = base
+                self._offset = 0
+            added = 0
+            for line in data.splitlines(keepends=True):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                self._offset += len(line)
+                self.version += 1
+                record["version"] = self.version
+                self._events.append(record)
+                added += 1
+            if len(self._events) > 2 * self.capacity:
+                drop = len(self._events) - self.capacity
+                del self._events[:drop]
+                self._floor += drop
+            self._synced = signature
+            if added or restart:
+                self._cond.notify_all()
+            return self.version
+
+    def since(self, version, wait=0):
+        """
+        Get the events after a version.
+
+        Args:
+            version (int): The last version the caller has seen
+            wait (float): Seconds to wait for an event if there is none yet
+
+        Returns:
+            tuple: (current version, events in order); events is None if
+                they are no longer available (or version is unknown) and the
+                caller has to reload
+        """
+        deadline = time.monotonic() + wait
+        while True:
+            self.sync()
+            with self._cond:
+                if version < self._floor or version > self.version:
+                    return self.version, None
+                if version < self.version:
+                    return self.version, self._events[version - self._floor:]
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return self.version, []
+                self._cond.wait(min(remaining, POLL_SECONDS))
+
+    def inverse(self, steps=1):
+        """
+        Build the records undoing the last steps events, newest first.
+
+        Hold the file's lock while computing and appending them, so no other
+        change slips in between.
+
+        Args:
+            steps (int): Number of events to undo
+
+        Returns:
+            list: Inverse journal records, in the order to apply them
+
+        Raises:
+            ValueError: If fewer events are available, or one cannot be undone
+        """
+        if steps < 0:
+            raise ValueError("steps must not be negative")
+        version = self.sync()
+        _, events = self.since(version - steps)
+        if events is None:
+            raise ValueError(
+                f"Only the last {version - self._floor} changes can be undone"
+            )
+        return [inverse_record(event) for event in reversed(events[len(events) - steps:])]
+
+
+class VersionFeed:
+    """
+    Stand-in feed for a backend without a journal (SQLite).
+
+    It has no per-task events: since() only reports whether the data version
+    moved, so a FeedView over it reloads after every change instead.
+
+    Args:
+        file_path (str): Path to the tasks file
+    """
+
+    def __init__(self, file_path=DEFAULT_TASKS_FILE):
+        self.storage = get_storage(file_path)
+
+    def since(self, version, wait=0):
+        """Same as ChangeFeed.since, with events None whenever the version changed."""
+        deadline = time.monotonic() + wait
+        while True:
+            current = self.storage.version()
+            if current != version:
+                return current, None
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return current, []
+            time.sleep(min(remaining, POLL_SECONDS))
+
+
+def get_feed(file_path=DEFAULT_TASKS_FILE):
+    """
+    Get the process-wide change feed of a tasks file.
+
+    Args:
+        file_path (str): Path to the tasks file
+
+    Returns:
+        ChangeFeed: The feed, shared by every caller holding it
+
+    Raises:
+        ValueError: If the file's backend keeps no journal (SQLite)
+    """
+    storage = get_storage(file_path)
+    if not isinstance(storage, JsonStorage):
+        raise ValueError(f"{storage.file_path} has no journal to follow")
+    key = os.path.abspath(storage.file_path)
+    with _feeds_lock:
+        feed = _feeds.get(key)
+        if feed is None:
+            feed = _feeds[key] = ChangeFeed(storage.file_path)
+        return feed
+
+
+class FeedView:
+    """
+    An indexed TaskStore kept current by applying change feed events.
+
+    refresh() pulls the events after the view's version and patches the
+    store in place, hash, due-date and text indexes included, so a change
+    costs O(changed tasks) instead of a reload of the file. The file is
+    only reloaded when the feed cannot supply the events (e.g. after a
+    full save, or after any change for a backend without a journal). One
+    view can be shared by every session of a process.
+
+    Args:
+        file_path (str): Path to the tasks file
+        feed (ChangeFeed | FeedClient | VersionFeed): Event source, defaults
+            to get_feed(file_path), or a VersionFeed if the backend keeps no
+            journal
+    """
+
+    def __init__(self, file_path=DEFAULT_TASKS_FILE, feed=None):
+        self.file_path = file_path
+        if feed is None:
+            journaled = isinstance(get_storage(file_path), JsonStorage)
+            feed = get_feed(file_path) if journaled else VersionFeed(file_path)
+        self.feed = feed
+        self.store = None
+        self.version = None
+        self.reloads = 0
+        self.applied = 0
+        self.lock = threading.RLock()
+        self.refresh()
+
+    def _reload(self):
+        tasks = get_storage(self.file_path).load()
+        self.store = TaskStore(tasks, tasks.file_path, next_id=tasks.next_id)
+        self.version = tasks.version
+        self.reloads += 1
+
+    def refresh(self, wait=0):
+        """
+        Apply the events since the last refresh.
+
+        Args:
+            wait (float): Seconds to wait for an event if there is none yet
+
+        Returns:
+            list: The applied events, None if the tasks were reloaded
+        """
+        with self.lock:
+            if self.store is not None:
+                version, events = self.feed.since(self.version, wait)
+                if events is not None:
+                    self.store.apply(events)
+                    self.version = version
+                    self.applied += len(events)
+                    return events
+            self._reload()
+            return None
+
+    def due_soon(self, hours_threshold=24, now=None):
+        """Pending tasks due within hours_threshold hours, from the due-date index."""
+        with self.lock:
+            return self.store.due_soon(hours_threshold, now)
+
+
+def _parse_address(address):
+    """(host, port) for "host:port", the path itself for a Unix socket."""
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit() and os.sep not in address:
+        return host or DEFAULT_HOST, int(port)
+    return address
+
+
+class FeedServer:
+    """
+    Serve the change feed of one tasks file over a local socket.
+
+    Requests and responses are single JSON lines:
+
+        {"since": 41, "wait": 10}
+        {"version": 44, "events": [...]}
+
+    "events" is null when the client has to reload. A request with "wait"
+    is answered as soon as an event arrives, or empty after that many
+    seconds (at most MAX_WAIT_SECONDS), so workers can long-poll. One
+    watcher task looks at the journal every POLL_SECONDS for all of them.
+    """
+
+    def __init__(self, file_path=DEFAULT_TASKS_FILE):
+        self.feed = get_feed(file_path)
+        self._server = None
+        self._watcher = None
+        self._changed = None
+        self._version = None
+        self._writers = set()
+
+    async def _watch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            version = await loop.run_in_executor(None, self.feed.sync)
+            if version != self._version:
+                async with self._changed:
+                    self._version = version
+                    self._changed.notify_all()
+            await asyncio.sleep(POLL_SECONDS)
+
+    async def _since(self, version, wait):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + min(wait, MAX_WAIT_SECONDS)
+        while True:
+            current, events = await loop.run_in_executor(None, self.feed.since, version)
+            remaining = deadline - loop.time()
+            if events != [] or remaining <= 0:
+                return current, events
+            async with self._changed:
+                try:
+                    await asyncio.wait_for(
+                        self._changed.wait_for(lambda: self._version != current), remaining
+                    )
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _handle(self, reader, writer):
+        self._writers.add(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                request = json.loads(line)
+                version, events = await self._since(
+                    int(request["since"]), float(request.get("wait", 0))
+                )
+                writer.write(json.dumps({"version": version, "events": events}).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, ValueError, KeyError, TypeError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_socket=None):
+        """
+        Start serving (on a Unix socket if unix_socket is given).
+
+        Returns:
+            int: The bound TCP port (useful with port=0), None for a Unix socket
+        """
+        self._changed = asyncio.Condition()
+        self._watcher = asyncio.get_running_loop().create_task(self._watch())
+        if unix_socket:
+            self._server = await asyncio.start_unix_server(self._handle, path=unix_socket)
+            return None
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def _shutdown(self):
+        self._server.close()
+        for writer in list(self._writers):
+            writer.close()
+        self._watcher.cancel()
+        await asyncio.gather(self._watcher, return_exceptions=True)
+
+    async def serve_forever(self, **kwargs):
+        """Start the server and serve until cancelled."""
+        await self.start(**kwargs)
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self._shutdown()
+
+    def run_in_thread(self, host=DEFAULT_HOST, port=0, unix_socket=None):
+        """
+        Run the server on its own event loop in a daemon thread.
+
+        Returns:
+            int: The bound port, None for a Unix socket
+        """
+        started = threading.Event()
+        bound = {}
+
+        def run():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            bound["port"] = loop.run_until_complete(self.start(host, port, unix_socket))
+            self._loop = loop
+            started.set()
+            try:
+                loop.run_forever()
+            finally:
+                loop.run_until_complete(self._shutdown())
+                loop.close()
+
+        self._thread = threading.Thread(target=run, name="change-feed", daemon=True)
+        self._thread.start()
+        started.wait()
+        return bound["port"]
+
+    def stop(self):
+        """Stop a server started with run_in_thread and wait for its thread."""
+        loop = getattr(self, "_loop", None)
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            self._thread.join()
+            self._loop = None
+
+
+class FeedClient:
+    """
+    Blocking client for a FeedServer, usable wherever a ChangeFeed is.
+
+    Each thread keeps one persistent connection.
+
+    Args:
+        address (str): "host:port" or the path of a Unix socket
+    """
+
+    def __init__(self, address):
+        self.address = _parse_address(address)
+        self._local = threading.local()
+
+    def _connection(self, timeout):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if isinstance(self.address, tuple):
+                sock = socket.create_connection(self.address)
+            else:
+                sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                sock.connect(self.address)
+            conn = self._local.conn = (sock, sock.makefile("rb"))
+        conn[0].settimeout(timeout)
+        return conn
+
+    def since(self, version, wait=0):
+        """Same as ChangeFeed.since, answered by the server."""
+        request = json.dumps({"since": version, "wait": wait}).encode() + b"\n"
+        for attempt in range(2):
+            sock, stream = self._connection(min(wait, MAX_WAIT_SECONDS) + 30)
+            try:
+                sock.sendall(request)
+                line = stream.readline()
+                if not line:
+                    raise ConnectionError("feed server closed the connection")
+                break
+            except ConnectionError:
+                # The connection was dropped; reconnect once
+                self.close()
+                if attempt:
+                    raise
+        response = json.loads(line)
+        return response["version"], response["events"]
+
+    def close(self):
+        """Close this thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn[1].close()
+            conn[0].close()
+            self._local.conn = None
+
+
+def feed_client():
+    """
+    Return a client for the feed server named by TODO_FEED_ADDRESS.
+
+    Returns:
+        FeedClient | None: None when the variable is not set
+    """
+    address = os.environ.get(FEED_ADDRESS_ENV)
+    return FeedClient(address) if address else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the change feed of a tasks file")
+    parser.add_argument("--file", default=DEFAULT_TASKS_FILE, help="tasks file to follow")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix-socket", help="serve on this Unix socket instead of TCP")
+    args = parser.parse_args(argv)
+    server = FeedServer(args.file)
+    print(f"Serving changes of {args.file} from version {server.feed.sync()}")
+    try:
+        asyncio.run(server.serve_forever(
+            host=args.host, port=args.port, unix_socket=args.unix_socket
+        ))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
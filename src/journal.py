@@ -0,0 +1,580 @@
+import json
+import os
+import tempfile
+import threading
+import weakref
+from contextlib import contextmanager
+
+from .aggregates import AGGREGATE_FIELDS, Aggregates
+from .binary import is_binary_path, read_snapshot, write_snapshot
+from .metrics import metrics
+
+try:
+    import fcntl
+except ImportError:  # Windows: only in-process locking is available
+    fcntl = None
+
+# Journal files live next to the snapshot they extend, e.g. tasks.json.journal
+JOURNAL_SUFFIX = ".journal"
+
+# Sidecar file with the id high-water mark, e.g. tasks.json.meta
+META_SUFFIX = ".meta"
+
+# Sidecar with the task counters (see src/aggregates.py), e.g. tasks.json.stats
+STATS_SUFFIX = ".stats"
+
+# Advisory lock file shared by every process using a snapshot, e.g. tasks.json.lock
+LOCK_SUFFIX = ".lock"
+
+# fsync journal appends and snapshot writes before reporting them done
+FSYNC = True
+
+# Fold the journal into the snapshot once it grows past this many bytes
+COMPACT_THRESHOLD_BYTES = 1024 * 1024
+
+# Locks of paths nobody is using are dropped, so a process touching many
+# files (e.g. one per tenant) does not keep one lock per file forever
+_locks = weakref.WeakValueDictionary()
+_locks_guard = threading.Lock()
+_compacting = set()
+_held = {}
+_pending = {}
+
+
+def journal_path(file_path):
+    """Return the journal path that belongs to a snapshot file."""
+    return file_path + JOURNAL_SUFFIX
+
+
+def meta_path(file_path):
+    """Return the metadata sidecar path that belongs to a snapshot file."""
+    return file_path + META_SUFFIX
+
+
+def read_meta(file_path):
+    """
+    Read the metadata sidecar of a snapshot file.
+
+    Args:
+        file_path (str): Path to the snapshot file
+
+    Returns:
+        dict: Stored metadata, empty if there is none or it is unreadable
+    """
+    path = meta_path(file_path)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r") as f:
+            meta = json.loads(f.read())
+    except ValueError:
+        return {}
+    return meta if isinstance(meta, dict) else {}
+
+
+def write_atomic(file_path, write, durable=True, binary=False):
+    """
+    Replace a file so readers see either the old or the new content, never a mix.
+
+    The content goes to a temporary file in the same directory, which is
+    fsynced and then renamed over the target.
+
+    Args:
+        file_path (str): File to replace
+        write (callable): Called with the open text file to write the content
+        durable (bool): fsync the content (when FSYNC is on); derived files
+            that are validated on read can skip it
+        binary (bool): Open the temporary file in binary mode
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=os.path.basename(file_path) + ".", suffix=".tmp", dir=directory
+    )
+    try:
+        with os.fdopen(fd, "wb" if binary else "w") as f:
+            write(f)
+            f.flush()
+            if FSYNC and durable:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def write_meta(file_path, meta):
+    """Atomically replace the metadata sidecar of a snapshot file."""
+    data = json.dumps(meta)
+    write_atomic(meta_path(file_path), lambda f: f.write(data))
+
+
+def stats_path(file_path):
+    """Return the counters sidecar path that belongs to a snapshot file."""
+    return file_path + STATS_SUFFIX
+
+
+def _stats_signature(file_path):
+    """On-disk state of the snapshot and journal the counters describe."""
+    signature = []
+    for path in (file_path, journal_path(file_path)):
+        try:
+            st = os.stat(path)
+        except OSError:
+            signature.append(None)
+        else:
+            signature.append([st.st_mtime_ns, st.st_size, st.st_ino])
+    return signature
+
+
+def read_stats(file_path):
+    """
+    Read the stored counters of a snapshot file in O(1).
+
+    The sidecar records the state of the snapshot and journal it was
+    written for; if either changed since (e.g. a writer that did not update
+    it, or a crash in between), it is treated as missing.
+
+    Args:
+        file_path (str): Path to the snapshot file
+
+    Returns:
+        Aggregates: The counters, None if missing or stale
+    """
+    try:
+        with open(stats_path(file_path), "r") as f:
+            stored = json.load(f)
+        if stored["signature"] != _stats_signature(file_path):
+            return None
+        return Aggregates.from_dict(stored["stats"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def write_stats(file_path, aggregates):
+    """Store counters describing the current snapshot and journal."""
+    data = json.dumps({"signature": _stats_signature(file_path), "stats": aggregates.to_dict()})
+    # No fsync: a sidecar lost in a crash no longer matches and is recomputed
+    write_atomic(stats_path(file_path), lambda f: f.write(data), durable=False)
+
+
+def remove_stats(file_path):
+    """Delete the counters sidecar of a snapshot file if it exists."""
+    try:
+        os.remove(stats_path(file_path))
+    except FileNotFoundError:
+        pass
+
+
+def _update_stats(file_path, records, signature):
+    """Count appended records into the sidecar if it described the data before them."""
+    try:
+        with open(stats_path(file_path), "r") as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        if signature != [None, None]:
+            return
+        # First write of a new file: the counters start from zero
+        stored = {"signature": signature, "stats": Aggregates().to_dict()}
+    aggregates = None
+    if isinstance(stored, dict) and stored.get("signature") == signature:
+        aggregates = Aggregates.from_dict(stored["stats"])
+        if not aggregates.apply(records):
+            aggregates = None
+    if aggregates is None:
+        remove_stats(file_path)
+    else:
+        write_stats(file_path, aggregates)
+
+
+def current_version(file_path, records=None):
+    """
+    Return the version of the data stored at file_path.
+
+    The version counts every change ever made: the snapshot version from the
+    metadata sidecar plus the records still in the journal.
+
+    Args:
+        file_path (str): Path to the snapshot file
+        records (list): Journal records if already read, None to read them
+
+    Returns:
+        int: Monotonic data version
+    """
+    if records is None:
+        records = read_records(file_path)
+    return read_meta(file_path).get("version", 0) + len(records)
+
+
+def next_id(file_path, tasks, records=()):
+    """
+    Compute the next free task id for a snapshot file.
+
+    Ids are never reused: the persisted high-water mark and the ids seen in
+    journal records count even if those tasks were deleted since.
+
+    Args:
+        file_path (str): Path to the snapshot file
+        tasks (list): Current task dictionaries
+        records (list): Journal records that were replayed into tasks
+
+    Returns:
+        int: The next id to allocate
+    """
+    highest = read_meta(file_path).get("next_id", 1) - 1
+    for task in tasks:
+        if task["id"] > highest:
+            highest = task["id"]
+    for record in records:
+        if record["op"] in ("add", "delete") and record["task"]["id"] > highest:
+            highest = record["task"]["id"]
+    return highest + 1
+
+
+def path_lock(file_path):
+    """
+    Get the in-process lock guarding a snapshot and its journal.
+
+    Args:
+        file_path (str): Path to the snapshot file
+
+    Returns:
+        threading.RLock: Lock shared by every caller using the same path
+    """
+    key = os.path.abspath(file_path)
+    with _locks_guard:
+        lock = _locks.get(key)
+        if lock is None:
+            lock = _locks[key] = threading.RLock()
+        return lock
+
+
+@contextmanager
+def locked(file_path, shared=False):
+    """
+    Hold the lock on a snapshot across threads and processes.
+
+    Combines the in-process path_lock with an fcntl advisory lock on
+    <file>.lock. Nested use in the same thread is allowed; the file lock is
+    taken by the outermost call only.
+
+    Args:
+        file_path (str): Path to the snapshot file
+        shared (bool): Take a shared (reader) file lock instead of an exclusive one
+    """
+    key = os.path.abspath(file_path)
+    with path_lock(file_path):
+        if key in _held or fcntl is None:
+            yield
+            return
+        fd = os.open(file_path + LOCK_SUFFIX, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            _held[key] = fd
+            try:
+                yield
+            finally:
+                del _held[key]
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+
+def add_record(task):
+    """Build a journal record for a newly added task."""
+    return {"op": "add", "task": dict(task)}
+
+
+def update_record(task_id, changes, old, task=None):
+    """
+    Build a journal record for changed task fields.
+
+    Args:
+        task_id (int): ID of the changed task
+        changes (dict): New values of the changed fields
+        old (dict): Previous values of the same fields (missing keys are None)
+        task (dict): The task before the change; if a counted field changes,
+            its AGGREGATE_FIELDS are kept as "was" so the counters can be
+            updated from the record alone
+
+    Returns:
+        dict: The journal record
+    """
+    record = {"op": "update", "id": task_id, "set": dict(changes), "old": dict(old)}
+    if task is not None and any(field in changes for field in AGGREGATE_FIELDS):
+        record["was"] = {field: task[field] for field in AGGREGATE_FIELDS if field in task}
+    return record
+
+
+def delete_record(task):
+    """Build a journal record for a deleted task (keeps the full task for undo)."""
+    return {"op": "delete", "id": task["id"], "task": dict(task)}
+
+
+def append_records(file_path, records):
+    """
+    Append change records to the journal of a snapshot file.
+
+    Each record is written as one JSON line, so a single task change costs
+    O(record size) bytes instead of a full rewrite of the snapshot. Appends
+    from concurrent threads are group-committed: whichever caller gets the
+    lock first writes every queued batch with a single write and fsync.
+
+    Args:
+        file_path (str): Path to the snapshot file
+        records (list): Journal records to append
+    """
+    if not records:
+        return
+    entry = {
+        "data": "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records),
+        "records": records,
+        "done": False,
+        "error": None,
+    }
+    key = os.path.abspath(file_path)
+    with _locks_guard:
+        _pending.setdefault(key, []).append(entry)
+    with locked(file_path):
+        if not entry["done"]:
+            with _locks_guard:
+                batch = _pending.pop(key, [])
+            try:
+                data = "".join(e["data"] for e in batch)
+                signature = _stats_signature(file_path)
+                with open(journal_path(file_path), "a") as f:
+                    f.write(data)
+                    f.flush()
+                    if FSYNC:
+                        os.fsync(f.fileno())
+                _update_stats(file_path, [r for e in batch for r in e["records"]], signature)
+            except OSError as error:
+                for e in batch:
+                    e["error"] = error
+                raise
+            finally:
+                for e in batch:
+                    e["done"] = True
+            if metrics.enabled:
+                metrics.add_bytes("written", len(data))
+        if entry["error"] is not None:
+            raise entry["error"]
+    maybe_compact(file_path)
+
+
+def read_records(file_path):
+    """
+    Read all complete records from the journal of a snapshot file.
+
+    A torn last line (e.g. from a crash in the middle of an append) is ignored.
+
+    Args:
+        file_path (str): Path to the snapshot file
+
+    Returns:
+        list: Journal records in the order they were written
+    """
+    path = journal_path(file_path)
+    if not os.path.exists(path):
+        return []
+    with open(path, "r") as f:
+        lines = f.readlines()
+    if metrics.enabled:
+        metrics.add_bytes("read", sum(map(len, lines)))
+    records = []
+    for line in lines:
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError:
+            break
+    return records
+
+
+def replay(tasks, records):
+    """
+    Apply journal records on top of a snapshot.
+
+    Args:
+        tasks (list): Task dictionaries from the snapshot
+        records (list): Journal records to apply in order
+
+    Returns:
+        list: The tasks after every record has been applied
+    """
+    if not records:
+        return tasks
+    by_id = {task["id"]: task for task in tasks}
+    for record in records:
+        op = record["op"]
+        if op == "add":
+            by_id[record["task"]["id"]] = dict(record["task"])
+        elif op == "update":
+            task = by_id.get(record["id"])
+            if task is not None:
+                task.update(record["set"])
+        elif op == "delete":
+            by_id.pop(record["id"], None)
+        elif op == "clear":
+            by_id.clear()
+    return list(by_id.values())
+
+
+def apply_ops(task, ops):
+    """
+    Apply the journal records of one task to it.
+
+    Args:
+        task (dict): The task in the snapshot, None if it is not there
+        ops (list): Records concerning this task, in order
+
+    Returns:
+        dict: The resulting task, None if it ends up deleted
+    """
+    for record in ops:
+        op = record["op"]
+        if op == "add":
+            task = dict(record["task"])
+        elif op == "update" and task is not None:
+            task.update(record["set"])
+        elif op == "delete":
+            task = None
+    return task
+
+
+def group_by_task(records):
+    """
+    Group journal records by the task they concern.
+
+    Args:
+        records (list): Journal records in order
+
+    Returns:
+        tuple: (cleared, ops_by_id) where cleared tells whether a clear
+            record discards the snapshot, and ops_by_id maps task ids to
+            their records after the last clear
+    """
+    cleared = False
+    for i in range(len(records) - 1, -1, -1):
+        if records[i]["op"] == "clear":
+            cleared = True
+            records = records[i + 1:]
+            break
+    ops_by_id = {}
+    for record in records:
+        task_id = record["task"]["id"] if record["op"] == "add" else record["id"]
+        ops_by_id.setdefault(task_id, []).append(record)
+    return cleared, ops_by_id
+
+
+def iter_replay(tasks, records):
+    """
+    Lazily apply journal records on top of a stream of snapshot tasks.
+
+    Only the journal is held in memory; snapshot tasks are patched as they
+    stream past and tasks added by the journal follow at the end.
+
+    Args:
+        tasks (iterable): Task dictionaries from the snapshot
+        records (list): Journal records to apply
+
+    Yields:
+        dict: The tasks after every record has been applied
+    """
+    cleared, ops_by_id = group_by_task(records)
+    if cleared:
+        tasks = ()
+    seen = set()
+    for task in tasks:
+        ops = ops_by_id.get(task["id"])
+        if ops:
+            seen.add(task["id"])
+            task = apply_ops(task, ops)
+            if task is None:
+                continue
+        yield task
+    for task_id, ops in ops_by_id.items():
+        if task_id not in seen:
+            task = apply_ops(None, ops)
+            if task is not None:
+                yield task
+
+
+def remove_journal(file_path):
+    """Delete the journal of a snapshot file if it exists."""
+    try:
+        os.remove(journal_path(file_path))
+    except FileNotFoundError:
+        pass
+
+
+def compact(file_path):
+    """
+    Fold the journal into the snapshot and truncate the journal.
+
+    Args:
+        file_path (str): Path to the snapshot file
+    """
+    with locked(file_path):
+        records = read_records(file_path)
+        if not records:
+            return
+        stats = read_stats(file_path)
+        if is_binary_path(file_path):
+            tasks = read_snapshot(file_path)
+        else:
+            try:
+                with open(file_path, "r") as f:
+                    tasks = json.load(f)
+            except FileNotFoundError:
+                tasks = []
+        tasks = replay(tasks, records)
+        meta = read_meta(file_path)
+        meta["next_id"] = next_id(file_path, tasks, records)
+        meta["version"] = meta.get("version", 0) + len(records)
+        if is_binary_path(file_path):
+            # Keeps the snapshot's codec
+            write_snapshot(file_path, tasks)
+        else:
+            write_atomic(file_path, lambda f: json.dump(tasks, f, indent=2))
+        write_meta(file_path, meta)
+        remove_journal(file_path)
+        if stats is not None:
+            # Same tasks, new files: restamp the counters
+            write_stats(file_path, stats)
+
+
+def maybe_compact(file_path, threshold=None):
+    """
+    Start a background compaction if the journal has grown too large.
+
+    Args:
+        file_path (str): Path to the snapshot file
+        threshold (int): Journal size in bytes that triggers compaction
+
+    Returns:
+        threading.Thread: The compaction thread, or None if none was started
+    """
+    if threshold is None:
+        threshold = COMPACT_THRESHOLD_BYTES
+    try:
+        size = os.path.getsize(journal_path(file_path))
+    except OSError:
+        return None
+    key = os.path.abspath(file_path)
+    with _locks_guard:
+        if size < threshold or key in _compacting:
+            return None
+        _compacting.add(key)
+
+    def run():
+        try:
+            compact(file_path)
+        finally:
+            with _locks_guard:
+                _compacting.discard(key)
+
+    thread = threading.Thread(target=run, name="journal-compact", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,265 @@
+import functools
+import io
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Set to 1 to record metrics from process start (they can also be toggled at runtime)
+METRICS_ENV = "TODO_METRICS"
+# Set to a port number to serve /metrics (Prometheus text) and /metrics.json
+METRICS_PORT_ENV = "TODO_METRICS_PORT"
+
+# Histogram upper bounds: call latency in milliseconds and collection sizes
+LATENCY_BUCKETS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000, float("inf"))
+SIZE_BUCKETS = (10, 100, 1_000, 10_000, 100_000, 1_000_000, float("inf"))
+
+
+class Histogram:
+    """Cumulative-bucket histogram, as exported to Prometheus."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Estimate a quantile as the upper bound of the bucket it falls in."""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return self.buckets[-1]
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "buckets": dict(zip(map(str, self.buckets), self.counts)),
+        }
+
+
+class MetricsRegistry:
+    """
+    Call counts, latency and size histograms and byte counters.
+
+    Recording is off unless enabled; instrumented code then only pays for
+    one attribute check per call.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Drop everything recorded so far."""
+        with self._lock:
+            self.latency = {}
+            self.sizes = {}
+            self.counters = {}
+
+    def _observe(self, table, buckets, name, value):
+        with self._lock:
+            histogram = table.get(name)
+            if histogram is None:
+                histogram = table[name] = Histogram(buckets)
+            histogram.observe(value)
+
+    def observe_latency(self, name, ms):
+        """Record one call of name that took ms milliseconds."""
+        self._observe(self.latency, LATENCY_BUCKETS, name, ms)
+
+    def observe_size(self, name, size):
+        """Record the size of a task collection seen by name."""
+        if self.enabled:
+            self._observe(self.sizes, SIZE_BUCKETS, name, size)
+
+    def count(self, name, n=1):
+        """Add n to a counter."""
+        if self.enabled:
+            with self._lock:
+                self.counters[name] = self.counters.get(name, 0) + n
+
+    def add_bytes(self, direction, n):
+        """Count bytes "read" or "written" by the storage layer."""
+        self.count(f"bytes_{direction}", n)
+
+    def timed(self, name=None, size=None):
+        """
+        Decorator recording the latency of every call.
+
+        Args:
+            name (str): Metric name, defaults to the function name
+            size (str): "arg" to record len() of the first argument (before
+                the call), "result" to record len() of the return value
+        """
+        def decorate(func):
+            label = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                if size == "arg" and args and hasattr(args[0], "__len__"):
+                    self.observe_size(label, len(args[0]))
+                start = time.perf_counter()
+                result = func(*args, **kwargs)
+                self.observe_latency(label, (time.perf_counter() - start) * 1000)
+                if size == "result" and hasattr(result, "__len__"):
+                    self.observe_size(label, len(result))
+                return result
+
+            return wrapper
+        return decorate
+
+    @contextmanager
+    def timer(self, name):
+        """Context manager recording the latency of a block."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_latency(name, (time.perf_counter() - start) * 1000)
+
+    def snapshot(self):
+        """Return everything recorded as a JSON-serializable dictionary."""
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "latency_ms": {k: h.to_dict() for k, h in sorted(self.latency.items())},
+                "sizes": {k: h.to_dict() for k, h in sorted(self.sizes.items())},
+                "counters": dict(sorted(self.counters.items())),
+            }
+
+    def prometheus(self):
+        """Return everything recorded in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for metric, table in (("todo_call_latency_ms", self.latency),
+                                  ("todo_collection_size", self.sizes)):
+                lines.append(f"# TYPE {metric} histogram")
+                for name, histogram in sorted(table.items()):
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f'{metric}_bucket{{name="{name}",le="{le}"}} {cumulative}')
+                    lines.append(f'{metric}_sum{{name="{name}"}} {histogram.sum}')
+                    lines.append(f'{metric}_count{{name="{name}"}} {histogram.count}')
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"# TYPE todo_{name}_total counter")
+                lines.append(f"todo_{name}_total {value}")
+        return "\n".join(lines) + "\n"
+
+
+# Shared by every caller in the process
+metrics = MetricsRegistry(enabled=os.environ.get(METRICS_ENV, "") not in ("", "0"))
+timed = metrics.timed
+
+
+_server = None
+
+
+def serve(port=None, host="127.0.0.1"):
+    """
+    Serve /metrics and /metrics.json from a daemon thread (once per process).
+
+    Args:
+        port (int): Port to bind, defaults to TODO_METRICS_PORT; 0 picks a free one
+        host (str): Interface to bind
+
+    Returns:
+        int: The bound port, or None if no port was given or configured
+    """
+    global _server
+    if _server is not None:
+        return _server.server_address[1]
+    if port is None:
+        port = os.environ.get(METRICS_PORT_ENV)
+        if not port:
+            return None
+    # Imported here: http.server is costly and only needed when serving
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body, content_type = metrics.prometheus(), "text/plain; version=0.0.4"
+            elif self.path == "/metrics.json":
+                body, content_type = json.dumps(metrics.snapshot()), "application/json"
+            else:
+                self.send_error(404)
+                return
+            data = body.encode()
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    _server = ThreadingHTTPServer((host, int(port)), MetricsHandler)
+    threading.Thread(target=_server.serve_forever, name="metrics", daemon=True).start()
+    return _server.server_address[1]
+
+
+class ProfileResult:
+    """Filled in by capture_profile when its block exits."""
+
+    def __init__(self):
+        self.text = None
+        self.stats = None
+
+
+@contextmanager
+def capture_profile(enabled=True, sort="cumulative", limit=30):
+    """
+    Profile a block with cProfile.
+
+    Args:
+        enabled (bool): Profile only if True, so callers need no branch
+        sort (str): pstats sort key
+        limit (int): Number of functions in the text report
+
+    Yields:
+        ProfileResult: Holds the stats and a text report after the block
+    """
+    result = ProfileResult()
+    if not enabled:
+        yield result
+        return
+    import cProfile
+    import pstats
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield result
+    finally:
+        profiler.disable()
+        out = io.StringIO()
+        result.stats = pstats.Stats(profiler, stream=out).sort_stats(sort)
+        result.stats.print_stats(limit)
+        result.text = out.getvalue()
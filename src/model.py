@@ -0,0 +1,386 @@
+import threading
+from array import array
+from datetime import date, datetime
+
+# String formats of the date fields in the JSON task shape
+DATE_FORMAT = "%Y-%m-%d"
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Code stored for a field the task dictionary does not have
+MISSING = -1
+
+# Fields with a dedicated slot/column; anything else is kept in "extra"
+CORE_FIELDS = (
+    "id", "title", "description", "priority", "category",
+    "completed", "due_date", "created_at",
+)
+
+_SECONDS_PER_DAY = 86400
+
+
+class Interner:
+    """
+    Map repeated values (priorities, categories) to small integer codes.
+
+    Each distinct value is stored once; tasks only hold its code.
+    """
+
+    def __init__(self, values=()):
+        self._codes = {}
+        self.values = []
+        self._lock = threading.Lock()
+        for value in values:
+            self.code(value)
+
+    def code(self, value):
+        """Return the code for a value, assigning a new one if needed (thread-safe)."""
+        code = self._codes.get(value)
+        if code is None:
+            with self._lock:
+                code = self._codes.get(value)
+                if code is None:
+                    # The value goes in first, so a published code always resolves
+                    self.values.append(value)
+                    code = self._codes[value] = len(self.values) - 1
+        return code
+
+    def lookup(self, value):
+        """Return the code for a value, or None if it was never interned."""
+        return self._codes.get(value)
+
+    def value(self, code):
+        """Return the value behind a code."""
+        return self.values[code]
+
+
+# Process-wide tables, so codes are comparable across Task and TaskTable
+PRIORITIES = Interner(["High", "Medium", "Low"])
+CATEGORIES = Interner()
+
+
+def date_to_ordinal(value):
+    """
+    Convert a "%Y-%m-%d" string to a proleptic Gregorian ordinal.
+
+    Returns None unless the string is exactly what the ordinal formats back
+    to, so the conversion is always lossless.
+    """
+    if not isinstance(value, str) or len(value) != 10:
+        return None
+    try:
+        ordinal = date.fromisoformat(value).toordinal()
+    except ValueError:
+        return None
+    return ordinal if date.fromordinal(ordinal).isoformat() == value else None
+
+
+def ordinal_to_date(ordinal):
+    """Format an ordinal back to a "%Y-%m-%d" string."""
+    return date.fromordinal(ordinal).isoformat()
+
+
+def datetime_to_seconds(value):
+    """
+    Convert a "%Y-%m-%d %H:%M:%S" string to seconds since 0001-01-01.
+
+    Returns None unless the conversion is lossless.
+    """
+    if not isinstance(value, str) or len(value) != 19:
+        return None
+    try:
+        dt = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    # fromisoformat (unlike strptime) also takes other layouts; keep only the canonical one
+    if dt.tzinfo is not None or dt.isoformat(" ") != value:
+        return None
+    return (dt.toordinal() * _SECONDS_PER_DAY
+            + dt.hour * 3600 + dt.minute * 60 + dt.second)
+
+
+def seconds_to_datetime(seconds):
+    """Format seconds since 0001-01-01 back to a "%Y-%m-%d %H:%M:%S" string."""
+    days, rest = divmod(seconds, _SECONDS_PER_DAY)
+    dt = datetime.fromordinal(days)
+    hours, rest = divmod(rest, 3600)
+    minutes, secs = divmod(rest, 60)
+    return dt.replace(hour=hours, minute=minutes, second=secs).strftime(DATETIME_FORMAT)
+
+
+def _intern(interner, task, field, extra):
+    if field not in task:
+        return MISSING
+    value = task[field]
+    try:
+        return interner.code(value)
+    except TypeError:  # unhashable values are kept as they are
+        extra[field] = value
+        return MISSING
+
+
+def _encode(task):
+    """Split a task dictionary into compact core values and leftover fields."""
+    extra = {key: value for key, value in task.items() if key not in CORE_FIELDS}
+    completed = task.get("completed", MISSING)
+    if completed is not MISSING and not isinstance(completed, bool):
+        extra["completed"] = completed
+        completed = MISSING
+    due = MISSING
+    if "due_date" in task:
+        due = date_to_ordinal(task["due_date"])
+        if due is None:
+            extra["due_date"] = task["due_date"]
+            due = MISSING
+    created = MISSING
+    if "created_at" in task:
+        created = datetime_to_seconds(task["created_at"])
+        if created is None:
+            extra["created_at"] = task["created_at"]
+            created = MISSING
+    for field in ("title", "description"):
+        if field in task and not isinstance(task[field], str):
+            extra[field] = task[field]
+    return (
+        task["id"],
+        task["title"] if isinstance(task.get("title"), str) else None,
+        task["description"] if isinstance(task.get("description"), str) else None,
+        _intern(PRIORITIES, task, "priority", extra),
+        _intern(CATEGORIES, task, "category", extra),
+        MISSING if completed is MISSING else int(completed),
+        due,
+        created,
+        extra or None,
+    )
+
+
+def _decode(task_id, title, description, priority, category, completed, due, created, extra):
+    """Rebuild the task dictionary from compact core values."""
+    task = {"id": task_id}
+    if title is not None:
+        task["title"] = title
+    if description is not None:
+        task["description"] = description
+    if priority != MISSING:
+        task["priority"] = PRIORITIES.value(priority)
+    if category != MISSING:
+        task["category"] = CATEGORIES.value(category)
+    if completed != MISSING:
+        task["completed"] = bool(completed)
+    if due != MISSING:
+        task["due_date"] = ordinal_to_date(due)
+    if created != MISSING:
+        task["created_at"] = seconds_to_datetime(created)
+    if extra:
+        task.update(extra)
+    return task
+
+
+class Task:
+    """
+    Compact task record.
+
+    Dates are stored as integers (ordinal days, seconds), priority and
+    category as interned codes, and only non-standard fields or values that
+    would not round-trip go into the extra dictionary. from_dict/to_dict
+    convert losslessly to and from the JSON task shape.
+    """
+
+    __slots__ = (
+        "id", "title", "description", "priority", "category",
+        "completed", "due", "created", "extra",
+    )
+
+    def __init__(self, id, title=None, description=None, priority=MISSING,
+                 category=MISSING, completed=MISSING, due=MISSING,
+                 created=MISSING, extra=None):
+        self.id = id
+        self.title = title
+        self.description = description
+        self.priority = priority
+        self.category = category
+        self.completed = completed
+        self.due = due
+        self.created = created
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, task):
+        """Build a Task from a task dictionary."""
+        return cls(*_encode(task))
+
+    def to_dict(self):
+        """Return the task as a JSON-shaped dictionary."""
+        return _decode(*(getattr(self, slot) for slot in self.__slots__))
+
+    def __eq__(self, other):
+        if not isinstance(other, Task):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"Task({self.to_dict()!r})"
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+class TaskTable:
+    """
+    Column-oriented task collection.
+
+    Each core field lives in its own typed array (NumPy copies are available
+    through column() when NumPy is installed); titles and descriptions are
+    kept in plain lists and leftover fields in a sparse dictionary. Iterating
+    yields task dictionaries, so the filter functions accept a TaskTable.
+    """
+
+    _INT_COLUMNS = (
+        ("id", "q"), ("priority", "i"), ("category", "i"),
+        ("completed", "b"), ("due", "i"), ("created", "q"),
+    )
+
+    def __init__(self):
+        for name, typecode in self._INT_COLUMNS:
+            setattr(self, name, array(typecode))
+        self.title = []
+        self.description = []
+        self.extra = {}
+        self._columns = {}
+
+    @classmethod
+    def from_dicts(cls, tasks):
+        """Build a table from an iterable of task dictionaries."""
+        table = cls()
+        for task in tasks:
+            table.append(task)
+        return table
+
+    def append(self, task):
+        """Append a task dictionary as a new row."""
+        (task_id, title, description, priority, category,
+         completed, due, created, extra) = _encode(task)
+        row = len(self.id)
+        self.id.append(task_id)
+        self.title.append(title)
+        self.description.append(description)
+        self.priority.append(priority)
+        self.category.append(category)
+        self.completed.append(completed)
+        self.due.append(due)
+        self.created.append(created)
+        if extra:
+            self.extra[row] = extra
+
+    def __len__(self):
+        return len(self.id)
+
+    def row(self, i):
+        """Return row i as a task dictionary."""
+        return _decode(
+            self.id[i], self.title[i], self.description[i], self.priority[i],
+            self.category[i], self.completed[i], self.due[i], self.created[i],
+            self.extra.get(i),
+        )
+
+    def __iter__(self):
+        return (self.row(i) for i in range(len(self)))
+
+    def to_dicts(self):
+        """Return every row as a list of task dictionaries."""
+        return list(self)
+
+    def column(self, name):
+        """
+        Return an integer column, as a NumPy array when NumPy is installed.
+
+        Args:
+            name (str): One of id, priority, category, completed, due, created
+
+        Returns:
+            numpy.ndarray | array.array: The column values
+        """
+        values = getattr(self, name)
+        numpy = _numpy()
+        if numpy is None:
+            return values
+        # Rows are only ever appended, so a copy stays valid while the length matches
+        cached = self._columns.get(name)
+        if cached is None or len(cached) != len(values):
+            # Copy, since a live view would stop the array from growing
+            cached = numpy.frombuffer(values, dtype=values.typecode).copy()
+            self._columns[name] = cached
+        return cached
+
+    def _is_pending(self, i):
+        """Slow-path check for a row whose completion flag is not a bool."""
+        extra = self.extra.get(i)
+        return not (extra and extra.get("completed", False))
+
+    def due_between_rows(self, first_day, last_day):
+        """
+        Find pending rows whose due date lies in a range of ordinal days.
+
+        Runs as vectorized comparisons over the due and completed columns
+        (NumPy when installed); rows without a valid due date never match.
+
+        Args:
+            first_day (int): First ordinal day in range (inclusive)
+            last_day (int): Last ordinal day in range (inclusive)
+
+        Returns:
+            list: Matching row indices in row order
+        """
+        numpy = _numpy()
+        if numpy is not None:
+            due = self.column("due")
+            completed = self.column("completed")
+            mask = (due >= first_day) & (due <= last_day) & (due != MISSING) & (completed != 1)
+            rows = numpy.flatnonzero(mask).tolist()
+        else:
+            completed = self.completed
+            rows = [
+                i for i, day in enumerate(self.due)
+                if first_day <= day <= last_day and day != MISSING and completed[i] != 1
+            ]
+        return [i for i in rows if self.completed[i] != MISSING or self._is_pending(i)]
+
+    def overdue_rows(self, today):
+        """
+        Find pending rows due before an ordinal day.
+
+        Matches get_overdue_tasks: a task without a due_date counts as
+        overdue, and a malformed due_date is compared as a string.
+
+        Args:
+            today (int): Ordinal day of today
+
+        Returns:
+            list: Matching row indices in row order
+        """
+        numpy = _numpy()
+        if numpy is not None:
+            due = self.column("due")
+            pending = self.column("completed") != 1
+            rows = numpy.flatnonzero(pending & (due < today) & (due != MISSING)).tolist()
+            odd = numpy.flatnonzero(pending & (due == MISSING)).tolist()
+        else:
+            completed = self.completed
+            rows, odd = [], []
+            for i, day in enumerate(self.due):
+                if completed[i] != 1:
+                    if day == MISSING:
+                        odd.append(i)
+                    elif day < today:
+                        rows.append(i)
+        today_str = ordinal_to_date(today)
+        for i in odd:
+            raw = (self.extra.get(i) or {}).get("due_date", "")
+            if isinstance(raw, str) and raw < today_str:
+                rows.append(i)
+        rows.sort()
+        return [i for i in rows if self.completed[i] != MISSING or self._is_pending(i)]
@@ -0,0 +1,304 @@
+"""
+Composite task queries evaluated in one pass.
+
+A Query combines the filters of the filter_tasks_by_* functions, text
+search and due-date ranges. Running it:
+
+1. plans: estimates each predicate's selectivity (exact index counts for a
+   TaskStore, a sample of the tasks otherwise) and orders the predicates so
+   the ones eliminating the most tasks per unit of cost run first; a
+   TaskStore may also start from its smallest matching index bucket or
+   due-date range instead of every task
+2. composes the ordered predicates into a single function, so each task is
+   tested with one call and no intermediate lists are built
+3. keeps the top `limit` tasks with a heap when sorting, instead of sorting
+   every match
+
+Results for a TaskStore or TaskTable are memoized per data version.
+"""
+import heapq
+import threading
+import weakref
+from collections import OrderedDict
+from datetime import datetime
+from itertools import islice
+
+from .model import PRIORITIES, TaskTable
+from .store import INDEXED_FIELDS, TaskStore
+
+# Fields results can be sorted by (missing values always sort last)
+SORT_FIELDS = ("due_date", "priority", "title", "category", "created_at", "id")
+
+# Memoized results kept per collection
+MEMO_SIZE = 32
+
+# Tasks looked at to estimate selectivities
+_SAMPLE = 64
+
+# Use an index only if it leaves at most this fraction of the tasks
+_INDEX_FRACTION = 0.25
+
+
+def _equals(field):
+    return lambda v: lambda t: t.get(field) == v
+
+
+def _text(v):
+    return lambda t: v in t.get("title", "").lower() or v in t.get("description", "").lower()
+
+
+def _both(first, rest):
+    return lambda t: first(t) and rest(t)
+
+
+# Predicate name -> (value -> test of a task t, relative cost)
+_PREDICATES = {
+    "priority": (_equals("priority"), 1),
+    "category": (_equals("category"), 1),
+    "completed": (_equals("completed"), 1),
+    "due_before": (lambda v: lambda t: t.get("due_date", "") < v, 2),
+    "due_after": (lambda v: lambda t: t.get("due_date", "") >= v, 2),
+    "overdue": (lambda v: lambda t: not t.get("completed", False) and t.get("due_date", "") < v, 3),
+    "text": (_text, 8),
+}
+
+
+class Query:
+    """
+    Normalized, hashable description of a task query.
+
+    Args:
+        priority (str): Priority to match
+        category (str): Category to match
+        completed (bool): Completion status to match
+        text (str): Case-insensitive substring of the title or description
+        due_before (str): Exclusive upper bound for due_date ("%Y-%m-%d")
+        due_after (str): Inclusive lower bound for due_date ("%Y-%m-%d")
+        overdue (bool): Only pending tasks due before today, like get_overdue_tasks
+        sort (str): One of SORT_FIELDS, None to keep the collection's order
+        descending (bool): Reverse the sort
+        limit (int): Maximum number of results, None for all
+        today (str): Reference day for overdue, defaults to today
+    """
+
+    __slots__ = ("priority", "category", "completed", "text", "due_before",
+                 "due_after", "overdue", "sort", "descending", "limit")
+
+    def __init__(self, priority=None, category=None, completed=None, text=None,
+                 due_before=None, due_after=None, overdue=False, sort=None,
+                 descending=False, limit=None, today=None):
+        if sort is not None and sort not in SORT_FIELDS:
+            raise ValueError(f"Cannot sort by {sort!r}")
+        if limit is not None and limit < 0:
+            raise ValueError("limit must not be negative")
+        if overdue:
+            overdue = today or datetime.now().strftime("%Y-%m-%d")
+        self.priority = priority
+        self.category = category
+        self.completed = completed
+        self.text = text.lower() if text else None
+        self.due_before = due_before
+        self.due_after = due_after
+        # The reference day, so memoized overdue results expire at midnight
+        self.overdue = overdue or None
+        self.sort = sort
+        self.descending = bool(descending)
+        self.limit = limit
+
+    def key(self):
+        return tuple(getattr(self, slot) for slot in self.__slots__)
+
+    def predicates(self):
+        """The active filters as (predicate name, value) pairs."""
+        return [
+            (name, getattr(self, name)) for name in _PREDICATES
+            if getattr(self, name) is not None
+        ]
+
+
+def compile_predicates(predicates):
+    """
+    Compose predicates into one function testing a task dictionary.
+
+    Each value is bound in a closure; no source code is generated.
+
+    Args:
+        predicates (list): (predicate name, value) pairs, in evaluation order
+
+    Returns:
+        callable: task -> bool, short-circuiting in the given order
+    """
+    if not predicates:
+        return lambda t: True
+    tests = [_PREDICATES[name][0](value) for name, value in predicates]
+    test = tests.pop()
+    # Nest from the last predicate back, so the first one is tested first
+    for first in reversed(tests):
+        test = _both(first, test)
+    return test
+
+
+def _sample(tasks):
+    """A few tasks spread over the collection, or None if it cannot be sampled."""
+    if isinstance(tasks, list):
+        step = max(1, len(tasks) // _SAMPLE)
+        return tasks[::step][:_SAMPLE]
+    if isinstance(tasks, (TaskStore, TaskTable)):
+        return list(islice(tasks, _SAMPLE))
+    return None
+
+
+def _selectivity(tasks, name, value, sample):
+    """Estimated fraction of tasks passing one predicate."""
+    if isinstance(tasks, TaskStore) and len(tasks):
+        if name in INDEXED_FIELDS:
+            return tasks.count_by(name, value) / len(tasks)
+        if name == "overdue":
+            return tasks.count_due(end=value) / len(tasks)
+    if not sample:
+        return 0.5
+    test = compile_predicates([(name, value)])
+    # Smoothed, so a predicate no sampled task passes still counts as imperfect
+    return (sum(1 for task in sample if test(task)) + 1) / (len(sample) + 2)
+
+
+def plan(tasks, q):
+    """
+    Order the predicates of a query and pick where to start for a TaskStore.
+
+    Predicates are ranked by cost / (1 - selectivity), the expected cost per
+    task they eliminate.
+
+    Args:
+        tasks (iterable | TaskStore | TaskTable): The collection to query
+        q (Query): The query
+
+    Returns:
+        tuple: (ordered predicates, candidate tasks or None to scan everything)
+    """
+    predicates = q.predicates()
+    sample = _sample(tasks) if len(predicates) > 1 else None
+    ranked = []
+    for name, value in predicates:
+        selectivity = _selectivity(tasks, name, value, sample)
+        ranked.append((_PREDICATES[name][1] / max(1e-9, 1 - selectivity), name, value))
+    ranked.sort(key=lambda item: item[0])
+    ordered = [(name, value) for _, name, value in ranked]
+    return ordered, _candidates(tasks, q)
+
+
+def _candidates(tasks, q):
+    """Tasks from the smallest usable TaskStore index, if it is small enough."""
+    if not isinstance(tasks, TaskStore):
+        return None
+    best = None
+    for field in INDEXED_FIELDS:
+        value = getattr(q, field)
+        if value is not None:
+            count = tasks.count_by(field, value)
+            if best is None or count < best[0]:
+                best = (count, lambda field=field, value=value: tasks.filter_by(field, value))
+    # Pending tasks are indexed by due date
+    if q.completed is False or q.overdue:
+        ends = [end for end in (q.due_before, q.overdue) if end is not None]
+        end = min(ends) if ends else None
+        if end is not None or q.due_after is not None:
+            count = tasks.count_due(q.due_after, end)
+            if best is None or count < best[0]:
+                best = (count, lambda: tasks.due_range(q.due_after, end))
+    if best is None or best[0] > len(tasks) * _INDEX_FRACTION:
+        return None
+    # Back into iteration order, so the plan never changes unsorted results
+    return sorted(best[1](), key=lambda task: tasks.position(task["id"]))
+
+
+def _sort_key(field, descending):
+    """Key putting missing (or mistyped) values last in either direction."""
+    last = 0 if descending else 1
+    if field == "priority":
+        def value(task):
+            return PRIORITIES.lookup(task.get("priority"))
+    elif field == "id":
+        value = lambda task: task["id"]
+    else:
+        def value(task):
+            v = task.get(field)
+            return v if isinstance(v, str) else None
+
+    def key(task):
+        v = value(task)
+        return (last, "") if v is None or v == "" else (1 - last, v)
+    return key
+
+
+def execute(tasks, q):
+    """
+    Run a query without memoization.
+
+    Args:
+        tasks (iterable | TaskStore | TaskTable): The collection to query
+        q (Query): The query
+
+    Returns:
+        list: Matching task dictionaries
+    """
+    predicates, candidates = plan(tasks, q)
+    test = compile_predicates(predicates)
+    matches = (task for task in (tasks if candidates is None else candidates) if test(task))
+    if q.sort is None:
+        return list(matches if q.limit is None else islice(matches, q.limit))
+    key = _sort_key(q.sort, q.descending)
+    if q.limit is None:
+        return sorted(matches, key=key, reverse=q.descending)
+    select = heapq.nlargest if q.descending else heapq.nsmallest
+    return select(q.limit, matches, key=key)
+
+
+_memo = weakref.WeakKeyDictionary()
+_memo_lock = threading.Lock()
+
+
+def _version(tasks):
+    """Data version of a memoizable collection, None for any other."""
+    if isinstance(tasks, TaskStore):
+        return tasks.version
+    if isinstance(tasks, TaskTable):
+        # Tables only ever grow
+        return len(tasks)
+    return None
+
+
+def run(tasks, q):
+    """
+    Run a query, reusing the result of an identical one on the same data.
+
+    TaskStore results are reused until the store's next mutation, TaskTable
+    results until a row is appended; other collections are always scanned.
+
+    Args:
+        tasks (iterable | TaskStore | TaskTable): The collection to query
+        q (Query): The query
+
+    Returns:
+        list: Matching task dictionaries (a new list on every call)
+    """
+    version = _version(tasks)
+    if version is None:
+        return execute(tasks, q)
+    key = q.key()
+    with _memo_lock:
+        entry = _memo.get(tasks)
+        if entry is not None and entry[0] == version:
+            results = entry[1]
+            if key in results:
+                results.move_to_end(key)
+                return list(results[key])
+    result = execute(tasks, q)
+    with _memo_lock:
+        entry = _memo.get(tasks)
+        if entry is None or entry[0] != version:
+            entry = _memo[tasks] = (version, OrderedDict())
+        entry[1][key] = result
+        if len(entry[1]) > MEMO_SIZE:
+            entry[1].popitem(last=False)
+    return list(result)
@@ -0,0 +1,279 @@
+import calendar
+import re
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+DATE_FORMAT = "%Y-%m-%d"
+
+# Task fields: the rule text, the date its occurrences are counted from and
+# the due date of the most recently completed occurrence
+RULE_FIELD = "recurrence"
+START_FIELD = "recurrence_start"
+LAST_COMPLETED_FIELD = "last_completed"
+
+# Cron rules are searched day by day; no valid rule skips more than this
+# (Feb 29 recurs within 8 years)
+_CRON_HORIZON_DAYS = 8 * 366
+
+_UNITS = {"day": "daily", "week": "weekly", "month": "monthly", "year": "yearly"}
+_EVERY = re.compile(r"every\s+(\d+)\s+(day|week|month|year)s?")
+
+
+class RecurrenceRule:
+    """
+    A parsed recurrence rule, at the day granularity of task due dates.
+
+    Rules are written as text and stored on the task as is:
+
+        daily, weekly, monthly, yearly     every day/week/month/year
+        every 3 days, every 2 months       the same with an interval
+        weekdays                           Monday to Friday
+        cron 1,15 * *                      cron day-of-month, month and
+        cron * * 1-5                       day-of-week fields (0 = Sunday)
+
+    Interval rules count from a start date: monthly and yearly ones keep its
+    day of the month, falling back to the last day of shorter months.
+    """
+
+    def __init__(self, text, unit=None, interval=1, days=None, months=None, weekdays=None):
+        self.text = text
+        self.unit = unit
+        self.interval = interval
+        self.days = days
+        self.months = months
+        self.weekdays = weekdays
+
+    def __repr__(self):
+        return f"RecurrenceRule({self.text!r})"
+
+    def _nth(self, start, n):
+        """The n-th occurrence of an interval rule counted from start."""
+        if self.unit == "daily":
+            return start + timedelta(days=n * self.interval)
+        if self.unit == "weekly":
+            return start + timedelta(weeks=n * self.interval)
+        months = n * self.interval * (12 if self.unit == "yearly" else 1)
+        year, month = divmod(start.month - 1 + months, 12)
+        year += start.year
+        day = min(start.day, calendar.monthrange(year, month + 1)[1])
+        return date(year, month + 1, day)
+
+    def _matches(self, day):
+        if self.months is not None and day.month not in self.months:
+            return False
+        # Like cron, a restricted day of month and day of week match either
+        weekday = (day.weekday() + 1) % 7
+        if self.days is not None and self.weekdays is not None:
+            return day.day in self.days or weekday in self.weekdays
+        if self.days is not None:
+            return day.day in self.days
+        return self.weekdays is None or weekday in self.weekdays
+
+    def next_on_or_after(self, day, start):
+        """
+        First occurrence on or after day.
+
+        Args:
+            day (date): Earliest acceptable date
+            start (date): Date the rule counts from (nothing occurs before it)
+
+        Returns:
+            date: The occurrence, or None if the rule never matches again
+        """
+        day = max(day, start)
+        if self.unit is None:
+            for offset in range(_CRON_HORIZON_DAYS):
+                candidate = day + timedelta(days=offset)
+                if self._matches(candidate):
+                    return candidate
+            return None
+        if self.unit in ("daily", "weekly"):
+            step = self.interval * (7 if self.unit == "weekly" else 1)
+            n = -(-(day - start).days // step)
+        else:
+            step = self.interval * (12 if self.unit == "yearly" else 1)
+            n = max(0, ((day.year - start.year) * 12 + day.month - start.month) // step)
+        while self._nth(start, n) < day:
+            n += 1
+        return self._nth(start, n)
+
+    def dates(self, first, start):
+        """Lazily yield every occurrence from first onwards."""
+        day = self.next_on_or_after(first, start)
+        while day is not None:
+            yield day
+            day = self.next_on_or_after(day + timedelta(days=1), start)
+
+
+def _field(text, low, high):
+    """Parse one cron field ("*", "*/n", "a", "a-b", "a-b/n", comma lists)."""
+    if text == "*":
+        return None
+    values = set()
+    for part in text.split(","):
+        spec, _, step = part.partition("/")
+        if spec == "*":
+            first, last = low, high
+        elif "-" in spec:
+            first, last = (int(value) for value in spec.split("-", 1))
+        else:
+            first = last = int(spec)
+        if not low <= first <= last <= high:
+            raise ValueError(f"Cron field {part!r} is out of range {low}-{high}")
+        values.update(range(first, last + 1, int(step) if step else 1))
+    return frozenset(values)
+
+
+@lru_cache(maxsize=1024)
+def parse_rule(text):
+    """
+    Parse a recurrence rule (cached, so rules shared by many tasks parse once).
+
+    Args:
+        text (str): Rule text, see RecurrenceRule
+
+    Returns:
+        RecurrenceRule: The parsed rule
+
+    Raises:
+        ValueError: If the rule is not understood
+    """
+    spec = " ".join(str(text).lower().split())
+    if spec in _UNITS.values():
+        return RecurrenceRule(text, unit=spec)
+    if spec == "weekdays":
+        return RecurrenceRule(text, weekdays=frozenset(range(1, 6)))
+    match = _EVERY.fullmatch(spec)
+    if match:
+        interval = int(match.group(1))
+        if interval < 1:
+            raise ValueError(f"Recurrence interval must be positive: {text!r}")
+        return RecurrenceRule(text, unit=_UNITS[match.group(2)], interval=interval)
+    fields = spec.split()
+    if len(fields) == 4 and fields[0] == "cron":
+        try:
+            days, months, weekdays = (
+                _field(fields[1], 1, 31), _field(fields[2], 1, 12), _field(fields[3], 0, 7)
+            )
+        except ValueError as e:
+            raise ValueError(f"Invalid cron rule {text!r}: {e}") from None
+        if weekdays is not None and 7 in weekdays:
+            weekdays = (weekdays - {7}) | {0}  # 7 is Sunday too
+        return RecurrenceRule(text, days=days, months=months, weekdays=weekdays)
+    raise ValueError(f"Unknown recurrence rule: {text!r}")
+
+
+def as_date(value):
+    """Convert a date, datetime or "%Y-%m-%d" string to a date."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(value, DATE_FORMAT).date()
+
+
+def is_recurring(task):
+    """True if the task has a recurrence rule."""
+    return bool(task.get(RULE_FIELD))
+
+
+def first_due_date(rule, due_date):
+    """
+    Snap a new recurring task's due date onto its rule.
+
+    Args:
+        rule (str): Rule text
+        due_date (str): Requested first due date ("%Y-%m-%d")
+
+    Returns:
+        str: The first occurrence on or after due_date
+
+    Raises:
+        ValueError: If the rule is invalid or never occurs
+    """
+    day = as_date(due_date)
+    first = parse_rule(rule).next_on_or_after(day, day)
+    if first is None:
+        raise ValueError(f"Recurrence rule {rule!r} never occurs")
+    return first.strftime(DATE_FORMAT)
+
+
+def occurrences(task, start=None, end=None):
+    """
+    Lazily yield the pending occurrences of a task within a window.
+
+    The task's due_date is its next pending occurrence, so earlier ones are
+    never generated; a task without a rule yields at most its due date.
+
+    Args:
+        task (dict): Task dictionary
+        start (date | datetime | str): First day of the window, None for no bound
+        end (date | datetime | str): Last day of the window (inclusive), None
+            for an unbounded generator
+
+    Yields:
+        str: Occurrence dates ("%Y-%m-%d") in order
+    """
+    if task.get("completed", False) or not isinstance(task.get("due_date"), str):
+        return
+    start = None if start is None else as_date(start)
+    end = None if end is None else as_date(end)
+    try:
+        due = as_date(task["due_date"])
+        anchor = as_date(task.get(START_FIELD) or task["due_date"])
+    except (TypeError, ValueError):
+        # A malformed date has no occurrences, like everywhere else
+        return
+    first = due if start is None else max(due, start)
+    if not is_recurring(task):
+        if first == due and (end is None or due <= end):
+            yield task["due_date"]
+        return
+    rule = parse_rule(task[RULE_FIELD])
+    for day in rule.dates(first, anchor):
+        if end is not None and day > end:
+            return
+        yield day.strftime(DATE_FORMAT)
+
+
+def completion_changes(task):
+    """
+    Field changes that complete a task.
+
+    A recurring task with a due date advances to its next occurrence (see
+    advance) instead of being marked completed.
+
+    Args:
+        task (dict): Task dictionary
+
+    Returns:
+        dict: New field values
+    """
+    if is_recurring(task) and isinstance(task.get("due_date"), str):
+        return advance(task)
+    return {"completed": True}
+
+
+def advance(task):
+    """
+    Changes that complete the current occurrence of a recurring task.
+
+    Args:
+        task (dict): Recurring task dictionary
+
+    Returns:
+        dict: New field values: the next occurrence as due_date (or
+            completed=True once the rule has none left) and last_completed
+    """
+    done = task["due_date"]
+    try:
+        day = as_date(done)
+        anchor = as_date(task.get(START_FIELD) or done)
+    except (TypeError, ValueError):
+        # No next occurrence can follow a malformed date: just complete it
+        return {"completed": True}
+    rule = parse_rule(task[RULE_FIELD])
+    following = rule.next_on_or_after(day + timedelta(days=1), anchor)
+    if following is None:
+        return {"completed": True, LAST_COMPLETED_FIELD: done}
+    return {"due_date": following.strftime(DATE_FORMAT), LAST_COMPLETED_FIELD: done}
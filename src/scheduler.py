@@ -0,0 +1,325 @@
+import heapq
+import json
+import logging
+import os
+import queue
+import threading
+from datetime import datetime, timedelta
+
+from .storage import DEFAULT_TASKS_FILE, get_storage
+from .tasks import add_change_listener, remove_change_listener
+
+# Fields of a task the scheduler keeps to build reminders
+REMINDER_FIELDS = ("title", "due_date", "completed")
+
+# Upper bound on one sleep, so wall-clock jumps are noticed within a minute
+MAX_SLEEP_SECONDS = 60.0
+
+logger = logging.getLogger("todo.reminders")
+
+
+def _due_datetime(task):
+    """Midnight of the task's due date, or None if it has no valid one."""
+    due_date = task.get("due_date")
+    if not isinstance(due_date, str):
+        return None
+    try:
+        return datetime.strptime(due_date, "%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+class LogSink:
+    """Sink writing each reminder to a logger."""
+
+    def __init__(self, log=logger):
+        self.log = log
+
+    def __call__(self, reminder):
+        self.log.info("Task %s '%s' is due %s", reminder["id"], reminder["title"],
+                      reminder["due_date"])
+
+
+class WebhookSink:
+    """
+    Sink POSTing each reminder as JSON to a URL.
+
+    Delivery errors are logged, never raised, so one unreachable endpoint
+    cannot stop the other sinks.
+    """
+
+    def __init__(self, url, timeout=5):
+        self.url = url
+        self.timeout = timeout
+
+    def __call__(self, reminder):
+        import urllib.request
+        request = urllib.request.Request(
+            self.url, data=json.dumps(reminder).encode(),
+            headers={"Content-Type": "application/json"}, method="POST",
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout):
+                pass
+        except OSError as error:
+            logger.warning("Reminder webhook %s failed: %s", self.url, error)
+
+
+class QueueSink:
+    """
+    Sink buffering reminders until a consumer drains them (e.g. a Streamlit
+    session on its next rerun). When full, new reminders are dropped, so a
+    consumer that went away costs at most maxsize reminders.
+    """
+
+    def __init__(self, maxsize=100):
+        self.queue = queue.Queue(maxsize)
+
+    def __call__(self, reminder):
+        try:
+            self.queue.put_nowait(reminder)
+        except queue.Full:
+            pass
+
+    def drain(self):
+        """Return and remove every buffered reminder."""
+        reminders = []
+        while True:
+            try:
+                reminders.append(self.queue.get_nowait())
+            except queue.Empty:
+                return reminders
+
+
+class ReminderScheduler:
+    """
+    Emit a reminder when a pending task becomes due soon.
+
+    A task is reminded lead_hours before midnight of its due date, matching
+    get_due_soon_tasks. Upcoming reminder times are kept in a heap: adding,
+    completing or rescheduling a task pushes one entry (O(log N)) and the
+    superseded entry is discarded when it reaches the top, so a tick pops
+    only the reminders that are due instead of rescanning every task.
+
+    The heap is in-memory; load() rebuilds it from storage after a restart,
+    and apply() keeps it current from the journal records of later changes
+    (follow() does both for changes made through src/tasks.py). Each due
+    date is reminded once per process, so a restart may repeat reminders
+    whose due date has not passed yet.
+    """
+
+    def __init__(self, sinks=(), lead_hours=24, clock=datetime.now):
+        self.sinks = list(sinks)
+        self.lead = timedelta(hours=lead_hours)
+        self.clock = clock
+        self._heap = []
+        self._tasks = {}
+        self._scheduled = {}
+        self._reminded = {}
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+        self._followed = None
+
+    def __len__(self):
+        return len(self._scheduled)
+
+    # Heap maintenance (callers hold self._cond)
+
+    def _schedule(self, task_id):
+        task = self._tasks.get(task_id)
+        due = None if task is None or task.get("completed", False) else _due_datetime(task)
+        if due is None or due <= self.clock():
+            # Nothing to remind: done, undated or already past due
+            self._scheduled.pop(task_id, None)
+            return
+        entry = (due - self.lead, task_id, task["due_date"])
+        if self._scheduled.get(task_id) == entry or self._reminded.get(task_id) == entry[2]:
+            return
+        self._scheduled[task_id] = entry
+        heapq.heappush(self._heap, entry)
+        if self._heap[0] is entry:
+            self._cond.notify()
+        if len(self._heap) > 2 * len(self._scheduled) + 64:
+            # Too many superseded entries: rebuild from the live ones
+            self._heap = list(self._scheduled.values())
+            heapq.heapify(self._heap)
+
+    def _peek(self):
+        """Top live entry, dropping superseded ones on the way."""
+        while self._heap:
+            entry = self._heap[0]
+            if self._scheduled.get(entry[1]) == entry:
+                return entry
+            heapq.heappop(self._heap)
+        return None
+
+    # Updates
+
+    def rebuild(self, tasks):
+        """
+        Replace everything scheduled with the given tasks (O(N) heapify).
+
+        Args:
+            tasks (iterable): Task dictionaries
+        """
+        now = self.clock()
+        with self._cond:
+            self._tasks = {
+                task["id"]: {field: task.get(field) for field in REMINDER_FIELDS}
+                for task in tasks
+            }
+            # Due dates already reminded stay reminded across a reload
+            self._reminded = {
+                task_id: due_date for task_id, due_date in self._reminded.items()
+                if self._tasks.get(task_id, {}).get("due_date") == due_date
+            }
+            self._scheduled = {}
+            for task_id, task in self._tasks.items():
+                due = None if task.get("completed") else _due_datetime(task)
+                if due is not None and due > now and self._reminded.get(task_id) != task["due_date"]:
+                    self._scheduled[task_id] = (due - self.lead, task_id, task["due_date"])
+            self._heap = list(self._scheduled.values())
+            heapq.heapify(self._heap)
+            self._cond.notify()
+
+    def load(self, file_path=DEFAULT_TASKS_FILE):
+        """Rebuild the heap from the stored tasks (e.g. after a restart)."""
+        self.rebuild(get_storage(file_path).iter_tasks())
+
+    def apply(self, records):
+        """
+        Update the schedule from journal records (see src/journal.py).
+
+        Args:
+            records (list): Add, update and delete records, in order
+        """
+        with self._cond:
+            for record in records:
+                if record["op"] == "add":
+                    task = record["task"]
+                    self._tasks[task["id"]] = {field: task.get(field) for field in REMINDER_FIELDS}
+                    self._schedule(task["id"])
+                elif record["op"] == "update":
+                    task = self._tasks.get(record["id"])
+                    if task is None:
+                        continue
+                    changed = {k: v for k, v in record["set"].items() if k in REMINDER_FIELDS}
+                    if changed:
+                        task.update(changed)
+                        self._schedule(record["id"])
+                elif record["op"] == "delete":
+                    self._tasks.pop(record["id"], None)
+                    self._scheduled.pop(record["id"], None)
+                    self._reminded.pop(record["id"], None)
+
+    def _on_change(self, file_path, records):
+        if os.path.abspath(file_path) != self._followed:
+            return
+        if records is None:
+            self.load(file_path)
+        else:
+            self.apply(records)
+
+    def follow(self, file_path=DEFAULT_TASKS_FILE):
+        """
+        Load the tasks of file_path and track every later change made to it
+        through the functions in src/tasks.py.
+        """
+        self.unfollow()
+        self._followed = os.path.abspath(file_path)
+        self.load(file_path)
+        add_change_listener(self._on_change)
+
+    def unfollow(self):
+        """Stop tracking the followed file."""
+        if self._followed is not None:
+            remove_change_listener(self._on_change)
+            self._followed = None
+
+    def add_sink(self, sink):
+        """Deliver later reminders to sink too (a callable taking the reminder)."""
+        with self._cond:
+            self.sinks = self.sinks + [sink]
+
+    def remove_sink(self, sink):
+        """Stop delivering reminders to sink."""
+        with self._cond:
+            self.sinks = [s for s in self.sinks if s is not sink]
+
+    # Delivery
+
+    def next_deadline(self):
+        """Time of the next reminder, or None if nothing is scheduled."""
+        with self._cond:
+            entry = self._peek()
+            return entry[0] if entry else None
+
+    def tick(self, now=None):
+        """
+        Emit every reminder that is due; O(log N) per reminder.
+
+        Args:
+            now (datetime): Reference time, defaults to the clock
+
+        Returns:
+            list: The emitted reminders
+        """
+        now = now or self.clock()
+        reminders = []
+        with self._cond:
+            while True:
+                entry = self._peek()
+                if entry is None or entry[0] > now:
+                    break
+                heapq.heappop(self._heap)
+                _, task_id, due_date = entry
+                del self._scheduled[task_id]
+                self._reminded[task_id] = due_date
+                reminders.append({
+                    "id": task_id,
+                    "title": self._tasks[task_id].get("title"),
+                    "due_date": due_date,
+                    "remind_at": entry[0].isoformat(sep=" "),
+                })
+            sinks = self.sinks
+        for reminder in reminders:
+            for sink in sinks:
+                try:
+                    sink(reminder)
+                except Exception:
+                    logger.exception("Reminder sink %r failed", sink)
+        return reminders
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._stopping:
+                    return
+                entry = self._peek()
+                delay = MAX_SLEEP_SECONDS
+                if entry is not None:
+                    delay = min(delay, (entry[0] - self.clock()).total_seconds())
+                if delay > 0:
+                    # Woken early when an earlier reminder is scheduled or on stop
+                    self._cond.wait(delay)
+                    continue
+            self.tick()
+
+    def start(self):
+        """Deliver reminders from a daemon thread until stop()."""
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="reminders", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the delivery thread and wait for it."""
+        if self._thread is None:
+            return
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        self._thread.join()
+        self._thread = None
@@ -0,0 +1,136 @@
+import heapq
+import math
+import re
+from bisect import bisect_left, insort
+
+# Task fields covered by the full-text index
+TEXT_FIELDS = ("title", "description")
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """
+    Split text into lowercase word tokens.
+
+    Args:
+        text (str): Text to tokenize
+
+    Returns:
+        list: Tokens in order of appearance
+    """
+    if not text:
+        return []
+    return _TOKEN_RE.findall(str(text).lower())
+
+
+class SearchIndex:
+    """
+    Inverted index over the title and description tokens of tasks.
+
+    Postings map each token to {task_id: term frequency}. A sorted vocabulary
+    makes prefix lookups a bisect range, which is what search-as-you-type
+    needs. Multi-term queries are ANDed and ranked by tf-idf.
+    """
+
+    def __init__(self, tasks=()):
+        self._postings = {}
+        self._doc_terms = {}
+        # Sorted on first read, then kept sorted; bulk indexing skips it
+        self._vocab = None
+        for task in tasks:
+            self.add(task)
+
+    def __len__(self):
+        return len(self._doc_terms)
+
+    def add(self, task):
+        """Index the text fields of a task (replacing any earlier entry)."""
+        task_id = task["id"]
+        if task_id in self._doc_terms:
+            self.remove(task_id)
+        counts = {}
+        for field in TEXT_FIELDS:
+            for token in tokenize(task.get(field, "")):
+                counts[token] = counts.get(token, 0) + 1
+        self._doc_terms[task_id] = counts
+        for token, count in counts.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                if self._vocab is not None:
+                    insort(self._vocab, token)
+            postings[task_id] = count
+
+    def remove(self, task_id):
+        """Drop a task from the index; unknown ids are ignored."""
+        counts = self._doc_terms.pop(task_id, None)
+        if counts is None:
+            return
+        for token in counts:
+            postings = self._postings[token]
+            del postings[task_id]
+            if not postings:
+                del self._postings[token]
+                if self._vocab is not None:
+                    del self._vocab[bisect_left(self._vocab, token)]
+
+    def _tokens_with_prefix(self, prefix):
+        if self._vocab is None:
+            self._vocab = sorted(self._postings)
+        vocab = self._vocab
+        start = bisect_left(vocab, prefix)
+        end = start
+        while end < len(vocab) and vocab[end].startswith(prefix):
+            end += 1
+        return vocab[start:end]
+
+    def _term_scores(self, term, prefix):
+        """Return {task_id: score} for one query term."""
+        tokens = self._tokens_with_prefix(term) if prefix else [term]
+        total = len(self._doc_terms)
+        scores = {}
+        for token in tokens:
+            postings = self._postings.get(token)
+            if not postings:
+                continue
+            idf = math.log(1 + total / len(postings))
+            if not scores:
+                scores = {task_id: count * idf for task_id, count in postings.items()}
+                continue
+            for task_id, count in postings.items():
+                scores[task_id] = scores.get(task_id, 0.0) + count * idf
+        return scores
+
+    def search(self, query, prefix=True, limit=None):
+        """
+        Find tasks containing every query term.
+
+        Args:
+            query (str): Search query, split into terms like the indexed text
+            prefix (bool): Match terms as word prefixes (search-as-you-type)
+            limit (int): Maximum number of ids to return, None for all
+
+        Returns:
+            list: Matching task ids, most relevant first; every indexed id
+            (in index order) for a query without terms
+        """
+        terms = tokenize(query)
+        if not terms:
+            ids = list(self._doc_terms)
+            return ids if limit is None else ids[:limit]
+        per_term = [self._term_scores(term, prefix) for term in set(terms)]
+        per_term.sort(key=len)
+        scores = per_term[0]
+        for other in per_term[1:]:
+            scores = {
+                task_id: score + other[task_id]
+                for task_id, score in scores.items() if task_id in other
+            }
+            if not scores:
+                return []
+        key = lambda task_id: (-scores[task_id], task_id)
+        if limit is not None:
+            # Partial selection instead of ranking every match
+            return heapq.nsmallest(limit, scores, key=key)
+        return sorted(scores, key=key)
@@ -0,0 +1,412 @@
+import argparse
+import asyncio
+import json
+import logging
+import resource
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+from . import recurrence
+from .metrics import metrics
+from .model import CORE_FIELDS
+from .scheduler import LogSink, ReminderScheduler, WebhookSink
+from .storage import DEFAULT_TASKS_FILE, get_storage
+from .tasks import (
+    load_store, new_task_dict, query, search_tasks, get_overdue_tasks, get_due_soon_tasks
+)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Fields POST /tasks may set and PATCH /tasks/<id> may change (never the id)
+UPDATABLE_FIELDS = tuple(field for field in CORE_FIELDS if field != "id") + (
+    recurrence.RULE_FIELD, recurrence.START_FIELD, recurrence.LAST_COMPLETED_FIELD
+)
+
+_REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+            405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    """Error answered with an HTTP status and a JSON {"error": ...} body."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _parse_bool(value):
+    return value.lower() in ("1", "true", "yes")
+
+
+def _check_fields(payload):
+    """Reject a request body that is not an object of UPDATABLE_FIELDS."""
+    if not isinstance(payload, dict):
+        raise HTTPError(400, "request body must be a JSON object")
+    unknown = sorted(set(payload) - set(UPDATABLE_FIELDS))
+    if unknown:
+        raise HTTPError(400, f"cannot set field(s): {', '.join(unknown)}")
+
+
+class TaskService:
+    """
+    Asyncio service that owns one task store and serves it as JSON over HTTP.
+
+    Reads are answered straight from the in-memory TaskStore, concurrently
+    with each other. Mutations go through a single writer queue: the writer
+    drains every queued mutation, applies them in order and persists all
+    their journal records with one append before answering.
+
+    Routes:
+        GET    /health
+        GET    /metrics               recorded metrics as JSON (see src/metrics.py)
+        GET    /stats                 task counters (see src/aggregates.py)
+        GET    /tasks?priority=&category=&completed=&q=&due_before=&due_after=
+                     &overdue=&sort=&desc=&limit=
+        GET    /tasks/search?q=&mode=&limit=
+        GET    /tasks/overdue
+        GET    /tasks/due-soon?hours=
+        POST   /tasks                 {"title", "category", ...} (UPDATABLE_FIELDS only)
+        POST   /tasks/complete        {"ids": [...]}
+        PATCH  /tasks/<id>            {field: value, ...} (UPDATABLE_FIELDS only)
+        DELETE /tasks/<id>
+
+    With a ReminderScheduler, reminders are scheduled from the store on start
+    and kept current from the journal records of every persisted mutation.
+    """
+
+    def __init__(self, file_path=DEFAULT_TASKS_FILE, scheduler=None):
+        self.file_path = file_path
+        self.scheduler = scheduler
+        self.store = load_store(file_path)
+        self.storage = get_storage(file_path)
+        self._queue = None
+        self._server = None
+        self._writers = set()
+        self._writer_task = None
+
+    # Writes
+
+    def _apply(self, op, args, saved):
+        """
+        Apply one mutation to the store; returns (response, journal records).
+
+        saved collects a copy of every task as it was before its first
+        change, for _rollback.
+        """
+        store = self.store
+        if op == "add":
+            args = dict(args)
+            title = args.pop("title", None)
+            if not title:
+                raise HTTPError(400, "title is required")
+            task = new_task_dict(store.next_id, title, args.pop("category", "General"), **args)
+            return task, store.add(task)
+        if op == "complete":
+            records = []
+            for task_id in args:
+                self._save(saved, task_id)
+                records.extend(store.complete(task_id))
+            return {"completed": [r["id"] for r in records]}, records
+        if op == "update":
+            task_id, changes = args
+            self._save(saved, task_id)
+            records = store.update(task_id, **changes)
+            if not records:
+                raise HTTPError(404, f"no task with id {task_id}")
+            return store.get(task_id), records
+        if op == "delete":
+            records = store.delete(args)
+            if not records:
+                raise HTTPError(404, f"no task with id {args}")
+            return {"deleted": args}, records
+        raise ValueError(f"Unknown operation: {op}")
+
+    def _save(self, saved, task_id):
+        task = self.store.get(task_id)
+        if task is not None and task_id not in saved:
+            saved[task_id] = dict(task)
+
+    def _rollback(self, records, saved):
+        """Undo records applied to the store whose append failed."""
+        store = self.store
+        for record in reversed(records):
+            if record["op"] == "add":
+                store.delete(record["task"]["id"])
+            elif record["op"] == "delete":
+                store.add(dict(record["task"]))
+        # Updated tasks go back to their saved copies, so fields they did
+        # not have before are removed rather than set to None
+        for task_id, task in saved.items():
+            if task_id in store:
+                store.restore(task)
+
+    async def _writer(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            records, outcomes, saved = [], [], {}
+            for op, args, future in batch:
+                try:
+                    result, op_records = self._apply(op, args, saved)
+                except Exception as error:
+                    outcomes.append((future, None, error))
+                else:
+                    records.extend(op_records)
+                    outcomes.append((future, result, None))
+            error = None
+            if records:
+                try:
+                    await loop.run_in_executor(None, self.storage.append, records)
+                except Exception as exc:
+                    # Nothing was persisted: the store must match the file again
+                    self._rollback(records, saved)
+                    error = exc
+                else:
+                    if self.scheduler is not None:
+                        self.scheduler.apply(records)
+            for future, result, op_error in outcomes:
+                if future.done():
+                    continue
+                if op_error or error:
+                    future.set_exception(op_error or error)
+                else:
+                    future.set_result(result)
+
+    async def submit(self, op, args):
+        """Queue a mutation for the writer and wait for its (persisted) result."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((op, args, future))
+        return await future
+
+    # Reads
+
+    def _list(self, params, limit=None):
+        return query(
+            self.store,
+            priority=params.get("priority"),
+            category=params.get("category"),
+            completed=_parse_bool(params["completed"]) if "completed" in params else None,
+            text=params.get("q"),
+            due_before=params.get("due_before"),
+            due_after=params.get("due_after"),
+            overdue=_parse_bool(params.get("overdue", "")),
+            sort=params.get("sort"),
+            descending=_parse_bool(params.get("desc", "")),
+            limit=limit,
+        )
+
+    # HTTP
+
+    async def dispatch(self, method, target, body):
+        """
+        Route one request.
+
+        Returns:
+            tuple: (status code, JSON-serializable payload)
+        """
+        url = urlsplit(target)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split("/") if part]
+        limit = int(params["limit"]) if "limit" in params else None
+        try:
+            payload = json.loads(body) if body else {}
+        except ValueError:
+            raise HTTPError(400, "request body is not valid JSON")
+
+        if parts == ["health"]:
+            return 200, {"status": "ok", "tasks": len(self.store)}
+        if parts == ["metrics"]:
+            return 200, metrics.snapshot()
+        if parts == ["stats"]:
+            return 200, self.storage.stats().summary()
+        if not parts or parts[0] != "tasks":
+            raise HTTPError(404, f"unknown path {url.path}")
+        if len(parts) == 1:
+            if method == "GET":
+                return 200, self._list(params, limit)
+            if method == "POST":
+                _check_fields(payload)
+                return 201, await self.submit("add", payload)
+        elif parts[1] == "search" and method == "GET":
+            return 200, search_tasks(self.store, params.get("q", ""),
+                                     mode=params.get("mode"), limit=limit)
+        elif parts[1] == "overdue" and method == "GET":
+            return 200, get_overdue_tasks(self.store, limit=limit)
+        elif parts[1] == "due-soon" and method == "GET":
+            hours = float(params.get("hours", 24))
+            return 200, get_due_soon_tasks(self.store, hours, limit=limit)
+        elif parts[1] == "complete" and method == "POST":
+            return 200, await self.submit("complete", [int(i) for i in payload.get("ids", [])])
+        elif parts[1].isdigit() and len(parts) == 2:
+            task_id = int(parts[1])
+            if method == "GET":
+                task = self.store.get(task_id)
+                if task is None:
+                    raise HTTPError(404, f"no task with id {task_id}")
+                return 200, task
+            if method == "PATCH":
+                _check_fields(payload)
+                return 200, await self.submit("update", (task_id, payload))
+            if method == "DELETE":
+                return 200, await self.submit("delete", task_id)
+        else:
+            raise HTTPError(404, f"unknown path {url.path}")
+        raise HTTPError(405, f"{method} not allowed on {url.path}")
+
+    async def _handle(self, reader, writer):
+        self._writers.add(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                method, target, _ = line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    header = await reader.readline()
+                    if header in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = header.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                body = await reader.readexactly(length) if length else b""
+                start = time.perf_counter()
+                try:
+                    status, payload = await self.dispatch(method, target, body)
+                except HTTPError as error:
+                    status, payload = error.status, {"error": str(error)}
+                except ValueError as error:
+                    status, payload = 400, {"error": str(error)}
+                except Exception as error:
+                    status, payload = 500, {"error": str(error)}
+                if metrics.enabled:
+                    metrics.observe_latency(f"service.{method}",
+                                            (time.perf_counter() - start) * 1000)
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_socket=None):
+        """
+        Start serving (on a Unix socket if unix_socket is given).
+
+        Returns:
+            int: The bound TCP port (useful with port=0), None for a Unix socket
+        """
+        self._queue = asyncio.Queue()
+        self._writer_task = asyncio.get_running_loop().create_task(self._writer())
+        if self.scheduler is not None:
+            self.scheduler.rebuild(self.store)
+            self.scheduler.start()
+        if unix_socket:
+            self._server = await asyncio.start_unix_server(self._handle, path=unix_socket)
+            return None
+        self._server = await asyncio.start_server(self._handle, host, port, backlog=4096)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def _shutdown(self):
+        """Close the listener and open connections, then stop the writer."""
+        self._server.close()
+        for writer in list(self._writers):
+            writer.close()
+        # Give the connection handlers a few loop turns to see EOF and finish
+        for _ in range(100):
+            if not self._writers:
+                break
+            await asyncio.sleep(0)
+        self._writer_task.cancel()
+        await asyncio.gather(self._writer_task, return_exceptions=True)
+        if self.scheduler is not None:
+            self.scheduler.stop()
+
+    async def serve_forever(self, **kwargs):
+        """Start the service and serve until cancelled."""
+        await self.start(**kwargs)
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self._shutdown()
+
+    def run_in_thread(self, host=DEFAULT_HOST, port=0):
+        """
+        Run the service on its own event loop in a daemon thread.
+
+        Returns:
+            int: The bound port
+        """
+        started = threading.Event()
+        bound = {}
+
+        def run():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            bound["port"] = loop.run_until_complete(self.start(host, port))
+            self._loop = loop
+            started.set()
+            try:
+                loop.run_forever()
+            finally:
+                loop.run_until_complete(self._shutdown())
+                loop.close()
+
+        self._thread = threading.Thread(target=run, name="task-service", daemon=True)
+        self._thread.start()
+        started.wait()
+        return bound["port"]
+
+    def stop(self):
+        """Stop a service started with run_in_thread and wait for its thread."""
+        loop = getattr(self, "_loop", None)
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            self._thread.join()
+            self._loop = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a tasks file over HTTP/JSON")
+    parser.add_argument("--file", default=DEFAULT_TASKS_FILE, help="tasks file to own")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix-socket", help="serve on this Unix socket instead of TCP")
+    parser.add_argument("--reminders", action="store_true",
+                        help="log a reminder when a task becomes due within --lead-hours")
+    parser.add_argument("--lead-hours", type=float, default=24)
+    parser.add_argument("--webhook", help="also POST each reminder as JSON to this URL")
+    args = parser.parse_args(argv)
+    # Every keep-alive client holds a descriptor; allow as many as the hard limit
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    scheduler = None
+    if args.reminders or args.webhook:
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+        sinks = [LogSink()] + ([WebhookSink(args.webhook)] if args.webhook else [])
+        scheduler = ReminderScheduler(sinks, lead_hours=args.lead_hours)
+    service = TaskService(args.file, scheduler)
+    print(f"Serving {args.file} ({len(service.store)} tasks)")
+    try:
+        asyncio.run(service.serve_forever(
+            host=args.host, port=args.port, unix_socket=args.unix_socket
+        ))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+import csv
+import json
+from contextlib import contextmanager
+
+from . import journal, recurrence
+from .storage import DEFAULT_TASKS_FILE, TaskList, get_storage
+from .streaming import iter_json_array
+from .tasks import append_changes, new_task_dict, save_tasks
+
+# Column order used when exporting to CSV
+CSV_FIELDS = (
+    "id", "title", "description", "priority", "category",
+    "due_date", "completed", "created_at",
+)
+
+
+class TaskSession:
+    """
+    Unit of work over a tasks file.
+
+    Adds, updates, completions and deletions are applied to an in-memory copy
+    and recorded as journal records. commit() persists all of them with a
+    single write; nothing is written if the session is rolled back.
+    """
+
+    def __init__(self, file_path=DEFAULT_TASKS_FILE):
+        self.file_path = file_path
+        self.storage = get_storage(file_path)
+        self._load()
+
+    def _load(self):
+        loaded = self.storage.load()
+        self.next_id = loaded.next_id
+        self._tasks = {task["id"]: task for task in loaded}
+        self._records = []
+
+    @property
+    def tasks(self):
+        """Current tasks, including uncommitted changes."""
+        return list(self._tasks.values())
+
+    def get(self, task_id):
+        """Return the task with the given id, or None."""
+        return self._tasks.get(task_id)
+
+    def find(self, title):
+        """Return every task with the given title."""
+        return [task for task in self._tasks.values() if task.get("title") == title]
+
+    def add(self, title, category, **kwargs):
+        """
+        Add a new task.
+
+        Args:
+            title (str): Task title
+            category (str): Task category
+            **kwargs: Additional task attributes
+
+        Returns:
+            dict: The new task
+        """
+        task = new_task_dict(self.next_id, title, category, **kwargs)
+        self.next_id = max(self.next_id, task["id"]) + 1
+        self._tasks[task["id"]] = task
+        self._records.append(journal.add_record(task))
+        return task
+
+    def update(self, task_id, **changes):
+        """Change fields of a task; returns False if the id is unknown."""
+        task = self._tasks.get(task_id)
+        if task is None:
+            return False
+        old = {field: task.get(field) for field in changes}
+        self._records.append(journal.update_record(task_id, changes, old, task))
+        task.update(changes)
+        return True
+
+    def complete(self, *task_ids):
+        """Complete tasks (recurring ones advance a rule); unknown ids are ignored."""
+        for task_id in task_ids:
+            task = self._tasks.get(task_id)
+            if task is not None:
+                self.update(task_id, **recurrence.completion_changes(task))
+
+    def delete(self, task_id):
+        """Delete a task; returns False if the id is unknown."""
+        task = self._tasks.pop(task_id, None)
+        if task is None:
+            return False
+        self._records.append(journal.delete_record(task))
+        return True
+
+    def commit(self):
+        """
+        Persist every pending change in one write.
+
+        Small change sets are appended to the journal; change sets larger
+        than the task list itself (e.g. bulk imports) rewrite the snapshot.
+        """
+        records, self._records = self._records, []
+        if not records:
+            return
+        if len(records) > len(self._tasks):
+            save_tasks(TaskList(self.tasks, self.file_path, self.next_id), self.file_path)
+        else:
+            append_changes(records, self.file_path)
+
+    def rollback(self):
+        """Discard pending changes and reload the stored tasks."""
+        self._load()
+
+
+@contextmanager
+def task_session(file_path=DEFAULT_TASKS_FILE):
+    """
+    Apply a batch of task changes and persist them once.
+
+    The tasks file stays locked for the whole session. Changes are committed
+    on a normal exit and discarded if the block raises:
+
+        with task_session(path) as s:
+            s.add("Buy milk", "Groceries", priority="High")
+            s.complete(3, 4)
+
+    Args:
+        file_path (str): Path to the tasks file
+
+    Yields:
+        TaskSession: The open session
+    """
+    storage = get_storage(file_path)
+    with storage.lock():
+        session = TaskSession(file_path)
+        yield session
+        session.commit()
+
+
+def _parse_csv_row(row):
+    task = {key: value for key, value in row.items() if key and value not in (None, "")}
+    task.pop("id", None)
+    if "completed" in task:
+        task["completed"] = task["completed"].strip().lower() in ("true", "1", "yes")
+    return task
+
+
+def import_tasks(source_path, file_path=DEFAULT_TASKS_FILE):
+    """
+    Import tasks from a CSV or JSON file in a single pass and a single write.
+
+    The format follows the file extension. Imported tasks get fresh ids;
+    missing fields get the usual defaults.
+
+    Args:
+        source_path (str): CSV file with a header row, or JSON array of tasks
+        file_path (str): Tasks file to import into
+
+    Returns:
+        int: Number of imported tasks
+    """
+    count = 0
+    with open(source_path, "r", newline="") as f, task_session(file_path) as session:
+        if source_path.lower().endswith(".csv"):
+            rows = (_parse_csv_row(row) for row in csv.DictReader(f))
+        else:
+            rows = iter_json_array(f)
+        for row in rows:
+            row = dict(row)
+            row.pop("id", None)
+            session.add(row.pop("title", ""), row.pop("category", "General"), **row)
+            count += 1
+    return count
+
+
+def export_tasks(dest_path, file_path=DEFAULT_TASKS_FILE):
+    """
+    Stream tasks to a CSV or JSON file without loading them all at once.
+
+    CSV gets the standard columns (other fields are dropped); JSON keeps
+    every field.
+
+    Args:
+        dest_path (str): Output file; the format follows its extension
+        file_path (str): Tasks file to export
+
+    Returns:
+        int: Number of exported tasks
+    """
+    count = 0
+    tasks = get_storage(file_path).iter_tasks()
+    with open(dest_path, "w", newline="") as f:
+        if dest_path.lower().endswith(".csv"):
+            writer = csv.writer(f)
+            writer.writerow(CSV_FIELDS)
+            for task in tasks:
+                writer.writerow([task.get(field, "") for field in CSV_FIELDS])
+                count += 1
+        else:
+            f.write("[")
+            for task in tasks:
+                f.write(",\n" if count else "\n")
+                f.write(json.dumps(task))
+                count += 1
+            f.write("\n]\n" if count else "]\n")
+    return count
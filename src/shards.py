@@ -0,0 +1,273 @@
+"""
+Per-tenant task files ("shards") and a bounded set of hot ones in memory.
+
+Each tenant (a user or a shared list) gets its own tasks file under a root
+directory, so tenants never share a file, a journal or a lock:
+
+    tenants/3f/alice.json
+    tenants/a0/6b86b273ff34fce19d6b804eff5a3f5747ada4ea.json
+
+Every function in src/tasks.py takes the shard's path as file_path.
+"""
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from .aggregates import Aggregates
+from .cache import file_signature
+from .journal import JOURNAL_SUFFIX
+from .storage import get_storage
+from .tasks import add_change_listener, load_store, remove_change_listener
+
+# Directory holding the tenant shards
+TENANTS_DIR_ENV = "TODO_TENANTS_DIR"
+DEFAULT_TENANTS_DIR = "tenants"
+
+# Hot shards kept in memory per process
+SHARD_CAPACITY = 128
+
+# Extension of new shard files; ".tbin" or ".db" select another backend
+DEFAULT_SUFFIX = ".json"
+
+# Tenant keys used as file names as they are; anything else is hashed
+_SAFE_KEY = re.compile(r"[A-Za-z0-9][A-Za-z0-9_.@-]{0,63}")
+
+# Shards per pool task in fan-out queries, to amortize inter-process calls
+_CHUNK = 256
+
+
+def tenant_path(tenant, root=None, suffix=DEFAULT_SUFFIX):
+    """
+    Resolve the tasks file of a tenant, creating its directory.
+
+    Files are spread over 256 subdirectories by a hash of the key, so no
+    directory grows too large for thousands of tenants.
+
+    Args:
+        tenant (str): Tenant key (user name, list id, ...)
+        root (str): Directory of the shards, defaults to TODO_TENANTS_DIR
+            or "tenants"
+        suffix (str): File extension, which picks the storage backend
+
+    Returns:
+        str: Path of the tenant's tasks file
+    """
+    if not tenant:
+        raise ValueError("Tenant key must not be empty")
+    if root is None:
+        root = os.environ.get(TENANTS_DIR_ENV, DEFAULT_TENANTS_DIR)
+    digest = hashlib.sha1(tenant.encode("utf-8")).hexdigest()
+    name = tenant if _SAFE_KEY.fullmatch(tenant) else digest
+    directory = os.path.join(root, digest[:2])
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, name + suffix)
+
+
+def shard_paths(root=None, suffix=DEFAULT_SUFFIX):
+    """
+    List the tasks files of every tenant under root.
+
+    Args:
+        root (str): Directory of the shards
+        suffix (str): File extension of the shards
+
+    Returns:
+        list: Shard paths, sorted
+    """
+    if root is None:
+        root = os.environ.get(TENANTS_DIR_ENV, DEFAULT_TENANTS_DIR)
+    paths = set()
+    try:
+        buckets = os.scandir(root)
+    except FileNotFoundError:
+        return []
+    journal_suffix = suffix + JOURNAL_SUFFIX
+    with buckets:
+        for bucket in buckets:
+            if not bucket.is_dir():
+                continue
+            with os.scandir(bucket.path) as entries:
+                for entry in entries:
+                    # A shard changed only through its journal has no snapshot yet
+                    if entry.name.endswith(suffix):
+                        paths.add(entry.path)
+                    elif entry.name.endswith(journal_suffix):
+                        paths.add(entry.path[:-len(JOURNAL_SUFFIX)])
+    return sorted(paths)
+
+
+def _reflects(store, records):
+    """True if store already holds the outcome of records (e.g. it made them)."""
+    for record in records:
+        op = record["op"]
+        if op == "add":
+            if store.get(record["task"]["id"]) != record["task"]:
+                return False
+        elif op == "update":
+            task = store.get(record["id"])
+            if task is None or any(task.get(k) != v for k, v in record["set"].items()):
+                return False
+        elif op == "delete":
+            if record["id"] in store:
+                return False
+        elif op == "clear":
+            if len(store):
+                return False
+    return True
+
+
+class ShardManager:
+    """
+    Keep the indexed TaskStores of the most recently used tenants in memory.
+
+    store(tenant) returns the tenant's TaskStore, loading it on first use;
+    once more than capacity shards are open, the least recently used one is
+    dropped. Every change is journaled to the shard's file as it is made, so
+    evicting a shard loses nothing and costs one reload when it is used again.
+
+    A hot shard is reloaded when its files change behind its back (another
+    process or a TaskList of the same file). Changes made through the store
+    itself do not cause a reload: the manager follows the persisted changes
+    and keeps the shard when the store already reflects them.
+    """
+
+    def __init__(self, root=None, capacity=SHARD_CAPACITY, suffix=DEFAULT_SUFFIX):
+        if root is None:
+            root = os.environ.get(TENANTS_DIR_ENV, DEFAULT_TENANTS_DIR)
+        self.root = root
+        self.capacity = capacity
+        self.suffix = suffix
+        self._shards = OrderedDict()
+        self._by_path = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        add_change_listener(self._on_change)
+
+    def close(self):
+        """Drop every hot shard and stop following changes."""
+        remove_change_listener(self._on_change)
+        with self._lock:
+            self._shards.clear()
+            self._by_path.clear()
+
+    def __len__(self):
+        return len(self._shards)
+
+    def __contains__(self, tenant):
+        return tenant in self._shards
+
+    def path(self, tenant):
+        """Tasks file of a tenant (see tenant_path)."""
+        return tenant_path(tenant, self.root, self.suffix)
+
+    def store(self, tenant):
+        """
+        Get the TaskStore of a tenant, loading it if it is not hot.
+
+        Args:
+            tenant (str): Tenant key
+
+        Returns:
+            TaskStore: The tenant's store; changes made through the mutation
+                functions of src/tasks.py are journaled to its shard
+        """
+        path = self.path(tenant)
+        signature = file_signature(path)
+        with self._lock:
+            entry = self._shards.get(tenant)
+            if entry is not None and entry[0] == signature:
+                self.hits += 1
+                self._shards.move_to_end(tenant)
+                return entry[1]
+            self.misses += 1
+        store = load_store(path)
+        key = os.path.abspath(path)
+        with self._lock:
+            self._shards[tenant] = (signature, store)
+            self._shards.move_to_end(tenant)
+            self._by_path[key] = tenant
+            while len(self._shards) > self.capacity:
+                _, (_, old) = self._shards.popitem(last=False)
+                self._by_path.pop(os.path.abspath(old.file_path), None)
+                self.evictions += 1
+        return store
+
+    def evict(self, tenant):
+        """Drop a tenant's shard from memory (its file is untouched)."""
+        with self._lock:
+            entry = self._shards.pop(tenant, None)
+            if entry is not None:
+                self._by_path.pop(os.path.abspath(entry[1].file_path), None)
+
+    def _on_change(self, file_path, records):
+        key = os.path.abspath(file_path)
+        with self._lock:
+            tenant = self._by_path.get(key)
+            entry = self._shards.get(tenant) if tenant is not None else None
+            if entry is None:
+                return
+            if records is not None and _reflects(entry[1], records):
+                # Our own change: the store is current for the new files
+                self._shards[tenant] = (file_signature(file_path), entry[1])
+            else:
+                del self._shards[tenant]
+                del self._by_path[key]
+
+    def stats(self):
+        """Hit, miss and eviction counters plus the number of hot shards."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "evictions": self.evictions, "shards": len(self._shards)}
+
+    def summary(self, today=None, workers=None):
+        """Counters summed over every tenant's shard (see global_summary)."""
+        return global_summary(shard_paths(self.root, self.suffix), today, workers)
+
+
+def _summarize(paths, today):
+    """Pool task: counters and overdue count summed over some shards."""
+    total = Aggregates()
+    overdue = 0
+    for path in paths:
+        stats = get_storage(path).stats()
+        overdue += stats.overdue(today)
+        total.merge(stats)
+    return total.to_dict(), overdue
+
+
+def global_summary(paths, today=None, workers=None):
+    """
+    Sum the task counters of many shards, e.g. overdue tasks of all tenants.
+
+    Each shard answers from its maintained counters (see src/aggregates.py),
+    so the cost is a few small file reads per shard; with more than one
+    chunk of shards they are spread over a process pool.
+
+    Args:
+        paths (list): Shard paths (see shard_paths)
+        today (str): Reference day for overdue counts ("%Y-%m-%d")
+        workers (int): Pool size, None for one per CPU, 1 to stay in-process
+
+    Returns:
+        dict: Summed counters like Aggregates.summary(), plus "tenants"
+    """
+    if today is None:
+        today = datetime.now().strftime("%Y-%m-%d")
+    chunks = [paths[i:i + _CHUNK] for i in range(0, len(paths), _CHUNK)]
+    if workers == 1 or len(chunks) <= 1:
+        results = [_summarize(chunk, today) for chunk in chunks]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(_summarize, chunks, [today] * len(chunks)))
+    total = Aggregates()
+    overdue = 0
+    for counters, chunk_overdue in results:
+        total.merge(Aggregates.from_dict(counters))
+        overdue += chunk_overdue
+    return {**total.to_dict(), "overdue": overdue, "tenants": len(paths)}
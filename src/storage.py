@@ -0,0 +1,663 @@
+import json
+import os
+import sys
+import threading
+from datetime import datetime
+
+from . import binary, journal
+from .aggregates import Aggregates
+from .metrics import metrics
+from .streaming import iter_json_array
+
+# File path for task storage
+DEFAULT_TASKS_FILE = "tasks.json"
+
+# Environment variable selecting the storage backend ("json", "sqlite" or "binary")
+BACKEND_ENV = "TODO_STORAGE_BACKEND"
+
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+
+class ConcurrentModificationError(Exception):
+    """Raised when a save expects an older version than the one stored."""
+
+
+class TaskList(list):
+    """
+    A list of task dictionaries that remembers the file it was loaded from.
+
+    Mutation functions append journal records for a TaskList instead of
+    rewriting the whole file. next_id tracks the id high-water mark so new
+    ids can be allocated without scanning the list, and version is the data
+    version it reflects, for optimistic concurrency checks.
+    """
+
+    def __init__(self, tasks=(), file_path=DEFAULT_TASKS_FILE, next_id=None, version=0):
+        super().__init__(tasks)
+        self.file_path = file_path
+        if next_id is None:
+            next_id = max((task["id"] for task in self), default=0) + 1
+        self.next_id = next_id
+        self.version = version
+
+
+def _matches(task, priority, category, completed, due_before, due_after):
+    if priority is not None and task.get("priority") != priority:
+        return False
+    if category is not None and task.get("category") != category:
+        return False
+    if completed is not None and task.get("completed") != completed:
+        return False
+    if due_before is not None and not task.get("due_date", "") < due_before:
+        return False
+    if due_after is not None and not task.get("due_date", "") >= due_after:
+        return False
+    return True
+
+
+class TaskStorage:
+    """
+    Interface every storage backend implements.
+
+    Backends hold whole task lists (load/save) and apply journal records
+    (append) so single changes don't need a full rewrite. query() filters
+    on the indexed fields; backends override it to push filters down.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+
+    def lock(self):
+        """Context manager holding the cross-process lock for read-modify-write cycles."""
+        return journal.locked(self.file_path)
+
+    def load(self):
+        """Return all tasks as a TaskList."""
+        raise NotImplementedError
+
+    def save(self, tasks, expected_version=None):
+        """
+        Replace all stored tasks.
+
+        Args:
+            tasks (list): Task dictionaries to store
+            expected_version (int): Fail unless the stored version equals this
+
+        Returns:
+            int: The new data version
+
+        Raises:
+            ConcurrentModificationError: If expected_version is stale
+        """
+        raise NotImplementedError
+
+    def append(self, records):
+        """Apply journal records to the stored tasks."""
+        raise NotImplementedError
+
+    def version(self):
+        """Return the current data version."""
+        raise NotImplementedError
+
+    @staticmethod
+    def _check_version(current, expected):
+        if expected is not None and current != expected:
+            raise ConcurrentModificationError(
+                f"Tasks changed since version {expected} (now {current})"
+            )
+
+    def iter_tasks(self):
+        """Yield stored tasks one at a time."""
+        return iter(self.load())
+
+    def count(self):
+        """Return the number of stored tasks."""
+        return sum(1 for _ in self.iter_tasks())
+
+    def get(self, task_id):
+        """Return the stored task with the given id, or None."""
+        return next((task for task in self.iter_tasks() if task["id"] == task_id), None)
+
+    def find_by_title(self, title):
+        """Return the first stored task with exactly this title, or None."""
+        return next((task for task in self.iter_tasks() if task.get("title") == title), None)
+
+    def stats(self, refresh=False):
+        """
+        Return the task counters (see src/aggregates.py).
+
+        Backends keep them up to date on every save and append, so this is
+        O(1); missing or stale counters are recomputed from the tasks.
+
+        Args:
+            refresh (bool): Recompute (and store) the counters regardless
+
+        Returns:
+            Aggregates: Counters for the stored tasks
+        """
+        return Aggregates.from_tasks(self.iter_tasks())
+
+    def query(self, priority=None, category=None, completed=None,
+              due_before=None, due_after=None):
+        """
+        Get stored tasks matching every given filter.
+
+        Args:
+            priority (str): Priority level to match
+            category (str): Category name to match
+            completed (bool): Completion status to match
+            due_before (str): Exclusive upper bound for due_date ("%Y-%m-%d")
+            due_after (str): Inclusive lower bound for due_date ("%Y-%m-%d")
+
+        Returns:
+            list: Matching task dictionaries
+        """
+        return [
+            task for task in self.load()
+            if _matches(task, priority, category, completed, due_before, due_after)
+        ]
+
+    def overdue(self, today=None):
+        """Get pending tasks due before today."""
+        if today is None:
+            today = datetime.now().strftime("%Y-%m-%d")
+        return [
+            task for task in self.query(due_before=today)
+            if not task.get("completed", False)
+        ]
+
+
+class JsonStorage(TaskStorage):
+    """Pretty-printed JSON snapshot plus an append-only change journal."""
+
+    def load(self):
+        file_path = self.file_path
+        with journal.locked(file_path, shared=True):
+            tasks = self._read_snapshot()
+            records = journal.read_records(file_path)
+            tasks = journal.replay(tasks, records)
+            next_id = journal.next_id(file_path, tasks, records)
+            version = journal.current_version(file_path, records)
+        return TaskList(tasks, file_path, next_id, version)
+
+    def save(self, tasks, expected_version=None):
+        file_path = self.file_path
+        with journal.locked(file_path):
+            records = journal.read_records(file_path)
+            version = journal.current_version(file_path, records)
+            self._check_version(version, expected_version)
+            meta = journal.read_meta(file_path)
+            meta["next_id"] = max(
+                meta.get("next_id", 1),
+                getattr(tasks, "next_id", 1),
+                journal.next_id(file_path, tasks, records),
+            )
+            meta["version"] = version + 1
+            self._write_snapshot(tasks)
+            journal.write_meta(file_path, meta)
+            journal.remove_journal(file_path)
+            journal.write_stats(file_path, Aggregates.from_tasks(tasks))
+        return version + 1
+
+    def _read_snapshot(self):
+        """Return the tasks of the snapshot file (without the journal)."""
+        file_path = self.file_path
+        try:
+            with open(file_path, "r") as f:
+                tasks = json.load(f)
+                if metrics.enabled:
+                    metrics.add_bytes("read", os.fstat(f.fileno()).st_size)
+        except FileNotFoundError:
+            tasks = []
+        except json.JSONDecodeError:
+            # Handle corrupted JSON file
+            print(f"Warning: {file_path} contains invalid JSON. Creating new tasks list.")
+            tasks = []
+        return tasks
+
+    def _write_snapshot(self, tasks):
+        """Atomically replace the snapshot file with tasks."""
+        journal.write_atomic(self.file_path, lambda f: self._dump(tasks, f))
+
+    @staticmethod
+    def _dump(tasks, f):
+        json.dump(tasks, f, indent=2)
+        if metrics.enabled:
+            metrics.add_bytes("written", f.tell())
+
+    def iter_tasks(self):
+        """
+        Stream tasks from the snapshot element by element, patched by the journal.
+
+        Memory stays bounded by the journal plus one parse chunk, so huge
+        files can be counted or filtered, and consumers can stop early.
+        """
+        file_path = self.file_path
+        with journal.locked(file_path, shared=True):
+            records = journal.read_records(file_path)
+            try:
+                f = open(file_path, "r")
+            except FileNotFoundError:
+                f = None
+            # With atomic renames, the open handle keeps reading this snapshot
+            # even if a writer replaces the file after the lock is released
+        if f is None:
+            yield from journal.iter_replay((), records)
+            return
+        with f:
+            try:
+                yield from journal.iter_replay(iter_json_array(f), records)
+            except json.JSONDecodeError:
+                print(f"Warning: {file_path} contains invalid JSON. Stopping iteration.")
+
+    def append(self, records):
+        journal.append_records(self.file_path, records)
+
+    def version(self):
+        with journal.locked(self.file_path, shared=True):
+            return journal.current_version(self.file_path)
+
+    def count(self):
+        return self.stats().total
+
+    def stats(self, refresh=False):
+        file_path = self.file_path
+        aggregates = None
+        if not refresh:
+            with journal.locked(file_path, shared=True):
+                aggregates = journal.read_stats(file_path)
+        if aggregates is None:
+            with journal.locked(file_path):
+                aggregates = None if refresh else journal.read_stats(file_path)
+                if aggregates is None:
+                    aggregates = Aggregates.from_tasks(self.iter_tasks())
+                    journal.write_stats(file_path, aggregates)
+        return aggregates
+
+
+class SqliteStorage(TaskStorage):
+    """
+    SQLite database with indexed columns for the filterable task fields.
+
+    The full task dictionary is kept as JSON in the data column, so extra
+    fields round-trip unchanged. The database runs in WAL mode, so readers in
+    other processes are not blocked by a writer.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY,
+            title TEXT,
+            priority TEXT,
+            category TEXT,
+            completed INTEGER,
+            due_date TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks (priority);
+        CREATE INDEX IF NOT EXISTS idx_tasks_category ON tasks (category);
+        CREATE INDEX IF NOT EXISTS idx_tasks_completed ON tasks (completed);
+        CREATE INDEX IF NOT EXISTS idx_tasks_due_date ON tasks (due_date);
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+    """
+
+    def __init__(self, file_path):
+        super().__init__(file_path)
+        self._local = threading.local()
+
+    @property
+    def connection(self):
+        """Connection for the calling thread, created on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            import sqlite3  # imported on first use: JSON-backed apps never load it
+            conn = sqlite3.connect(self.file_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self._SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _row(task):
+        completed = task.get("completed")
+        due_date = task.get("due_date", "")
+        return (
+            task["id"],
+            task.get("title"),
+            task.get("priority"),
+            task.get("category"),
+            int(completed) if isinstance(completed, bool) else None,
+            due_date if isinstance(due_date, str) else None,
+            json.dumps(task),
+        )
+
+    def _insert(self, conn, tasks):
+        conn.executemany(
+            "INSERT OR REPLACE INTO tasks "
+            "(id, title, priority, category, completed, due_date, data) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (self._row(task) for task in tasks),
+        )
+
+    def _get_next_id(self, conn):
+        row = conn.execute("SELECT value FROM meta WHERE key = 'next_id'").fetchone()
+        stored = int(row[0]) if row else 1
+        highest = conn.execute("SELECT MAX(id) FROM tasks").fetchone()[0] or 0
+        return max(stored, highest + 1)
+
+    def _get_version(self, conn):
+        row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        return int(row[0]) if row else 0
+
+    def _set_version(self, conn, version):
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (str(version),)
+        )
+
+    def _get_stats(self, conn):
+        """Stored counters if they describe the current version, else None."""
+        row = conn.execute("SELECT value FROM meta WHERE key = 'stats'").fetchone()
+        if row is None:
+            return None
+        stored = json.loads(row[0])
+        if stored["version"] != self._get_version(conn):
+            return None
+        return Aggregates.from_dict(stored["stats"])
+
+    def _set_stats(self, conn, aggregates, version):
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('stats', ?)",
+            (json.dumps({"version": version, "stats": aggregates.to_dict()}),),
+        )
+
+    def _set_next_id(self, conn, next_id):
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('next_id', ?)",
+            (str(max(next_id, self._get_next_id(conn))),),
+        )
+
+    def load(self):
+        conn = self.connection
+        with conn:
+            # One read transaction so the rows, next_id and version agree
+            conn.execute("BEGIN")
+            rows = conn.execute("SELECT data FROM tasks ORDER BY id").fetchall()
+            next_id = self._get_next_id(conn)
+            version = self._get_version(conn)
+        tasks = [json.loads(data) for (data,) in rows]
+        return TaskList(tasks, self.file_path, next_id, version)
+
+    def save(self, tasks, expected_version=None):
+        conn = self.connection
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            version = self._get_version(conn)
+            self._check_version(version, expected_version)
+            conn.execute("DELETE FROM tasks")
+            self._insert(conn, tasks)
+            self._set_next_id(conn, getattr(tasks, "next_id", 1))
+            self._set_version(conn, version + 1)
+            self._set_stats(conn, Aggregates.from_tasks(tasks), version + 1)
+        return version + 1
+
+    def version(self):
+        return self._get_version(self.connection)
+
+    def append(self, records):
+        if not records:
+            return
+        conn = self.connection
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            aggregates = self._get_stats(conn)
+            if aggregates is not None and not aggregates.apply(records):
+                aggregates = None
+            version = self._get_version(conn) + len(records)
+            self._set_version(conn, version)
+            if aggregates is not None:
+                self._set_stats(conn, aggregates, version)
+            for record in records:
+                op = record["op"]
+                if op == "add":
+                    self._insert(conn, [record["task"]])
+                    self._set_next_id(conn, record["task"]["id"] + 1)
+                elif op == "update":
+                    row = conn.execute(
+                        "SELECT data FROM tasks WHERE id = ?", (record["id"],)
+                    ).fetchone()
+                    if row is not None:
+                        task = json.loads(row[0])
+                        task.update(record["set"])
+                        self._insert(conn, [task])
+                elif op == "delete":
+                    conn.execute("DELETE FROM tasks WHERE id = ?", (record["id"],))
+                elif op == "clear":
+                    conn.execute("DELETE FROM tasks")
+
+    def count(self):
+        return self.stats().total
+
+    def stats(self, refresh=False):
+        conn = self.connection
+        if not refresh:
+            with conn:
+                conn.execute("BEGIN")
+                aggregates = self._get_stats(conn)
+            if aggregates is not None:
+                return aggregates
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            aggregates = None if refresh else self._get_stats(conn)
+            if aggregates is None:
+                aggregates = Aggregates.from_tasks(
+                    json.loads(data) for (data,) in conn.execute("SELECT data FROM tasks")
+                )
+                self._set_stats(conn, aggregates, self._get_version(conn))
+        return aggregates
+
+    def iter_tasks(self):
+        for (data,) in self.connection.execute("SELECT data FROM tasks ORDER BY id"):
+            yield json.loads(data)
+
+    def get(self, task_id):
+        row = self.connection.execute(
+            "SELECT data FROM tasks WHERE id = ?", (task_id,)
+        ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def find_by_title(self, title):
+        row = self.connection.execute(
+            "SELECT data FROM tasks WHERE title = ? ORDER BY id LIMIT 1", (title,)
+        ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def query(self, priority=None, category=None, completed=None,
+              due_before=None, due_after=None):
+        clauses, params = [], []
+        for column, value in (("priority", priority), ("category", category)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if completed is not None:
+            clauses.append("completed = ?")
+            params.append(int(completed))
+        if due_before is not None:
+            clauses.append("due_date < ?")
+            params.append(due_before)
+        if due_after is not None:
+            clauses.append("due_date >= ?")
+            params.append(due_after)
+        sql = "SELECT data FROM tasks"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        rows = self.connection.execute(sql + " ORDER BY id", params).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def overdue(self, today=None):
+        if today is None:
+            today = datetime.now().strftime("%Y-%m-%d")
+        rows = self.connection.execute(
+            "SELECT data FROM tasks WHERE due_date < ? "
+            "AND (completed IS NULL OR completed = 0) ORDER BY id",
+            (today,),
+        ).fetchall()
+        tasks = [json.loads(data) for (data,) in rows]
+        return [task for task in tasks if not task.get("completed", False)]
+
+
+class BinaryStorage(JsonStorage):
+    """
+    Binary snapshot (see src/binary.py) plus the same journal and sidecars
+    as JsonStorage.
+
+    The snapshot is memory-mapped rather than parsed, so single tasks are
+    looked up by id without decoding the others, and processes reading the
+    same file share its pages. codec selects the block compression of the
+    next write (None: TODO_SNAPSHOT_CODEC, else keep the file's codec).
+    """
+
+    def __init__(self, file_path, codec=None):
+        super().__init__(file_path)
+        self.codec = codec
+
+    def _read_snapshot(self):
+        tasks = binary.read_snapshot(self.file_path)
+        if metrics.enabled and tasks:
+            metrics.add_bytes("read", os.path.getsize(self.file_path))
+        return tasks
+
+    def _write_snapshot(self, tasks):
+        written = binary.write_snapshot(self.file_path, tasks, self.codec)
+        if metrics.enabled:
+            metrics.add_bytes("written", written)
+
+    def iter_tasks(self):
+        with journal.locked(self.file_path, shared=True):
+            records = journal.read_records(self.file_path)
+            # The mapping keeps this snapshot readable after a writer replaces it
+            snapshot = binary.open_snapshot(self.file_path)
+        yield from journal.iter_replay(snapshot or (), records)
+
+    def _ops_by_id(self):
+        """Snapshot plus journal records grouped by task id (after the last clear)."""
+        with journal.locked(self.file_path, shared=True):
+            records = journal.read_records(self.file_path)
+            snapshot = binary.open_snapshot(self.file_path)
+        cleared, ops_by_id = journal.group_by_task(records)
+        return None if cleared else snapshot, ops_by_id
+
+    def get(self, task_id):
+        """Binary search in the mapped index, then apply the journal for this id."""
+        snapshot, ops_by_id = self._ops_by_id()
+        task = None if snapshot is None else snapshot.get(task_id)
+        ops = ops_by_id.get(task_id)
+        return journal.apply_ops(task, ops) if ops else task
+
+    def find_by_title(self, title):
+        """Same result as scanning iter_tasks, comparing titles without decoding."""
+        snapshot, ops_by_id = self._ops_by_id()
+        best = None
+        if snapshot is not None:
+            best = next(
+                ((row, task) for row, task in snapshot.iter_title(title)
+                 if task["id"] not in ops_by_id), None
+            )
+        added = None
+        for task_id, ops in ops_by_id.items():
+            row = None if snapshot is None else snapshot.row_of(task_id)
+            task = journal.apply_ops(None if row is None else snapshot.row(row), ops)
+            if task is None or task.get("title") != title:
+                continue
+            if row is None:
+                # Tasks only in the journal come after the snapshot's
+                added = added or task
+            elif best is None or row < best[0]:
+                best = (row, task)
+        return best[1] if best is not None else added
+
+
+BACKENDS = {"json": JsonStorage, "sqlite": SqliteStorage, "binary": BinaryStorage}
+
+_storages = {}
+_storages_lock = threading.Lock()
+
+
+def migrate_json_to_sqlite(json_path, db_path):
+    """
+    Copy every task from a JSON snapshot (plus journal) into a SQLite database.
+
+    Args:
+        json_path (str): Path to the existing tasks.json file
+        db_path (str): Path of the SQLite database to fill
+
+    Returns:
+        int: Number of migrated tasks
+    """
+    tasks = JsonStorage(json_path).load()
+    get_storage(db_path, "sqlite").save(tasks)
+    return len(tasks)
+
+
+def get_storage(file_path=DEFAULT_TASKS_FILE, backend=None):
+    """
+    Resolve the storage backend for a tasks file.
+
+    The backend is taken from the argument, then the TODO_STORAGE_BACKEND
+    environment variable, then the file extension (".db", ".tbin"). Selecting
+    SQLite or binary for a ".json" path uses the ".db" or ".tbin" file next
+    to it, migrating the JSON tasks into it the first time.
+
+    Args:
+        file_path (str): Path to the tasks file
+        backend (str): "json", "sqlite" or "binary", None to detect
+
+    Returns:
+        TaskStorage: Storage instance (SQLite ones are shared per path)
+    """
+    if backend is None:
+        backend = os.environ.get(BACKEND_ENV)
+    if not backend or (backend == "json" and binary.is_binary_path(file_path)):
+        if file_path.endswith(SQLITE_SUFFIXES):
+            backend = "sqlite"
+        elif binary.is_binary_path(file_path):
+            backend = "binary"
+        else:
+            backend = "json"
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown storage backend: {backend}")
+    json_path = None
+    if backend == "sqlite" and not file_path.endswith(SQLITE_SUFFIXES):
+        json_path = file_path
+        file_path = os.path.splitext(file_path)[0] + ".db"
+    if backend == "binary" and not binary.is_binary_path(file_path):
+        json_path = file_path
+        file_path = os.path.splitext(file_path)[0] + binary.BINARY_SUFFIX
+    if backend == "json":
+        return JsonStorage(file_path)
+    if backend == "binary":
+        storage = BinaryStorage(file_path)
+        if json_path and not os.path.exists(file_path) and os.path.exists(json_path):
+            with storage.lock():
+                if not os.path.exists(file_path):
+                    storage.save(JsonStorage(json_path).load())
+        return storage
+    file_path = os.path.abspath(file_path)
+    key = (backend, file_path)
+    with _storages_lock:
+        storage = _storages.get(key)
+        if storage is not None:
+            return storage
+        if json_path and not os.path.exists(file_path) and os.path.exists(json_path):
+            tasks = JsonStorage(json_path).load()
+            SqliteStorage(file_path).save(tasks)
+        storage = _storages[key] = BACKENDS[backend](file_path)
+        return storage
+
+
+if __name__ == "__main__":
+    # python -m src.storage tasks.json tasks.db
+    if len(sys.argv) != 3:
+        sys.exit("usage: python -m src.storage JSON_PATH DB_PATH")
+    count = migrate_json_to_sqlite(sys.argv[1], sys.argv[2])
+    print(f"Migrated {count} tasks into {sys.argv[2]}")
@@ -0,0 +1,346 @@
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime, timedelta
+
+from . import journal, recurrence
+from .search import SearchIndex, TEXT_FIELDS
+
+# Task fields that get a hash index (value -> ids)
+INDEXED_FIELDS = ("priority", "category", "completed")
+
+
+class TaskStore:
+    """
+    In-memory task collection keyed by id with secondary indexes.
+
+    Hash indexes cover priority, category and completion status. Pending tasks
+    are also kept in a list sorted by due date (for a recurring task, the date
+    of its next pending occurrence), so overdue and due-soon queries are range
+    lookups instead of full scans, and a SearchIndex covers the
+    title and description text. Every mutation updates the
+    indexes incrementally and returns the journal records describing it.
+    next_id is the id high-water mark used to allocate new ids in O(1), and
+    version counts the mutations made through the store (see src/query.py).
+    Each task also keeps the position it was added at, so results gathered
+    from an index can be put back in iteration order.
+    """
+
+    def __init__(self, tasks=(), file_path=None, next_id=1):
+        self.file_path = file_path
+        self.next_id = next_id
+        self.version = 0
+        self._tasks = {}
+        self._positions = {}
+        self._added = 0
+        self._index = {field: {} for field in INDEXED_FIELDS}
+        self._due = []
+        self._text = SearchIndex()
+        for task in tasks:
+            self._insert(task, due=False)
+            self._text.add(task)
+        # One sort instead of an insort per task
+        keys = (self._due_key(task) for task in self._tasks.values())
+        self._due = sorted(key for key in keys if key is not None)
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def __iter__(self):
+        return iter(self._tasks.values())
+
+    def __contains__(self, task_id):
+        return task_id in self._tasks
+
+    def get(self, task_id):
+        """Return the task with the given id, or None."""
+        return self._tasks.get(task_id)
+
+    def to_list(self):
+        """Return the tasks as a plain list of dictionaries."""
+        return list(self._tasks.values())
+
+    def position(self, task_id):
+        """Sort key of a stored task that follows the store's iteration order."""
+        return self._positions[task_id]
+
+    # Index maintenance
+
+    @staticmethod
+    def _due_key(task):
+        if task.get("completed", False):
+            return None
+        due_date = task.get("due_date", "")
+        if not isinstance(due_date, str):
+            return None
+        return (due_date, task["id"])
+
+    @staticmethod
+    def _check(task, fields=INDEXED_FIELDS):
+        """Raise ValueError if a task cannot be stored and indexed."""
+        task_id = task.get("id")
+        if type(task_id) is not int:
+            raise ValueError(f"Task id must be an integer, not {task_id!r}")
+        for field in fields:
+            try:
+                hash(task.get(field))
+            except TypeError:
+                raise ValueError(f"Task {field} cannot be indexed: {task.get(field)!r}") from None
+
+    def _insert(self, task, fields=INDEXED_FIELDS, due=True):
+        task_id = task.get("id")
+        if type(task_id) is not int:
+            self._check(task, fields)
+        # Index first: an unhashable value fails before the task is stored
+        for i, field in enumerate(fields):
+            try:
+                self._index[field].setdefault(task.get(field), {})[task_id] = None
+            except TypeError:
+                self._unindex(task, fields[:i])
+                self._check(task, fields)
+        if task_id not in self._tasks:
+            self._positions[task_id] = self._added
+            self._added += 1
+        self._tasks[task_id] = task
+        if task_id >= self.next_id:
+            self.next_id = task_id + 1
+        key = self._due_key(task) if due else None
+        if key is not None:
+            insort(self._due, key)
+
+    def _unindex(self, task, fields=INDEXED_FIELDS):
+        task_id = task["id"]
+        for field in fields:
+            bucket = self._index[field].get(task.get(field))
+            if bucket is not None:
+                bucket.pop(task_id, None)
+                if not bucket:
+                    del self._index[field][task.get(field)]
+        key = self._due_key(task)
+        if key is not None:
+            i = bisect_left(self._due, key)
+            if i < len(self._due) and self._due[i] == key:
+                del self._due[i]
+
+    # Mutations
+
+    def add(self, task):
+        """
+        Add a task to the store.
+
+        Args:
+            task (dict): Task dictionary with a unique "id"
+
+        Returns:
+            list: Journal records describing the change
+        """
+        self._check(task)
+        if task["id"] in self._tasks:
+            raise ValueError(f"Task id {task['id']} already exists")
+        self._insert(task)
+        self._text.add(task)
+        self.version += 1
+        return [journal.add_record(task)]
+
+    def update(self, task_id, **changes):
+        """
+        Change fields of a stored task.
+
+        Args:
+            task_id (int): ID of the task to change
+            **changes: New field values
+
+        Returns:
+            list: Journal records describing the change, empty if the id is unknown
+        """
+        task = self._tasks.get(task_id)
+        if task is None:
+            return []
+        fields = [field for field in INDEXED_FIELDS if field in changes]
+        self._check({**task, **changes}, fields)
+        old = {field: task.get(field) for field in changes}
+        record = journal.update_record(task_id, changes, old, task)
+        self._unindex(task, fields)
+        task.update(changes)
+        self._insert(task, fields)
+        if any(field in changes for field in TEXT_FIELDS):
+            self._text.add(task)
+        self.version += 1
+        return [record]
+
+    def complete(self, task_id):
+        """
+        Complete a stored task and return the journal records.
+
+        A recurring task moves on to its next occurrence: its due date
+        changes (and with it its place in the due-date index) while it stays
+        pending.
+        """
+        task = self._tasks.get(task_id)
+        if task is None:
+            return []
+        return self.update(task_id, **recurrence.completion_changes(task))
+
+    def delete(self, task_id):
+        """Remove a stored task and return the journal records."""
+        task = self._tasks.get(task_id)
+        if task is None:
+            return []
+        self._unindex(task)
+        self._text.remove(task_id)
+        del self._tasks[task_id]
+        del self._positions[task_id]
+        self.version += 1
+        return [journal.delete_record(task)]
+
+    def restore(self, task):
+        """
+        Put back an earlier copy of a stored task, keeping its position.
+
+        Meant for undoing changes that were never persisted, so no journal
+        records are made.
+
+        Args:
+            task (dict): The task as it should be again, with the same "id"
+        """
+        self._check(task)
+        self._unindex(self._tasks[task["id"]])
+        self._insert(task)
+        self._text.add(task)
+        self.version += 1
+
+    def apply(self, records):
+        """
+        Apply journal records made elsewhere (e.g. change feed events).
+
+        Indexes are updated as for the store's own mutations. Records the
+        store already reflects (such as its own changes coming back from
+        the feed) leave it as it is: an add replaces the task with that id,
+        a delete of an unknown id is ignored.
+
+        Args:
+            records (list): Journal records in order
+        """
+        for record in records:
+            op = record["op"]
+            if op == "add":
+                task = dict(record["task"])
+                self.delete(task["id"])
+                self.add(task)
+            elif op == "update":
+                self.update(record["id"], **record["set"])
+            elif op == "delete":
+                self.delete(record["id"])
+            elif op == "clear":
+                self._tasks.clear()
+                self._positions.clear()
+                self._index = {field: {} for field in INDEXED_FIELDS}
+                self._due = []
+                self._text = SearchIndex()
+                self.version += 1
+
+    # Queries
+
+    def filter_by(self, field, value):
+        """
+        Get tasks whose indexed field equals a value.
+
+        Args:
+            field (str): One of INDEXED_FIELDS
+            value: Value to match
+
+        Returns:
+            list: Matching tasks in insertion order
+        """
+        ids = self._index[field].get(value, ())
+        return [self._tasks[task_id] for task_id in ids]
+
+    def count_by(self, field, value):
+        """Number of tasks whose indexed field equals a value, in O(1)."""
+        return len(self._index[field].get(value, ()))
+
+    def search(self, query, prefix=True, limit=None):
+        """
+        Full-text search over title and description tokens.
+
+        Args:
+            query (str): Search terms, all of which must match
+            prefix (bool): Match terms as word prefixes
+            limit (int): Maximum number of results, None for all
+
+        Returns:
+            list: Matching tasks, most relevant first
+        """
+        ids = self._text.search(query, prefix=prefix, limit=limit)
+        return [self._tasks[task_id] for task_id in ids]
+
+    def due_range(self, start=None, end=None):
+        """
+        Get pending tasks with start <= due_date < end (as "%Y-%m-%d" strings).
+
+        Args:
+            start (str): Inclusive lower bound, None for no bound
+            end (str): Exclusive upper bound, None for no bound
+
+        Returns:
+            list: Matching tasks ordered by due date
+        """
+        lo = 0 if start is None else bisect_left(self._due, (start,))
+        hi = len(self._due) if end is None else bisect_left(self._due, (end,))
+        return [self._tasks[task_id] for _, task_id in self._due[lo:hi]]
+
+    def count_due(self, start=None, end=None):
+        """Number of tasks due_range(start, end) would return, in O(log N)."""
+        lo = 0 if start is None else bisect_left(self._due, (start,))
+        hi = len(self._due) if end is None else bisect_left(self._due, (end,))
+        return max(0, hi - lo)
+
+    def overdue(self, today=None):
+        """Get pending tasks due before today."""
+        if today is None:
+            today = datetime.now().strftime("%Y-%m-%d")
+        return self.due_range(end=today)
+
+    def due_between(self, start, end, limit=None):
+        """
+        Get pending tasks with start < due date <= end.
+
+        Only the due-date range that can match is parsed and checked, and
+        the scan stops once limit tasks have matched.
+
+        Args:
+            start (datetime): Exclusive lower bound
+            end (datetime): Inclusive upper bound
+            limit (int): Stop after this many matches, None for all
+
+        Returns:
+            list: Matching tasks ordered by due date
+        """
+        first = start.strftime("%Y-%m-%d")
+        last = end.strftime("%Y-%m-%d")
+        lo = bisect_right(self._due, (first, float("inf")))
+        hi = bisect_right(self._due, (last, float("inf")))
+        matches = []
+        for due_date, task_id in self._due[lo:hi]:
+            if limit is not None and len(matches) >= limit:
+                break
+            try:
+                due = datetime.strptime(due_date, "%Y-%m-%d")
+            except ValueError:
+                continue
+            if start < due <= end:
+                matches.append(self._tasks[task_id])
+        return matches
+
+    def due_soon(self, hours_threshold=24, now=None):
+        """
+        Get pending tasks due within the next hours_threshold hours.
+
+        Args:
+            hours_threshold (int): Hours window to consider as "due soon"
+            now (datetime): Reference time, defaults to the current time
+
+        Returns:
+            list: Tasks due within the threshold
+        """
+        if now is None:
+            now = datetime.now()
+        return self.due_between(now, now + timedelta(hours=hours_threshold))
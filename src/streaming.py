@@ -0,0 +1,100 @@
+import json
+import re
+
+# Bytes read from the file per refill of the parse buffer
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+# Literals a chunk boundary can cut in two
+_LITERALS = ("true", "false", "null", "NaN", "Infinity", "-Infinity")
+
+# The tail of a number cut off after "-", "." or an exponent sign
+_NUMBER_PREFIX = re.compile(r"-?\d*(\.\d*)?([eE][+-]?\d*)?")
+
+
+def _truncated(error, buf):
+    """True if a decode error comes from the buffer ending mid-value."""
+    pos = error.pos
+    if pos >= len(buf) or error.msg.startswith("Unterminated string"):
+        return True
+    if error.msg.startswith("Invalid \\uXXXX escape"):
+        return len(buf) - pos <= 5
+    rest = buf[pos:]
+    if _NUMBER_PREFIX.fullmatch(rest):
+        return True
+    return any(literal.startswith(rest) for literal in _LITERALS)
+
+
+def iter_json_array(f, chunk_size=CHUNK_SIZE):
+    """
+    Yield the elements of a top-level JSON array one at a time.
+
+    Only the current element and one read chunk are held in memory, so the
+    array can be much larger than RAM.
+
+    Args:
+        f (file): Text file positioned at the start of the JSON document
+        chunk_size (int): Characters to read per refill
+
+    Yields:
+        object: Each decoded array element
+
+    Raises:
+        json.JSONDecodeError: If the document is not a well-formed array
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+
+    def fill():
+        nonlocal buf, pos, eof
+        data = f.read(chunk_size)
+        if not data:
+            eof = True
+        buf = buf[pos:] + data
+        pos = 0
+
+    def skip_whitespace():
+        nonlocal pos
+        while True:
+            pos = _WHITESPACE.match(buf, pos).end()
+            if pos < len(buf) or eof:
+                return
+            fill()
+
+    def expect(chars):
+        nonlocal pos
+        skip_whitespace()
+        if pos >= len(buf) or buf[pos] not in chars:
+            raise json.JSONDecodeError(f"Expected one of {chars!r}", buf, pos)
+        pos += 1
+        return buf[pos - 1]
+
+    fill()
+    expect("[")
+    skip_whitespace()
+    if pos < len(buf) and buf[pos] == "]":
+        return
+    while True:
+        skip_whitespace()
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError as error:
+                # Only a value cut off by the end of the buffer is worth a
+                # refill; anything else is malformed whatever follows it
+                if eof or not _truncated(error, buf):
+                    raise
+                fill()
+                continue
+            # A number running to the buffer end may continue (e.g. "12." + "5")
+            if not eof and (end == len(buf) or _NUMBER_PREFIX.fullmatch(buf, pos)):
+                fill()
+                continue
+            break
+        pos = end
+        yield value
+        if expect(",]") == "]":
+            return
@@ -1,199 +1,675 @@
-import json
-import os
+import heapq
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+from itertools import islice
 
-# File path for task storage
-DEFAULT_TASKS_FILE = "tasks.json"
+from . import journal, recurrence
+from .aggregates import Aggregates, diff
+from .cache import task_cache
+from .metrics import timed
+from .model import TaskTable
+from .query import Query, run as run_query
+from .storage import DEFAULT_TASKS_FILE, TaskList, get_storage
+from .store import TaskStore
 
+# Called as listener(file_path, records) after changes are persisted through
+# this module; records is None when the whole file was rewritten
+_change_listeners = []
+
+def add_change_listener(listener):
+    """Register a callable to be told about every persisted change."""
+    _change_listeners.append(listener)
+
+def remove_change_listener(listener):
+    """Unregister a listener added with add_change_listener."""
+    if listener in _change_listeners:
+        _change_listeners.remove(listener)
+
+def _notify(file_path, records):
+    for listener in list(_change_listeners):
+        listener(file_path, records)
+
+@timed(size="result")
 def load_tasks(file_path=DEFAULT_TASKS_FILE):
     """
-    Load tasks from a JSON file.
+    Load tasks through the storage backend configured for file_path.
+    
+    Args:
+        file_path (str): Path to the file containing tasks
+        
+    Returns:
+        TaskList: List of task dictionaries, empty list if file doesn't exist
+    """
+    return get_storage(file_path).load()
+
+@timed(size="result")
+def cached_load_tasks(file_path=DEFAULT_TASKS_FILE):
+    """
+    Load tasks, reusing the process-wide parsed copy while the file is unchanged.
+    
+    The returned list is shared with other callers; change it only through
+    the mutation functions in this module.
+    
+    Args:
+        file_path (str): Path to the file containing tasks
+        
+    Returns:
+        TaskList: List of task dictionaries
+    """
+    storage = get_storage(file_path)
+    return task_cache.get(storage.file_path, lambda _: storage.load())
+
+@timed()
+def cached_task_table(file_path=DEFAULT_TASKS_FILE):
+    """
+    Get the tasks as a columnar TaskTable, parsed once per version of the file.
+    
+    Due dates are converted to ordinal days when the table is built, so the
+    date queries below run as vectorized comparisons instead of parsing
+    strings on every call.
+    
+    Args:
+        file_path (str): Path to the file containing tasks
+        
+    Returns:
+        TaskTable: Shared table for the current file contents
+    """
+    storage = get_storage(file_path)
+    return task_cache.derived(
+        storage.file_path, "table", lambda _: storage.load(), TaskTable.from_dicts
+    )
+
+@timed(size="result")
+def load_store(file_path=DEFAULT_TASKS_FILE):
+    """
+    Load tasks into an indexed TaskStore whose changes are journaled to file_path.
     
     Args:
         file_path (str): Path to the JSON file containing tasks
         
     Returns:
-        list: List of task dictionaries, empty list if file doesn't exist
+        TaskStore: Store holding the loaded tasks
     """
-    try:
-        with open(file_path, "r") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return []
-    except json.JSONDecodeError:
-        # Handle corrupted JSON file
-        print(f"Warning: {file_path} contains invalid JSON. Creating new tasks list.")
-        return []
+    tasks = load_tasks(file_path)
+    return TaskStore(tasks, file_path, next_id=tasks.next_id)
 
-def save_tasks(tasks, file_path=DEFAULT_TASKS_FILE):
+@timed(size="arg")
+def save_tasks(tasks, file_path=DEFAULT_TASKS_FILE, expected_version=None):
     """
-    Save tasks to a JSON file.
+    Save tasks through the storage backend, replacing everything stored.
+    
+    The write is atomic: readers see the old or the new tasks, never a
+    partially written file.
     
     Args:
         tasks (list): List of task dictionaries
-        file_path (str): Path to save the JSON file
+        file_path (str): Path to save the tasks file
+        expected_version (int): Only save if the stored data is still at this
+            version (e.g. the version of the TaskList being saved)
+        
+    Raises:
+        ConcurrentModificationError: If someone else saved in the meantime
+    """
+    storage = get_storage(file_path)
+    version = storage.save(tasks, expected_version)
+    task_cache.invalidate(storage.file_path)
+    if isinstance(tasks, TaskList):
+        tasks.version = version
+    _notify(storage.file_path, None)
+
+@contextmanager
+def locked_tasks(file_path=DEFAULT_TASKS_FILE):
+    """
+    Load tasks while holding the cross-process lock on file_path.
+    
+    Use it for read-modify-write cycles so no other process or thread can
+    change the tasks in between:
+    
+        with locked_tasks(path) as tasks:
+            bulk_complete_tasks(tasks, ids)
+    
+    Args:
+        file_path (str): Path to the tasks file
+        
+    Yields:
+        TaskList: The freshly loaded tasks
     """
-    with open(file_path, "w") as f:
-        json.dump(tasks, f, indent=2)
+    storage = get_storage(file_path)
+    with storage.lock():
+        yield storage.load()
 
+def append_changes(records, file_path=DEFAULT_TASKS_FILE):
+    """
+    Append journal records to a tasks file and tell the change listeners.
+
+    Args:
+        records (list): Journal records describing the changes
+        file_path (str): Path to the tasks file
+    """
+    storage = get_storage(file_path)
+    storage.append(records)
+    task_cache.invalidate(storage.file_path)
+    _notify(storage.file_path, records)
+
+def _persist(tasks, records, file_path=None):
+    """
+    Persist changes made to a task list.
+
+    A TaskList or file-backed TaskStore only hands the change records to its
+    storage backend; a TaskStore without a file stays in memory, and any other
+    list is written out in full to the default file. An explicit file_path
+    other than the collection's own file gets a full write of the tasks.
+
+    Args:
+        tasks (list | TaskStore): The changed collection of task dictionaries
+        records (list): Journal records describing the changes
+        file_path (str): File to persist to, None for the collection's own
+    """
+    own_path = getattr(tasks, "file_path", None)
+    if file_path is not None and file_path != own_path:
+        save_tasks(list(tasks), file_path)
+    elif isinstance(tasks, (TaskList, TaskStore)):
+        if tasks.file_path is not None:
+            append_changes(records, tasks.file_path)
+            if isinstance(tasks, TaskList):
+                tasks.version += len(records)
+    else:
+        save_tasks(tasks)
+
+def _take(tasks, limit):
+    """Materialize an iterable of tasks, stopping after limit items if given."""
+    if limit is None:
+        return list(tasks)
+    return list(islice(tasks, limit))
+
+def iter_tasks(file_path=DEFAULT_TASKS_FILE):
+    """
+    Stream tasks one at a time without loading the whole file.
+    
+    Every filter function accepts the result, so a query such as the first
+    50 overdue tasks stops reading as soon as it has them:
+    
+        get_overdue_tasks(iter_tasks(path), limit=50)
+    
+    Args:
+        file_path (str): Path to the file containing tasks
+        
+    Returns:
+        iterator: Task dictionaries in storage order
+    """
+    return get_storage(file_path).iter_tasks()
+
+@timed(size="arg")
 def generate_unique_id(tasks):
     """
     Generate a unique ID for a new task.
     
+    A TaskList or TaskStore answers from its high-water mark in O(1); a plain
+    list is scanned for its largest id.
+    
     Args:
-        tasks (list): List of existing task dictionaries
+        tasks (list | TaskStore): Existing task dictionaries
         
     Returns:
         int: A unique ID for a new task
     """
+    next_id = getattr(tasks, "next_id", None)
+    if next_id is not None:
+        return next_id
     if not tasks:
         return 1
     return max(task["id"] for task in tasks) + 1
 
-def filter_tasks_by_priority(tasks, priority):
+@timed(size="arg")
+def filter_tasks_by_priority(tasks, priority, limit=None):
     """
     Filter tasks by priority level.
     
     Args:
-        tasks (list): List of task dictionaries
+        tasks (iterable | TaskStore): Task dictionaries or an indexed store
         priority (str): Priority level to filter by (High, Medium, Low)
+        limit (int): Stop after this many matches, None for all
         
     Returns:
         list: Filtered list of tasks matching the priority
     """
-    return [task for task in tasks if task.get("priority") == priority]
+    if isinstance(tasks, TaskStore):
+        return _take(tasks.filter_by("priority", priority), limit)
+    return _take((task for task in tasks if task.get("priority") == priority), limit)
 
-def filter_tasks_by_priority(tasks, priority):
-    """Filter tasks by priority level"""
-    return [task for task in tasks if task.get("priority") == priority]
-
-def filter_tasks_by_completion(tasks, completed=True):
+@timed(size="arg")
+def filter_tasks_by_completion(tasks, completed=True, limit=None):
     """
     Filter tasks by completion status.
     
     Args:
-        tasks (list): List of task dictionaries
+        tasks (iterable | TaskStore): Task dictionaries or an indexed store
         completed (bool): Completion status to filter by
+        limit (int): Stop after this many matches, None for all
         
     Returns:
         list: Filtered list of tasks matching the completion status
     """
-    return [task for task in tasks if task.get("completed") == completed]
+    if isinstance(tasks, TaskStore):
+        return _take(tasks.filter_by("completed", completed), limit)
+    return _take((task for task in tasks if task.get("completed") == completed), limit)
+
+def _list_index(tasks):
+    """Indexed store over a TaskList, reused until its version or length changes."""
+    if not isinstance(tasks, TaskList):
+        raise ValueError("Index search needs a TaskStore or TaskList")
+    entry = getattr(tasks, "_search_index", None)
+    if entry is None or entry[:2] != (tasks.version, len(tasks)):
+        entry = tasks._search_index = (tasks.version, len(tasks), TaskStore(tasks))
+    return entry[2]
 
-def search_tasks(tasks, query):
+@timed(size="arg")
+def search_tasks(tasks, query, mode=None, limit=None):
     """
     Search tasks by a text query in title and description.
     
     Args:
-        tasks (list): List of task dictionaries
+        tasks (iterable | TaskStore): Task dictionaries or an indexed store
         query (str): Search query
+        mode (str): "index" for ranked word-prefix matching of every query term
+            through the inverted index, "substring" for a case-insensitive
+            substring scan. Defaults to "index" for a TaskStore and
+            "substring" for a list. A TaskList's index is built once per
+            version; other lists cannot be searched by index.
+        limit (int): Stop after this many matches, None for all
         
     Returns:
         list: Filtered list of tasks matching the search query
     """
+    if mode is None:
+        mode = "index" if isinstance(tasks, TaskStore) else "substring"
+    if mode == "index":
+        if not isinstance(tasks, TaskStore):
+            tasks = _list_index(tasks)
+        return tasks.search(query, limit=limit)
+    if mode != "substring":
+        raise ValueError(f"Unknown search mode: {mode}")
     query = query.lower()
-    return [
+    return _take((
         task for task in tasks 
         if query in task.get("title", "").lower() or 
            query in task.get("description", "").lower()
-    ]
+    ), limit)
+
+@timed(size="arg")
+def query(tasks, priority=None, category=None, completed=None, text=None,
+          due_before=None, due_after=None, overdue=False, sort=None,
+          descending=False, limit=None):
+    """
+    Apply several filters at once, optionally sorted, in a single pass.
+    
+    Equivalent to chaining filter_tasks_by_priority, filter_tasks_by_category,
+    filter_tasks_by_completion, search_tasks (substring mode) and
+    get_overdue_tasks, without building a list per filter: the predicates
+    are fused into one test, the most selective runs first, and a sorted
+    query with a limit keeps only the top tasks in a heap. Identical queries
+    on an unchanged TaskStore or TaskTable are answered from a memo (see
+    src/query.py).
+    
+    Args:
+        tasks (iterable | TaskStore | TaskTable): Tasks to query
+        priority (str): Priority level to match
+        category (str): Category name to match
+        completed (bool): Completion status to match
+        text (str): Case-insensitive substring of the title or description
+        due_before (str): Exclusive upper bound for due_date ("%Y-%m-%d")
+        due_after (str): Inclusive lower bound for due_date ("%Y-%m-%d")
+        overdue (bool): Only pending tasks past their due date
+        sort (str): Field to sort by (see query.SORT_FIELDS), missing values
+            last; None keeps the collection's order
+        descending (bool): Sort in reverse
+        limit (int): Maximum number of tasks to return, None for all
+        
+    Returns:
+        list: Matching task dictionaries
+    """
+    return run_query(tasks, Query(
+        priority, category, completed, text, due_before, due_after,
+        overdue, sort, descending, limit,
+    ))
 
-def get_overdue_tasks(tasks):
-    """Get tasks that are past due date"""
+@timed(size="arg")
+def get_overdue_tasks(tasks, limit=None):
+    """
+    Get tasks that are past due date (at most limit of them if given).
+    
+    A recurring task is overdue when its next pending occurrence (its
+    due_date) has passed.
+    """
+    if isinstance(tasks, TaskStore):
+        return _take(tasks.overdue(), limit)
+    if isinstance(tasks, TaskTable):
+        rows = tasks.overdue_rows(datetime.now().toordinal())
+        return [tasks.row(i) for i in rows[:limit]]
     today = datetime.now().strftime("%Y-%m-%d")
-    return [
+    return _take((
         task for task in tasks
         if not task.get("completed", False) and 
            task.get("due_date", "") < today
-    ]
-def get_due_soon_tasks(tasks, hours_threshold=24):
+    ), limit)
+@timed(size="arg")
+def get_tasks_due_between(tasks, start, end, limit=None):
     """
-    Get tasks that are due within the specified hours threshold (TDD Feature 1).
+    Get pending tasks whose due date falls in the window start < due <= end.
+    
+    A due date counts as midnight at the start of that day. Tasks without a
+    parsable due date are skipped.
     
     Args:
-        tasks (list): List of task dictionaries
-        hours_threshold (int): Hours window to consider as "due soon"
+        tasks (iterable | TaskStore | TaskTable): Task dictionaries, an indexed
+            store (range lookup) or a table (vectorized over pre-parsed dates)
+        start (datetime): Exclusive start of the window
+        end (datetime): Inclusive end of the window
+        limit (int): Stop after this many matches, None for all
         
     Returns:
-        list: Tasks due within the threshold
+        list: Tasks due within the window
     """
-    now = datetime.now()
-    due_soon = []
+    if isinstance(tasks, TaskStore):
+        return tasks.due_between(start, end, limit)
+    if isinstance(tasks, TaskTable):
+        # Midnight of day d is in the window iff start's day < d <= end's day
+        rows = tasks.due_between_rows(start.toordinal() + 1, end.toordinal())
+        return [tasks.row(i) for i in rows[:limit]]
+    matches = []
     for task in tasks:
+        if limit is not None and len(matches) >= limit:
+            break
         if not task.get("completed", False) and "due_date" in task:
             try:
                 due_date = datetime.strptime(task["due_date"], "%Y-%m-%d")
-                hours_until_due = (due_date - now).total_seconds() / 3600
-                if 0 < hours_until_due <= hours_threshold:
-                    due_soon.append(task)
             except ValueError:
                 continue
-    return due_soon
+            if start < due_date <= end:
+                matches.append(task)
+    return matches
 
-def add_task_with_category(tasks, title, category, **kwargs):
+@timed(size="arg")
+def get_due_soon_tasks(tasks, hours_threshold=24, limit=None):
     """
-    Add a new task with custom category (TDD Feature 2).
+    Get tasks that are due within the specified hours threshold (TDD Feature 1).
+    
+    Args:
+        tasks (iterable | TaskStore | TaskTable): Task dictionaries, an indexed
+            store or a table
+        hours_threshold (int): Hours window to consider as "due soon"
+        limit (int): Stop after this many matches, None for all
+        
+    Returns:
+        list: Tasks due within the threshold
+    """
+    now = datetime.now()
+    return get_tasks_due_between(tasks, now, now + timedelta(hours=hours_threshold), limit)
+
+def _keyed_occurrences(task, start, end):
+    """Occurrences of one task as (date, id, task), ready to merge across tasks."""
+    for day in recurrence.occurrences(task, start, end):
+        yield day, task["id"], task
+
+@timed(size="arg")
+def get_occurrences(tasks, start, end, limit=None):
+    """
+    Expand the pending occurrences of every task within a window of days.
+    
+    Recurring tasks store only their next pending occurrence as due_date, so
+    a task can only occur in the window if that date is on or before end:
+    a TaskStore or TaskTable finds those tasks with a due-date range lookup
+    and only their rules are expanded, lazily and merged in date order.
+    
+    Args:
+        tasks (iterable | TaskStore | TaskTable): Task dictionaries, an indexed
+            store or a table
+        start (date | datetime | str): First day of the window
+        end (date | datetime | str): Last day of the window (inclusive)
+        limit (int): Stop after this many occurrences, None for all
+        
+    Returns:
+        list: (date string, task) pairs ordered by date, then task id
+    """
+    last = recurrence.as_date(end)
+    if isinstance(tasks, TaskStore):
+        candidates = tasks.due_range(end=(last + timedelta(days=1)).strftime("%Y-%m-%d"))
+    elif isinstance(tasks, TaskTable):
+        candidates = [tasks.row(i) for i in tasks.due_between_rows(1, last.toordinal())]
+    else:
+        last_str = last.strftime("%Y-%m-%d")
+        candidates = (
+            task for task in tasks
+            if not task.get("completed", False)
+               and isinstance(task.get("due_date"), str) and task["due_date"] <= last_str
+        )
+    merged = heapq.merge(*(_keyed_occurrences(task, start, last) for task in candidates))
+    return [(day, task) for day, _, task in _take(merged, limit)]
+
+def new_task_dict(task_id, title, category, **kwargs):
+    """
+    Build a new task dictionary with the default fields filled in.
     
     Args:
-        tasks (list): List of existing tasks
+        task_id (int): ID for the task
         title (str): Task title
         category (str): Task category
-        **kwargs: Additional task attributes
+        **kwargs: Additional task attributes, overriding the defaults; a
+            "recurrence" rule moves due_date onto the rule's first occurrence
         
     Returns:
-        list: Updated list of tasks
+        dict: The new task
+        
+    Raises:
+        ValueError: If the recurrence rule is invalid
     """
+    now = datetime.now()
+    rule = kwargs.get(recurrence.RULE_FIELD)
+    if rule:
+        # The first due date is the first occurrence, which also anchors the rule
+        due_date = recurrence.first_due_date(
+            rule, kwargs.get("due_date") or (now + timedelta(days=1)).strftime("%Y-%m-%d")
+        )
+        kwargs = {**kwargs, "due_date": due_date, recurrence.START_FIELD: due_date}
     new_task = {
-        "id": generate_unique_id(tasks),
+        "id": task_id,
         "title": title,
         "category": category,
         "completed": False,
-        "due_date": (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d"),
-        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        "due_date": (now + timedelta(days=1)).strftime("%Y-%m-%d"),
+        "created_at": now.strftime("%Y-%m-%d %H:%M:%S")
     }
     new_task.update(kwargs)
-    tasks.append(new_task)
-    save_tasks(tasks)
+    return new_task
+
+@timed(size="arg")
+def add_task_with_category(tasks, title, category, file_path=None, **kwargs):
+    """
+    Add a new task with custom category (TDD Feature 2).
+    
+    Args:
+        tasks (list | TaskStore): Existing tasks
+        title (str): Task title
+        category (str): Task category
+        file_path (str): File to persist to, defaults to the file the tasks
+            came from (the default tasks file for a plain list)
+        **kwargs: Additional task attributes
+        
+    Returns:
+        list | TaskStore: Updated collection of tasks
+    """
+    new_task = new_task_dict(generate_unique_id(tasks), title, category, **kwargs)
+    if isinstance(tasks, TaskStore):
+        records = tasks.add(new_task)
+    else:
+        tasks.append(new_task)
+        if isinstance(tasks, TaskList):
+            tasks.next_id = max(tasks.next_id, new_task["id"] + 1)
+        records = [journal.add_record(new_task)]
+    _persist(tasks, records, file_path)
     return tasks
 
-def bulk_complete_tasks(tasks, task_ids):
+@timed(size="arg")
+def bulk_complete_tasks(tasks, task_ids, file_path=None):
     """
     Mark multiple tasks as completed (TDD Feature 3).
     
+    Completing a recurring task completes its current occurrence: due_date
+    advances to the next one and the task stays pending.
+    
+    A TaskStore looks each id up directly, so the cost is O(len(task_ids));
+    a list is walked once against a set of the ids.
+    
     Args:
-        tasks (list): List of task dictionaries
+        tasks (list | TaskStore): Task dictionaries
         task_ids (list): IDs of tasks to complete
+        file_path (str): File to persist to, defaults to the file the tasks
+            came from (the default tasks file for a plain list)
         
     Returns:
-        list: Updated list of tasks
+        list | TaskStore: Updated collection of tasks
     """
+    records = []
+    if isinstance(tasks, TaskStore):
+        for task_id in task_ids:
+            records.extend(tasks.complete(task_id))
+        _persist(tasks, records, file_path)
+        return tasks
+    task_ids = set(task_ids)
     for task in tasks:
         if task["id"] in task_ids:
-            task["completed"] = True
-    save_tasks(tasks)
+            changes = recurrence.completion_changes(task)
+            records.append(journal.update_record(
+                task["id"], changes, {field: task.get(field) for field in changes}, task
+            ))
+            task.update(changes)
+    _persist(tasks, records, file_path)
     return tasks
 
+@timed()
+def undo_changes(steps=1, file_path=DEFAULT_TASKS_FILE):
+    """
+    Undo the last journaled changes to a tasks file.
+    
+    Each change is reverted by appending its inverse record (see
+    src/feed.py), so undoing costs O(steps) whatever the size of the file.
+    The undo is itself a change: it reaches readers of the change feed
+    like any other and can be undone in turn. A change is one journal
+    record, e.g. completing three tasks at once is three changes.
+    
+    Args:
+        steps (int): Number of changes to undo
+        file_path (str): Path to the tasks file
+        
+    Returns:
+        list: The appended inverse records
+        
+    Raises:
+        ValueError: If fewer changes are available (they end at the last
+            full save, or compaction the feed did not see)
+    """
+    # The feed module brings in asyncio for its server; load it on first undo
+    from .feed import get_feed
+    storage = get_storage(file_path)
+    feed = get_feed(storage.file_path)
+    with storage.lock():
+        records = feed.inverse(steps)
+        storage.append(records)
+    task_cache.invalidate(storage.file_path)
+    _notify(storage.file_path, records)
+    return records
+
 def clear_tasks(file_path=DEFAULT_TASKS_FILE):
     """Clear all tasks (for testing)"""
     save_tasks([], file_path)
 
+@timed()
 def count_tasks(file_path=DEFAULT_TASKS_FILE):
-    """Count all tasks"""
-    return len(load_tasks(file_path))
+    """Count all tasks (from the maintained counters, so the file is not read)"""
+    return get_storage(file_path).count()
+
+@timed()
+def task_stats(file_path=DEFAULT_TASKS_FILE):
+    """
+    Get the task counters maintained alongside the tasks file.
+    
+    Every save and journaled change updates them, so reading them costs the
+    same for ten tasks as for a million.
+    
+    Args:
+        file_path (str): Path to the tasks file
+        
+    Returns:
+        Aggregates: Totals, per-category/priority, completed/pending and
+            pending-per-due-date counts
+    """
+    return get_storage(file_path).stats()
+
+def check_task_stats(file_path=DEFAULT_TASKS_FILE, repair=False):
+    """
+    Check the maintained counters against a full recount of the tasks.
+    
+    Args:
+        file_path (str): Path to the tasks file
+        repair (bool): Replace wrong counters with the recount
+        
+    Returns:
+        dict: (stored, actual) per differing counter; empty if consistent
+    """
+    storage = get_storage(file_path)
+    with storage.lock():
+        stored = storage.stats()
+        actual = Aggregates.from_tasks(storage.iter_tasks())
+        mismatches = diff(stored, actual)
+        if mismatches and repair:
+            storage.stats(refresh=True)
+    return mismatches
+
+@timed(size="result")
+def find_tasks(file_path=DEFAULT_TASKS_FILE, **filters):
+    """
+    Query stored tasks, letting the backend apply the filters (in SQL for SQLite).
+    
+    Args:
+        file_path (str): Path to the tasks file
+        **filters: priority, category, completed, due_before and/or due_after
+        
+    Returns:
+        list: Matching task dictionaries
+    """
+    return get_storage(file_path).query(**filters)
 
 def get_task_by_title(title, file_path=DEFAULT_TASKS_FILE):
     """Get task by title (for BDD assertions)"""
-    tasks = load_tasks(file_path)
-    return next((t for t in tasks if t["title"] == title), None)
+    return get_storage(file_path).find_by_title(title)
+
+def get_task(task_id, file_path=DEFAULT_TASKS_FILE):
+    """
+    Get one stored task by id.
+    
+    Binary snapshots and SQLite find it without reading the other tasks.
+    
+    Args:
+        task_id (int): ID of the task
+        file_path (str): Path to the tasks file
+        
+    Returns:
+        dict: The task, or None if there is no such task
+    """
+    return get_storage(file_path).get(task_id)
 
-def filter_tasks_by_category(tasks, category):
+@timed(size="arg")
+def filter_tasks_by_category(tasks, category, limit=None):
     """Filter tasks by category name
     
     Args:
-        tasks (list): List of task dictionaries
+        tasks (iterable | TaskStore): Task dictionaries or an indexed store
         category (str): Category name to filter by
+        limit (int): Stop after this many matches, None for all
         
     Returns:
         list: Filtered list of tasks
     """
-    return [task for task in tasks if task.get("category") == category]
\ No newline at end of file
+    if isinstance(tasks, TaskStore):
+        return _take(tasks.filter_by("category", category), limit)
+    return _take((task for task in tasks if task.get("category") == category), limit)
\ No newline at end of file
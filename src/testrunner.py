@@ -0,0 +1,359 @@
+import argparse
+import glob
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Directories whose contents decide whether a cached suite result is still valid
+SUITE_INPUTS = ("src", "tests", "features")
+
+# Files in SUITE_INPUTS that can change test results; task data and its
+# sidecars (.json, .journal, .stats, .tbin, .db, ...) change on every save
+SOURCE_SUFFIXES = (".py", ".feature")
+
+CACHE_DIR = os.path.join("reports", ".test_cache")
+
+
+def inputs_hash(root=PROJECT_ROOT, dirs=SUITE_INPUTS):
+    """
+    Hash every source file (SOURCE_SUFFIXES) a test run depends on.
+
+    Args:
+        root (str): Project root
+        dirs (tuple): Directories below root to include
+
+    Returns:
+        str: Hex digest over the relative paths and contents of the files
+    """
+    digest = hashlib.sha256()
+    for directory in dirs:
+        for dirpath, dirnames, filenames in os.walk(os.path.join(root, directory)):
+            dirnames[:] = sorted(d for d in dirnames if d != "__pycache__")
+            for name in sorted(filenames):
+                if not name.endswith(SOURCE_SUFFIXES):
+                    continue
+                path = os.path.join(dirpath, name)
+                digest.update(os.path.relpath(path, root).encode())
+                with open(path, "rb") as f:
+                    digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+class TestRun:
+    """
+    One suite run whose output is collected line by line while it executes.
+
+    Attributes:
+        name (str): Label shown in the UI
+        command (list): The command being run
+        status (str): "running", "passed", "failed" or "cached"
+        returncode (int): Exit code once finished
+    """
+
+    __test__ = False  # not a pytest test class
+
+    def __init__(self, name, command):
+        self.name = name
+        self.command = command
+        self.status = "running"
+        self.returncode = None
+        self.started = time.time()
+        self.elapsed = None
+        self._lines = []
+        self._done = threading.Event()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    @property
+    def passed(self):
+        return self.returncode == 0
+
+    def output(self):
+        """Return the output collected so far."""
+        return "".join(self._lines)
+
+    def wait(self, timeout=None):
+        """Block until the run finishes; returns True if it did."""
+        return self._done.wait(timeout)
+
+    def _append(self, line):
+        self._lines.append(line)
+
+    def _finish(self, returncode, cached=False):
+        self.returncode = returncode
+        self.elapsed = time.time() - self.started
+        self.status = "cached" if cached else ("passed" if returncode == 0 else "failed")
+        self._done.set()
+
+
+class TestRunner:
+    """
+    Run test suites in a background worker pool with a result cache.
+
+    A finished run is cached under the hash of src/, tests/ and features/
+    plus its command line, so rerunning a suite whose inputs have not
+    changed returns the stored output immediately.
+    """
+
+    __test__ = False
+
+    def __init__(self, root=PROJECT_ROOT, max_workers=2, cache_dir=CACHE_DIR):
+        self.root = root
+        self.cache_dir = os.path.join(root, cache_dir)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="test-runner")
+        self._runs = {}
+        self._lock = threading.Lock()
+
+    def _cache_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _cache_key(self, command):
+        digest = hashlib.sha256(inputs_hash(self.root).encode())
+        digest.update(json.dumps(command).encode())
+        return digest.hexdigest()
+
+    def submit(self, name, command, outputs=(), cache=True):
+        """
+        Start a suite in the background, or return its cached result.
+
+        Args:
+            name (str): Label of the run (the latest run per name is kept)
+            command (list): Command to run from the project root
+            outputs (tuple): Files the run writes (relative to the root); a
+                cached result is only used while they all still exist
+            cache (bool): Reuse and store results; False always runs the
+                command (e.g. benchmarks, whose result is not a function of
+                the sources alone)
+
+        Returns:
+            TestRun: The run, already finished if it came from the cache
+        """
+        with self._lock:
+            current = self._runs.get(name)
+            if current is not None and not current.done and current.command == command:
+                return current
+        key = self._cache_key(command) if cache else None
+        run = TestRun(name, command)
+        cached = self._load_cached(key, outputs) if cache else None
+        if cached is not None:
+            run._append(cached["output"])
+            run._finish(cached["returncode"], cached=True)
+        else:
+            self._pool.submit(self._execute, run, key)
+        with self._lock:
+            self._runs[name] = run
+        return run
+
+    def latest(self, name):
+        """Return the most recent run with the given name, or None."""
+        with self._lock:
+            return self._runs.get(name)
+
+    def _load_cached(self, key, outputs):
+        path = self._cache_path(key)
+        if not os.path.exists(path):
+            return None
+        if not all(os.path.exists(os.path.join(self.root, out)) for out in outputs):
+            return None
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def _execute(self, run, key):
+        # The run must finish whatever goes wrong, or its watchers wait forever
+        returncode = -1
+        try:
+            process = subprocess.Popen(
+                run.command,
+                cwd=self.root,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                bufsize=1,
+                env={**os.environ, "PYTHONPATH": self.root, "PYTHONUNBUFFERED": "1"},
+            )
+            for line in process.stdout:
+                run._append(line)
+            returncode = process.wait()
+            if key is not None:
+                try:
+                    self._store(key, run, returncode)
+                except (OSError, TypeError, ValueError) as e:
+                    run._append(f"Could not cache the result: {e}\n")
+        except OSError as e:
+            run._append(f"Error running {run.command[0]}: {e}\n")
+        except Exception as e:
+            run._append(f"Test run failed: {e!r}\n")
+            returncode = -1
+        finally:
+            run._finish(returncode)
+
+    def _store(self, key, run, returncode):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(self._cache_path(key), "w") as f:
+            json.dump({"command": run.command, "returncode": returncode,
+                       "output": run.output()}, f)
+
+    def clear_cache(self):
+        """Forget every cached result."""
+        for path in glob.glob(os.path.join(self.cache_dir, "*.json")):
+            os.remove(path)
+
+
+def pytest_command(args=(), coverage=False, parallel=True):
+    """
+    Build a pytest command line.
+
+    Args:
+        args (iterable): Extra pytest arguments
+        coverage (bool): Measure coverage of src/
+        parallel (bool): Spread tests over all cores with pytest-xdist (if installed)
+
+    Returns:
+        list: The command
+    """
+    command = [sys.executable, "-m", "pytest"]
+    if parallel and importlib.util.find_spec("xdist") is not None:
+        command += ["-n", "auto"]
+    if coverage:
+        command.append("--cov=src")
+    return command + list(args)
+
+
+def behave_command(paths=("features",), workers=None, outfile=None):
+    """Build a command running the scenarios in parallel behave processes."""
+    command = [sys.executable, "-m", "src.testrunner", "behave"]
+    if workers:
+        command += ["--workers", str(workers)]
+    if outfile:
+        command += ["--outfile", outfile]
+    return command + list(paths)
+
+
+_SCENARIO_RE = re.compile(r"^[ \t]*Scenario(?: Outline| Template)?:", re.MULTILINE)
+# Scenarios outside a worker's locations count as skipped there, so only
+# passed/failed are summed
+_SUMMARY_RE = re.compile(r"^(\d+) scenarios? passed, (\d+) failed", re.MULTILINE)
+
+
+def scenario_locations(paths=("features",)):
+    """
+    List every scenario as a behave "file:line" location.
+
+    Args:
+        paths (iterable): Feature files or directories holding them
+
+    Returns:
+        list: Locations in file and line order
+    """
+    features = []
+    for path in paths:
+        if os.path.isdir(path):
+            features += sorted(glob.glob(os.path.join(path, "**", "*.feature"), recursive=True))
+        else:
+            features.append(path)
+    locations = []
+    for feature in features:
+        with open(feature, "r") as f:
+            text = f.read()
+        for match in _SCENARIO_RE.finditer(text):
+            line = text.count("\n", 0, match.start()) + 1
+            locations.append(f"{feature}:{line}")
+    return locations
+
+
+def run_behave_parallel(paths=("features",), workers=None, args=(), stream=sys.stdout):
+    """
+    Run scenarios spread over several behave processes at the same time.
+
+    Scenarios are dealt round-robin to the workers (each scenario works on
+    its own tasks file, see features/environment.py). Each worker output is
+    written to stream as one block once it finishes, followed by the
+    combined scenario counts.
+
+    Args:
+        paths (iterable): Feature files or directories holding them
+        workers (int): Concurrent processes, defaults to the CPU count
+        args (iterable): Extra behave arguments
+        stream (file): Where to write the combined output
+
+    Returns:
+        int: 0 if every worker passed, else 1
+    """
+    locations = scenario_locations(paths)
+    if not locations:
+        stream.write("No feature files found\n")
+        return 1
+    workers = min(workers or os.cpu_count() or 1, len(locations))
+    groups = [locations[i::workers] for i in range(workers)]
+
+    def run(group):
+        result = subprocess.run(
+            [sys.executable, "-m", "behave", *args, *group],
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+        )
+        return result.returncode, result.stdout
+
+    status = 0
+    totals = [0, 0]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for worker, (returncode, output) in enumerate(pool.map(run, groups), 1):
+            stream.write(f"=== worker {worker}/{workers} ===\n{output}\n")
+            stream.flush()
+            status = status or (1 if returncode else 0)
+            for match in _SUMMARY_RE.finditer(output):
+                totals = [total + int(n) for total, n in zip(totals, match.groups())]
+    stream.write(f"{workers} workers: {totals[0]} scenarios passed, {totals[1]} failed\n")
+    return status
+
+
+class _Tee:
+    """Write to several text streams at once."""
+
+    def __init__(self, *streams):
+        self.streams = streams
+
+    def write(self, text):
+        for stream in self.streams:
+            stream.write(text)
+
+    def flush(self):
+        for stream in self.streams:
+            stream.flush()
+
+
+# Shared by every Streamlit session in the process
+test_runner = TestRunner()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Test runner helpers")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bdd = sub.add_parser("behave", help="run scenarios in parallel behave processes")
+    bdd.add_argument("--workers", type=int, help="concurrent behave processes")
+    bdd.add_argument("--outfile", help="also write the combined output to this file")
+    bdd.add_argument("paths", nargs="*", default=["features"])
+    args = parser.parse_args(argv)
+    if not args.outfile:
+        return run_behave_parallel(args.paths, args.workers)
+    buffer = io.StringIO()
+    status = run_behave_parallel(args.paths, args.workers, stream=_Tee(sys.stdout, buffer))
+    os.makedirs(os.path.dirname(args.outfile) or ".", exist_ok=True)
+    with open(args.outfile, "w") as f:
+        f.write(buffer.getvalue())
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+import numpy as np
+import pandas as pd
+
+from .cache import task_cache
+from .model import CATEGORIES, MISSING, PRIORITIES, TaskTable
+from .query import SORT_FIELDS
+from .storage import DEFAULT_TASKS_FILE, get_storage
+
+# Columns of the task frame, in display order
+FRAME_COLUMNS = (
+    "id", "title", "priority", "category", "due_date", "completed", "created_at", "description",
+)
+
+
+_UNIX_EPOCH_ORDINAL = 719163  # date(1970, 1, 1).toordinal()
+
+
+def _interned(table, column, interner):
+    codes = np.asarray(table.column(column), dtype=np.int64)
+    # from_codes maps MISSING (-1) to NaN; priorities keep their High < Medium < Low order
+    return pd.Categorical.from_codes(codes, categories=list(interner.values),
+                                     ordered=interner is PRIORITIES)
+
+
+def task_frame(table):
+    """
+    Build a pandas frame from a TaskTable's columns.
+
+    Dates become datetime64 columns (NaT where missing), priority and
+    category become categoricals, so sorting and filtering run vectorized.
+    Row i of the frame is row i of the table.
+
+    Args:
+        table (TaskTable): Columnar tasks
+
+    Returns:
+        pandas.DataFrame: One row per task with FRAME_COLUMNS
+    """
+    due = np.asarray(table.column("due"), dtype=np.int64)
+    created = np.asarray(table.column("created"), dtype=np.int64)
+    completed = np.asarray(table.column("completed"), dtype=np.int8)
+    return pd.DataFrame({
+        "id": np.asarray(table.column("id"), dtype=np.int64),
+        "title": table.title,
+        "priority": _interned(table, "priority", PRIORITIES),
+        "category": _interned(table, "category", CATEGORIES),
+        "due_date": pd.to_datetime(
+            np.where(due == MISSING, np.iinfo(np.int64).min, due - _UNIX_EPOCH_ORDINAL)
+            .astype("datetime64[D]")),
+        "completed": completed == 1,
+        "created_at": pd.to_datetime(
+            np.where(created == MISSING, np.iinfo(np.int64).min,
+                     created - _UNIX_EPOCH_ORDINAL * 86400).astype("datetime64[s]")),
+        "description": table.description,
+    }, columns=list(FRAME_COLUMNS))
+
+
+def cached_task_frame(file_path=DEFAULT_TASKS_FILE):
+    """
+    Get the tasks as a pandas frame, built once per version of the file.
+
+    Args:
+        file_path (str): Path to the tasks file
+
+    Returns:
+        pandas.DataFrame: Shared frame for the current file contents
+    """
+    storage = get_storage(file_path)
+    return task_cache.derived(
+        storage.file_path, "frame", lambda _: storage.load(),
+        lambda tasks: task_frame(TaskTable.from_dicts(tasks)),
+    )
+
+
+def sort_order(frame, sort_by="due_date", descending=False):
+    """
+    Row positions of the frame in sorted order (missing values last).
+
+    Args:
+        frame (pandas.DataFrame): Task frame
+        sort_by (str): One of SORT_FIELDS
+        descending (bool): Reverse the order
+
+    Returns:
+        numpy.ndarray: Row positions
+    """
+    if sort_by not in SORT_FIELDS:
+        raise ValueError(f"Cannot sort by {sort_by!r}")
+    column = frame[sort_by]
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        # Sort by code; missing (-1) goes last in either direction
+        codes = column.cat.codes.to_numpy().astype(np.int64)
+        if not column.cat.ordered:
+            # Unordered categories (e.g. interned categories) sort by name
+            rank = np.argsort(np.argsort(np.asarray(column.cat.categories, dtype=object)))
+            codes = np.where(codes < 0, -1, rank[np.maximum(codes, 0)])
+        keys = np.where(codes < 0, np.iinfo(np.int64).max, -codes if descending else codes)
+        return np.argsort(keys, kind="stable")
+    return np.asarray(column.sort_values(ascending=not descending, na_position="last",
+                                         kind="stable").index)
+
+
+def cached_sort_order(file_path=DEFAULT_TASKS_FILE, sort_by="due_date", descending=False,
+                      frame=None):
+    """
+    Sort order of the cached frame, computed once per file version and sort key.
+
+    Args:
+        file_path (str): Path to the tasks file
+        sort_by (str): One of SORT_FIELDS
+        descending (bool): Reverse the order
+        frame (pandas.DataFrame): The frame being shown, if it may be from an
+            earlier version of the file (it is then sorted afresh)
+
+    Returns:
+        numpy.ndarray: Row positions
+    """
+    storage = get_storage(file_path)
+
+    def build(_):
+        built = cached_task_frame(file_path)
+        return built, sort_order(built, sort_by, descending)
+
+    built, order = task_cache.derived(
+        storage.file_path, f"order:{sort_by}:{descending}", lambda _: storage.load(), build
+    )
+    if frame is not None and frame is not built:
+        return sort_order(frame, sort_by, descending)
+    return order
+
+
+def select_rows(frame, order, search=None, priority=None, category=None, completed=None):
+    """
+    Filter sorted row positions without materializing any rows.
+
+    Args:
+        frame (pandas.DataFrame): Task frame
+        order (numpy.ndarray): Row positions in display order
+        search (str): Case-insensitive substring of the title or description
+        priority (str): Priority to keep, None for all
+        category (str): Category to keep, None for all
+        completed (bool): Completion status to keep, None for all
+
+    Returns:
+        numpy.ndarray: The positions from order that match, in order
+    """
+    mask = np.ones(len(frame), dtype=bool)
+    if priority is not None:
+        mask &= (frame["priority"] == priority).to_numpy()
+    if category is not None:
+        mask &= (frame["category"] == category).to_numpy()
+    if completed is not None:
+        mask &= frame["completed"].to_numpy() == completed
+    if search:
+        matches = np.zeros(len(frame), dtype=bool)
+        for column in ("title", "description"):
+            found = frame[column].str.contains(search, case=False, regex=False, na=False)
+            matches |= found.to_numpy(dtype=bool)
+        mask &= matches
+    return order[mask[order]]
+
+
+def page_rows(frame, rows, page, page_size):
+    """
+    Materialize one page of the selected rows.
+
+    Args:
+        frame (pandas.DataFrame): Task frame
+        rows (numpy.ndarray): Selected row positions in display order
+        page (int): Zero-based page number
+        page_size (int): Rows per page
+
+    Returns:
+        pandas.DataFrame: At most page_size rows
+    """
+    start = page * page_size
+    return frame.iloc[rows[start:start + page_size]]
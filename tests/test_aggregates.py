@@ -0,0 +1,92 @@
+import json
+import pytest
+from src import journal
+from src.aggregates import Aggregates
+from src.session import task_session
+from src.storage import get_storage
+from src.tasks import (
+    add_task_with_category, bulk_complete_tasks, check_task_stats, count_tasks,
+    load_store, load_tasks, save_tasks, task_stats
+)
+
+
+@pytest.fixture(params=["tasks.json", "tasks.db"])
+def path(request, tmp_path):
+    path = str(tmp_path / request.param)
+    save_tasks([
+        {"id": 1, "title": "Old", "priority": "High", "category": "Work",
+         "due_date": "2000-01-01", "completed": False},
+        {"id": 2, "title": "Done", "priority": "Low", "category": "Home",
+         "due_date": "2000-01-01", "completed": True},
+        {"id": 3, "title": "Later", "priority": "High", "category": "Home",
+         "due_date": "2099-01-01", "completed": False},
+        {"id": 4, "title": "Undated", "category": "Work", "completed": False},
+    ], path)
+    return path
+
+
+def test_counters(path):
+    stats = task_stats(path)
+    assert (stats.total, stats.completed, stats.pending) == (4, 1, 3)
+    assert stats.by_category == {"Work": 2, "Home": 2}
+    assert stats.by_priority == {"High": 2, "Low": 1, "": 1}
+    # Pending tasks without a due date count as overdue, like get_overdue_tasks
+    assert stats.overdue("2026-01-01") == 2
+    assert stats.summary("2026-01-01")["overdue"] == 2
+
+
+def test_counters_follow_every_kind_of_mutation(path):
+    tasks = load_tasks(path)
+    add_task_with_category(tasks, "New", "School", priority="Low", due_date="2026-03-01")
+    bulk_complete_tasks(tasks, [1, 5])
+    store = load_store(path)
+    bulk_complete_tasks(store, [3])
+    with task_session(path) as session:
+        session.update(4, category="Home", due_date="2026-02-01")
+        session.delete(2)
+
+    stats = task_stats(path)
+    assert stats == Aggregates.from_tasks(load_tasks(path))
+    assert stats.by_category == {"Work": 1, "Home": 2, "School": 1}
+    assert check_task_stats(path) == {}
+
+
+def test_count_reads_only_the_counters(path, monkeypatch):
+    storage = get_storage(path)
+    storage.stats()
+    monkeypatch.setattr(type(storage), "iter_tasks", lambda self: pytest.fail("scanned"))
+    assert count_tasks(path) == 4
+
+
+def test_stale_counters_are_recomputed(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    save_tasks([{"id": 1, "title": "A", "completed": False}], path)
+    # A writer that bypasses the counters (e.g. an older version of the app)
+    with open(journal.journal_path(path), "a") as f:
+        f.write(json.dumps(journal.add_record({"id": 2, "title": "B"})) + "\n")
+    assert task_stats(path).total == 2
+
+
+def test_checker_reports_and_repairs_drift(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    save_tasks([{"id": 1, "title": "A", "category": "Work", "completed": False}], path)
+    stored = json.loads(open(journal.stats_path(path)).read())
+    stored["stats"]["total"] = 7
+    stored["stats"]["by_category"] = {"Home": 1}
+    with open(journal.stats_path(path), "w") as f:
+        json.dump(stored, f)
+
+    assert check_task_stats(path, repair=True) == {
+        "total": (7, 1), "pending": (7, 1),
+        "by_category.Home": (1, 0), "by_category.Work": (0, 1),
+    }
+    assert check_task_stats(path) == {}
+
+
+def test_compaction_keeps_the_counters(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    tasks = load_tasks(path)
+    for i in range(5):
+        add_task_with_category(tasks, f"T{i}", "Work")
+    journal.compact(path)
+    assert journal.read_stats(path) == Aggregates.from_tasks(load_tasks(path))
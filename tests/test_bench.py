@@ -0,0 +1,53 @@
+from collections import Counter
+from benchmarks import bench_tasks
+from benchmarks.bench_tasks import (
+    compare, generate_tasks, load_history, parse_size, run_benchmarks, write_report
+)
+
+
+def test_generated_tasks_are_realistic():
+    tasks = generate_tasks(5000, seed=1)
+    assert [t["id"] for t in tasks] == list(range(1, 5001))
+    priorities = Counter(t["priority"] for t in tasks)
+    assert priorities["Medium"] > priorities["Low"] > priorities["High"]
+    assert 0.3 < sum(t["completed"] for t in tasks) / 5000 < 0.4
+    assert 0.85 < sum("due_date" in t for t in tasks) / 5000 < 0.95
+    assert generate_tasks(10, seed=1)[:3] == generate_tasks(3, seed=1)
+
+
+def test_parse_size():
+    assert [parse_size(s) for s in ("1k", "100K", "1m", "250")] == [
+        1_000, 100_000, 1_000_000, 250
+    ]
+
+
+def test_run_covers_every_case(monkeypatch):
+    monkeypatch.setattr(bench_tasks, "TARGET_SECONDS", 0.001)
+    report = run_benchmarks([50], stream=None)
+    cases = {r["case"] for r in report["results"]}
+    assert "load_tasks" in cases and "bulk_complete_tasks" in cases
+    assert "get_task_binary" in cases
+    assert len(cases) == 16
+    assert all(r["seconds"] > 0 and r["peak_bytes"] >= 0 for r in report["results"])
+
+
+def test_compare_flags_slowdowns_over_threshold():
+    def report(*seconds):
+        return {"results": [
+            {"case": name, "size": 1000, "seconds": s}
+            for name, s in zip(("a", "b", "c"), seconds)
+        ]}
+    baseline = report(0.010, 0.010, 0.0001)
+    assert compare(report(0.012, 0.009, 0.0009), baseline, threshold=0.25) == []
+    assert compare(report(0.020, 0.010, 0.0001), baseline, threshold=0.25) == [
+        ("a", 1000, 0.010, 0.020)
+    ]
+
+
+def test_reports_are_kept_as_history(tmp_path):
+    for stamp in ("2026-01-01T10:00:00", "2026-01-02T10:00:00"):
+        write_report({"timestamp": stamp, "results": []}, str(tmp_path))
+    assert [r["timestamp"] for r in load_history(str(tmp_path))] == [
+        "2026-01-01T10:00:00", "2026-01-02T10:00:00"
+    ]
+    assert (tmp_path / "latest.json").exists()
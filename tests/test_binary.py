@@ -0,0 +1,118 @@
+import io
+import os
+import pytest
+from src import binary, journal
+from src.binary import BinarySnapshot, convert, open_snapshot, write_tasks
+from src.storage import BinaryStorage, get_storage
+from src.tasks import (
+    add_task_with_category, bulk_complete_tasks, count_tasks, get_task,
+    get_task_by_title, load_tasks, save_tasks
+)
+
+TASKS = [
+    {"id": 3, "title": "Report", "description": "Quarterly", "priority": "High",
+     "category": "Work", "completed": False, "due_date": "2026-05-01",
+     "created_at": "2026-04-01 09:30:00"},
+    {"id": 1, "title": "Groceries ü", "category": "Home", "completed": True},
+    {"id": 7, "title": "Odd", "due_date": "soon", "completed": "no", "tags": ["a", 1]},
+    {"id": 2, "description": "No title", "priority": "Urgent"},
+]
+
+
+@pytest.mark.parametrize("codec", ["none", "zlib"])
+def test_round_trip_and_random_access(tmp_path, codec):
+    path = str(tmp_path / "tasks.tbin")
+    with open(path, "wb") as f:
+        write_tasks(TASKS, f, codec, block_size=2)
+    snapshot = BinarySnapshot(path)
+    try:
+        assert snapshot.codec == codec
+        assert list(snapshot) == TASKS
+        assert len(snapshot) == 4
+        assert snapshot.row(2) == TASKS[2]
+        assert snapshot.get(7) == TASKS[2]
+        assert snapshot.get(4) is None
+        assert [row for row, _ in snapshot.iter_title("Groceries ü")] == [1]
+    finally:
+        snapshot.close()
+
+
+def test_rejects_other_files_and_codecs(tmp_path):
+    path = tmp_path / "tasks.tbin"
+    path.write_bytes(b"[]" + bytes(100))
+    with pytest.raises(ValueError):
+        BinarySnapshot(str(path))
+    with pytest.raises(ValueError):
+        write_tasks(TASKS, io.BytesIO(), "brotli")
+
+
+def test_tasks_functions_use_the_format_transparently(tmp_path):
+    path = str(tmp_path / "tasks.tbin")
+    save_tasks(TASKS, path)
+    assert isinstance(get_storage(path), BinaryStorage)
+    with open(path, "rb") as f:
+        assert f.read(4) == binary.MAGIC
+
+    tasks = load_tasks(path)
+    add_task_with_category(tasks, "Report", "Home")
+    bulk_complete_tasks(tasks, [3])
+    with open(journal.journal_path(path)) as f:
+        assert len(f.readlines()) == 2
+
+    assert count_tasks(path) == 5
+    assert get_task(3, path)["completed"] is True
+    assert get_task(8, path)["category"] == "Home"
+    assert get_task(9, path) is None
+    # The first match in iteration order, journal changes included
+    assert get_task_by_title("Report", path)["id"] == 3
+    assert load_tasks(path) == get_storage(path).load()
+
+    journal.compact(path)
+    assert not os.path.exists(journal.journal_path(path))
+    assert open_snapshot(path).get(3)["completed"] is True
+    assert [task["id"] for task in load_tasks(path)] == [3, 1, 7, 2, 8]
+
+
+def test_codec_is_kept_across_writes(tmp_path, monkeypatch):
+    path = str(tmp_path / "tasks.tbin")
+    monkeypatch.setenv(binary.CODEC_ENV, "zlib")
+    save_tasks(TASKS, path)
+    monkeypatch.delenv(binary.CODEC_ENV)
+    add_task_with_category(load_tasks(path), "New", "Work")
+    journal.compact(path)
+    assert binary.snapshot_codec(path) == "zlib"
+
+
+def test_converter(tmp_path):
+    json_path = str(tmp_path / "tasks.json")
+    save_tasks(TASKS, json_path)
+    add_task_with_category(load_tasks(json_path), "Journaled", "Work")
+
+    binary.main([json_path, str(tmp_path / "copy.tbin"), "--codec", "zlib"])
+    assert binary.snapshot_codec(str(tmp_path / "copy.tbin")) == "zlib"
+    assert convert(str(tmp_path / "copy.tbin"), str(tmp_path / "back.json")) == 5
+    assert load_tasks(str(tmp_path / "back.json")) == load_tasks(json_path)
+
+
+def test_backend_env_migrates_json(tmp_path, monkeypatch):
+    json_path = str(tmp_path / "tasks.json")
+    save_tasks(TASKS, json_path)
+    monkeypatch.setenv("TODO_STORAGE_BACKEND", "binary")
+    storage = get_storage(json_path)
+    assert storage.file_path == str(tmp_path / "tasks.tbin")
+    assert storage.load() == TASKS
+
+
+def test_open_snapshots_are_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(binary, "_OPEN_SNAPSHOTS", 2)
+    paths = [str(tmp_path / f"tasks{i}.tbin") for i in range(3)]
+    for path in paths:
+        save_tasks(TASKS, path)
+    first = open_snapshot(paths[0])
+    open_snapshot(paths[1])
+    assert open_snapshot(paths[0]) is first
+    open_snapshot(paths[2])
+    assert len(binary._open) <= 2
+    assert os.path.abspath(paths[1]) not in binary._open
+    # Evicted snapshots stay readable for whoever still holds them
+    assert open_snapshot(paths[0]) is first and first.get(3) == TASKS[0]
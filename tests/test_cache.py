@@ -0,0 +1,61 @@
+import json
+from src.cache import TaskCache, task_cache
+from src.tasks import cached_load_tasks, save_tasks, add_task_with_category, load_tasks
+
+
+def test_hit_while_file_is_unchanged(tmp_path):
+    path = tmp_path / "tasks.json"
+    path.write_text('[{"id": 1, "title": "A"}]')
+    cache = TaskCache()
+    calls = []
+
+    def loader(p):
+        calls.append(p)
+        return json.loads(open(p).read())
+
+    first = cache.get(str(path), loader)
+    assert cache.get(str(path), loader) is first
+    assert len(calls) == 1
+    assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+
+def test_external_change_is_detected(tmp_path):
+    path = tmp_path / "tasks.json"
+    path.write_text("[]")
+    cache = TaskCache()
+    loader = lambda p: json.loads(open(p).read())
+    assert cache.get(str(path), loader) == []
+    path.write_text('[{"id": 1, "title": "Written elsewhere"}]')
+    assert len(cache.get(str(path), loader)) == 1
+    assert cache.misses == 2
+
+
+def test_mutations_invalidate_shared_cache(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    save_tasks([{"id": 1, "title": "A", "completed": False}], path)
+    tasks = cached_load_tasks(path)
+    assert cached_load_tasks(path) is tasks
+
+    add_task_with_category(load_tasks(path), "B", "Work")
+    assert [t["title"] for t in cached_load_tasks(path)] == ["A", "B"]
+    save_tasks([], path)
+    assert cached_load_tasks(path) == []
+    task_cache.invalidate(path)
+
+
+def test_least_recently_used_files_are_evicted(tmp_path):
+    cache = TaskCache(capacity=2)
+    loader = lambda p: json.loads(open(p).read())
+    paths = []
+    for name in "abc":
+        path = tmp_path / f"{name}.json"
+        path.write_text("[]")
+        paths.append(str(path))
+    first = cache.get(paths[0], loader)
+    cache.get(paths[1], loader)
+    assert cache.get(paths[0], loader) is first
+    cache.get(paths[2], loader)
+    assert cache.stats()["entries"] == 2
+    assert cache.get(paths[0], loader) is first
+    cache.get(paths[1], loader)
+    assert cache.misses == 4
@@ -0,0 +1,81 @@
+import multiprocessing
+import threading
+import pytest
+from src import journal
+from src.storage import ConcurrentModificationError
+from src.tasks import load_tasks, save_tasks, add_task_with_category, locked_tasks
+
+PROCESSES = 4
+
+
+def _add_with_lock(path, worker, count):
+    for i in range(count):
+        with locked_tasks(path) as tasks:
+            add_task_with_category(tasks, f"worker {worker} task {i}", "Stress")
+
+
+def _increment_optimistically(path, count):
+    done = 0
+    while done < count:
+        tasks = load_tasks(path)
+        tasks[0]["counter"] += 1
+        try:
+            save_tasks(tasks, path, expected_version=tasks.version)
+        except ConcurrentModificationError:
+            continue
+        done += 1
+
+
+def _run_processes(target, args_per_process):
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=target, args=args) for args in args_per_process]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(timeout=60)
+        assert p.exitcode == 0
+
+
+@pytest.mark.skipif(journal.fcntl is None, reason="needs fcntl file locking")
+def test_locked_read_modify_write_loses_no_updates(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    _run_processes(_add_with_lock, [(path, w, 25) for w in range(PROCESSES)])
+
+    tasks = load_tasks(path)
+    assert len(tasks) == PROCESSES * 25
+    assert len({t["id"] for t in tasks}) == PROCESSES * 25
+
+
+@pytest.mark.skipif(journal.fcntl is None, reason="needs fcntl file locking")
+def test_optimistic_version_check_loses_no_updates(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    save_tasks([{"id": 1, "title": "Counter", "counter": 0}], path)
+    _run_processes(_increment_optimistically, [(path, 10)] * PROCESSES)
+    assert load_tasks(path)[0]["counter"] == PROCESSES * 10
+
+
+def test_stale_save_is_rejected(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    save_tasks([], path)
+    first, second = load_tasks(path), load_tasks(path)
+    add_task_with_category(first, "Journaled", "Work")
+    with pytest.raises(ConcurrentModificationError):
+        save_tasks(second, path, expected_version=second.version)
+    save_tasks(first, path, expected_version=first.version)
+
+
+def test_concurrent_appends_are_group_committed(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    threads = [
+        threading.Thread(target=lambda n=n: [
+            journal.append_records(path, [journal.add_record({"id": n * 100 + i})])
+            for i in range(50)
+        ])
+        for n in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(journal.read_records(path)) == 400
+    assert len(load_tasks(path)) == 400
@@ -0,0 +1,66 @@
+import pytest
+from datetime import datetime, timedelta
+from src import model
+from src.model import TaskTable
+from src.store import TaskStore
+from src.tasks import (
+    get_due_soon_tasks, get_overdue_tasks, get_tasks_due_between,
+    cached_task_table, save_tasks
+)
+
+
+def _day(offset):
+    return (datetime.now() + timedelta(days=offset)).strftime("%Y-%m-%d")
+
+
+@pytest.fixture(params=["numpy", "array"], autouse=True)
+def column_backend(request, monkeypatch):
+    """Run every test with and without NumPy-backed columns."""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(model, "_numpy", lambda: None)
+    return request.param
+
+
+@pytest.fixture
+def tasks():
+    return [
+        {"id": 1, "title": "Yesterday", "due_date": _day(-1), "completed": False},
+        {"id": 2, "title": "Tomorrow", "due_date": _day(1), "completed": False},
+        {"id": 3, "title": "Done tomorrow", "due_date": _day(1), "completed": True},
+        {"id": 4, "title": "In three days", "due_date": _day(3), "completed": False},
+        {"id": 5, "title": "Malformed", "due_date": "someday", "completed": False},
+        {"id": 6, "title": "No date", "completed": False},
+        {"id": 7, "title": "Odd flag", "due_date": _day(1), "completed": "yes"},
+    ]
+
+
+@pytest.mark.parametrize("wrap", [list, TaskStore, TaskTable.from_dicts])
+def test_due_soon_matches_across_representations(tasks, wrap):
+    ids = lambda result: sorted(t["id"] for t in result)
+    assert ids(get_due_soon_tasks(wrap(tasks))) == [2]
+    assert ids(get_due_soon_tasks(wrap(tasks), hours_threshold=96)) == [2, 4]
+
+
+@pytest.mark.parametrize("wrap", [list, TaskTable.from_dicts])
+def test_overdue_matches_legacy_semantics(tasks, wrap):
+    assert [t["id"] for t in get_overdue_tasks(wrap(tasks))] == [1, 6]
+
+
+@pytest.mark.parametrize("wrap", [list, TaskStore, TaskTable.from_dicts])
+def test_arbitrary_windows(tasks, wrap):
+    start = datetime.now() - timedelta(days=2)
+    end = datetime.now() + timedelta(days=2)
+    result = get_tasks_due_between(wrap(tasks), start, end)
+    assert sorted(t["id"] for t in result) == [1, 2]
+    assert len(get_tasks_due_between(wrap(tasks), start, end, limit=1)) == 1
+
+
+def test_cached_table_is_rebuilt_after_changes(tmp_path, tasks):
+    path = str(tmp_path / "tasks.json")
+    save_tasks(tasks, path)
+    table = cached_task_table(path)
+    assert cached_task_table(path) is table
+    save_tasks(tasks[:2], path)
+    assert len(cached_task_table(path)) == 2
@@ -0,0 +1,166 @@
+import threading
+import pytest
+from src import journal
+from src.feed import ChangeFeed, FeedClient, FeedServer, FeedView, VersionFeed, get_feed
+from src.session import task_session
+from src.tasks import (
+    add_task_with_category, bulk_complete_tasks, check_task_stats, load_tasks, save_tasks,
+    undo_changes
+)
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    save_tasks([
+        {"id": 1, "title": "Write report", "category": "Work", "priority": "High",
+         "due_date": "2000-01-01", "completed": False},
+        {"id": 2, "title": "Buy milk", "category": "Home", "priority": "Low",
+         "due_date": "2000-01-02", "completed": False},
+    ], path)
+    return path
+
+
+def test_events_carry_the_data_version(path):
+    feed = ChangeFeed(path)
+    start = feed.sync()
+    assert start == load_tasks(path).version
+
+    tasks = load_tasks(path)
+    add_task_with_category(tasks, "Call Bob", "Work")
+    bulk_complete_tasks(tasks, [1, 2])
+    version, events = feed.since(start)
+    assert version == tasks.version == start + 3
+    assert [(e["version"], e["op"]) for e in events] == [
+        (start + 1, "add"), (start + 2, "update"), (start + 3, "update")
+    ]
+    assert feed.since(start + 2) == (version, events[2:])
+    assert feed.since(version) == (version, [])
+
+
+def test_changes_of_other_writers_are_seen(path):
+    feed = ChangeFeed(path)
+    start = feed.sync()
+    with task_session(path) as session:
+        session.delete(2)
+    journal.append_records(path, [journal.add_record({"id": 9, "title": "Raw"})])
+    _, events = feed.since(start)
+    assert [e["op"] for e in events] == ["delete", "add"]
+
+
+def test_compaction_keeps_the_stream_and_a_full_save_resets_it(path):
+    feed = ChangeFeed(path)
+    start = feed.sync()
+    add_task_with_category(load_tasks(path), "A", "Work")
+    feed.sync()
+    journal.compact(path)
+    add_task_with_category(load_tasks(path), "B", "Work")
+    _, events = feed.since(start)
+    assert [e["task"]["title"] for e in events] == ["A", "B"]
+
+    # Records compacted away before a new feed saw them are gone
+    assert ChangeFeed(path).since(start) == (start + 2, None)
+    save_tasks(load_tasks(path), path)
+    version, events = feed.since(start + 2)
+    assert events is None and version == start + 3
+    assert feed.since(version) == (version, [])
+
+
+def test_old_events_are_dropped_past_capacity(path):
+    feed = ChangeFeed(path, capacity=2)
+    start = feed.sync()
+    tasks = load_tasks(path)
+    for i in range(5):
+        add_task_with_category(tasks, f"T{i}", "Work")
+    assert feed.since(start)[1] is None
+    assert len(feed.since(start + 3)[1]) == 2
+
+
+def test_view_patches_its_store_in_place(path):
+    view = FeedView(path)
+    store = view.store
+    tasks = load_tasks(path)
+    add_task_with_category(tasks, "Review PR", "Work", priority="High", due_date="2000-01-03")
+    bulk_complete_tasks(tasks, [1])
+    events = view.refresh()
+    assert len(events) == 2 and view.version == tasks.version
+    assert view.store is store and view.reloads == 1
+    assert [t["title"] for t in store.filter_by("priority", "High")] == ["Write report", "Review PR"]
+    assert [t["id"] for t in store.overdue("2026-01-01")] == [2, 3]
+    assert [t["id"] for t in store.search("review")] == [3]
+    # Its own changes come back from the feed without harm
+    add_task_with_category(store, "Mine", "Home")
+    view.refresh()
+    assert len(store) == 4 and store.count_by("category", "Home") == 2
+
+    save_tasks(load_tasks(path)[:1], path)
+    assert view.refresh() is None
+    assert view.reloads == 2 and len(view.store) == 1
+
+
+def test_view_of_sqlite_tasks_reloads_on_each_change(path, monkeypatch):
+    monkeypatch.setenv("TODO_STORAGE_BACKEND", "sqlite")
+    with pytest.raises(ValueError):
+        get_feed(path)
+    view = FeedView(path)
+    assert isinstance(view.feed, VersionFeed) and len(view.store) == 2
+    assert view.refresh() == []
+
+    tasks = load_tasks(path)
+    add_task_with_category(tasks, "Review PR", "Work", priority="High")
+    assert view.refresh() is None
+    assert view.reloads == 2 and view.version == tasks.version
+    assert [t["title"] for t in view.store.filter_by("priority", "High")] == [
+        "Write report", "Review PR"
+    ]
+
+
+def test_undo_replays_inverse_events(path):
+    before = list(load_tasks(path))
+    tasks = load_tasks(path)
+    add_task_with_category(tasks, "Oops", "Work")
+    bulk_complete_tasks(tasks, [1])
+    with task_session(path) as session:
+        session.delete(2)
+
+    records = undo_changes(3, path)
+    assert [r["op"] for r in records] == ["add", "update", "delete"]
+    assert list(load_tasks(path)) == before
+    assert check_task_stats(path) == {}
+    # The undo is a change like any other
+    undo_changes(1, path)
+    assert [t["title"] for t in load_tasks(path)] == ["Write report", "Buy milk", "Oops"]
+
+
+def test_undo_stops_at_a_full_save(path):
+    with pytest.raises(ValueError):
+        undo_changes(1, path)
+    add_task_with_category(load_tasks(path), "A", "Work")
+    with pytest.raises(ValueError):
+        undo_changes(2, path)
+    assert undo_changes(0, path) == []
+
+
+def test_feed_is_served_over_a_socket(path):
+    server = FeedServer(path)
+    port = server.run_in_thread()
+    client = FeedClient(f"127.0.0.1:{port}")
+    try:
+        start = get_feed(path).sync()
+        assert client.since(start) == (start, [])
+        assert client.since(start - 1) == (start, None)
+
+        # A long poll is answered by the next change
+        writer = threading.Timer(0.2, lambda: add_task_with_category(load_tasks(path), "A", "Work"))
+        writer.start()
+        version, events = client.since(start, wait=5)
+        writer.join()
+        assert version == start + 1 and events[0]["task"]["title"] == "A"
+
+        view = FeedView(path, feed=client)
+        add_task_with_category(load_tasks(path), "B", "Work")
+        view.refresh(wait=5)
+        assert view.reloads == 1 and len(view.store) == 4
+    finally:
+        client.close()
+        server.stop()
@@ -0,0 +1,44 @@
+from src.store import TaskStore
+from src.tasks import (
+    load_tasks, load_store, save_tasks, add_task_with_category,
+    bulk_complete_tasks, generate_unique_id, TaskList
+)
+
+
+def test_task_list_allocates_from_high_water_mark():
+    tasks = TaskList([{"id": 3}, {"id": 7}], file_path=None)
+    assert generate_unique_id(tasks) == 8
+    add_task_with_category(tasks, "New", "Work")
+    assert tasks[-1]["id"] == 8
+    assert generate_unique_id(tasks) == 9
+
+
+def test_deleted_ids_are_not_reused(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    tasks = load_tasks(path)
+    add_task_with_category(tasks, "First", "Work")
+    add_task_with_category(tasks, "Second", "Work")
+    save_tasks([t for t in tasks if t["title"] != "Second"], path)
+
+    reloaded = load_tasks(path)
+    assert generate_unique_id(reloaded) == 3
+
+
+def test_store_add_and_bulk_complete(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    store = load_store(path)
+    for title in ("A", "B", "C"):
+        add_task_with_category(store, title, "Work")
+    bulk_complete_tasks(store, [1, 3, 42])
+
+    assert [t["completed"] for t in store] == [True, False, True]
+    assert [t["completed"] for t in load_tasks(path)] == [True, False, True]
+    assert load_store(path).next_id == 4
+
+
+def test_memory_only_store_is_not_persisted(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = TaskStore()
+    add_task_with_category(store, "A", "Work")
+    assert len(store) == 1
+    assert not (tmp_path / "tasks.json.journal").exists()
@@ -0,0 +1,24 @@
+import os
+import subprocess
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def loaded_modules(module):
+    """Names of every module loaded by a cold import of module."""
+    code = f"import sys, {module}; print('\\n'.join(sys.modules))"
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    return set(output.split())
+
+
+@pytest.mark.parametrize("heavy", ["pandas", "streamlit", "sqlite3", "http.client"])
+def test_core_import_stays_light(heavy):
+    assert heavy not in loaded_modules("src.tasks")
+
+
+def test_test_runner_does_not_load_test_frameworks():
+    modules = loaded_modules("src.testrunner")
+    assert not {"pytest", "behave", "pandas"} & modules
@@ -0,0 +1,74 @@
+import json
+import os
+from src import journal
+from src.tasks import (
+    load_tasks, save_tasks, add_task_with_category, bulk_complete_tasks, TaskList
+)
+
+
+def test_add_appends_to_journal_without_rewriting_snapshot(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    save_tasks([{"id": 1, "title": "Existing", "completed": False}], path)
+    snapshot = open(path).read()
+
+    tasks = load_tasks(path)
+    add_task_with_category(tasks, "New task", "Work")
+
+    assert open(path).read() == snapshot
+    assert len(journal.read_records(path)) == 1
+    assert [t["title"] for t in load_tasks(path)] == ["Existing", "New task"]
+
+
+def test_bulk_complete_is_replayed_from_journal(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    save_tasks([{"id": 1, "title": "A", "completed": False},
+                {"id": 2, "title": "B", "completed": False}], path)
+    bulk_complete_tasks(load_tasks(path), [2])
+    loaded = load_tasks(path)
+    assert [t["completed"] for t in loaded] == [False, True]
+
+
+def test_explicit_file_path_receives_the_changes(tmp_path):
+    source = str(tmp_path / "source.json")
+    target = str(tmp_path / "target.json")
+    save_tasks([{"id": 1, "title": "A", "completed": False}], source)
+
+    tasks = add_task_with_category(load_tasks(source), "B", "Work", file_path=target)
+    bulk_complete_tasks(tasks, [1], file_path=target)
+
+    assert [t["title"] for t in load_tasks(source)] == ["A"]
+    assert [(t["title"], t["completed"]) for t in load_tasks(target)] == [
+        ("A", True), ("B", False)
+    ]
+    add_task_with_category([], "C", "Home", file_path=target)
+    assert [t["title"] for t in load_tasks(target)] == ["C"]
+
+
+def test_save_tasks_discards_journal(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    add_task_with_category(TaskList([], path), "Task", "Work")
+    save_tasks([], path)
+    assert not os.path.exists(journal.journal_path(path))
+    assert load_tasks(path) == []
+
+
+def test_torn_journal_tail_is_ignored(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    add_task_with_category(TaskList([], path), "Task", "Work")
+    with open(journal.journal_path(path), "a") as f:
+        f.write('{"op": "add", "task": {"id"')
+    assert [t["title"] for t in load_tasks(path)] == ["Task"]
+
+
+def test_compaction_folds_journal_into_snapshot(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    tasks = TaskList([], path)
+    for i in range(5):
+        add_task_with_category(tasks, f"Task {i}", "Work")
+    thread = journal.maybe_compact(path, threshold=1)
+    thread.join()
+
+    assert not os.path.exists(journal.journal_path(path))
+    with open(path) as f:
+        assert len(json.load(f)) == 5
+    assert load_tasks(path) == tasks
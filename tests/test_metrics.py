@@ -0,0 +1,76 @@
+import json
+import urllib.request
+import pytest
+from src.metrics import MetricsRegistry, capture_profile, metrics, serve
+from src.tasks import add_task_with_category, filter_tasks_by_priority, load_tasks, save_tasks
+
+
+@pytest.fixture
+def recording():
+    metrics.reset()
+    metrics.enabled = True
+    yield metrics
+    metrics.enabled = False
+    metrics.reset()
+
+
+def test_nothing_is_recorded_while_disabled():
+    registry = MetricsRegistry()
+
+    @registry.timed(size="arg")
+    def work(tasks):
+        return tasks
+
+    assert work([1, 2]) == [1, 2]
+    with registry.timer("block"):
+        pass
+    registry.add_bytes("read", 10)
+    assert registry.snapshot() == {
+        "enabled": False, "latency_ms": {}, "sizes": {}, "counters": {}
+    }
+
+
+def test_task_functions_record_latency_sizes_and_bytes(tmp_path, recording):
+    path = str(tmp_path / "tasks.json")
+    save_tasks([{"id": i, "title": f"T{i}", "priority": "High"} for i in range(1, 51)], path)
+    tasks = load_tasks(path)
+    filter_tasks_by_priority(tasks, "High")
+    add_task_with_category(tasks, "New", "Work")
+
+    snapshot = recording.snapshot()
+    assert snapshot["latency_ms"]["load_tasks"]["count"] == 1
+    assert snapshot["latency_ms"]["filter_tasks_by_priority"]["count"] == 1
+    assert snapshot["sizes"]["load_tasks"]["sum"] == 50
+    assert snapshot["sizes"]["add_task_with_category"]["sum"] == 50
+    assert snapshot["counters"]["bytes_written"] > snapshot["counters"]["bytes_read"] > 0
+
+
+def test_prometheus_export(recording):
+    recording.observe_latency("load_tasks", 3.0)
+    recording.observe_latency("load_tasks", 70.0)
+    recording.count("bytes_read", 128)
+    text = recording.prometheus()
+    assert 'todo_call_latency_ms_bucket{name="load_tasks",le="5"} 1' in text
+    assert 'todo_call_latency_ms_bucket{name="load_tasks",le="+Inf"} 2' in text
+    assert 'todo_call_latency_ms_count{name="load_tasks"} 2' in text
+    assert "todo_bytes_read_total 128" in text
+    assert recording.snapshot()["latency_ms"]["load_tasks"]["p50"] == 5
+
+
+def test_metrics_endpoint(recording):
+    recording.observe_latency("search_tasks", 1.0)
+    port = serve(port=0)
+    base = f"http://127.0.0.1:{port}"
+    with urllib.request.urlopen(f"{base}/metrics") as response:
+        assert "todo_call_latency_ms_count" in response.read().decode()
+    with urllib.request.urlopen(f"{base}/metrics.json") as response:
+        assert json.load(response)["latency_ms"]["search_tasks"]["count"] == 1
+
+
+def test_capture_profile():
+    with capture_profile() as profile:
+        sorted(range(1000), key=lambda x: -x)
+    assert "function calls" in profile.text
+    with capture_profile(enabled=False) as profile:
+        pass
+    assert profile.text is None
@@ -0,0 +1,65 @@
+import json
+import threading
+import pytest
+from src.model import Interner, Task, TaskTable, PRIORITIES, MISSING, date_to_ordinal
+from src.tasks import filter_tasks_by_priority
+
+TASKS = [
+    {"id": 1, "title": "Full", "description": "All fields", "priority": "High",
+     "category": "Work", "due_date": "2025-04-10", "completed": True,
+     "created_at": "2025-04-10 17:54:06"},
+    {"id": 2, "title": "Minimal", "completed": False},
+    {"id": 3, "title": "Odd values", "priority": 1, "due_date": None,
+     "completed": "yes", "created_at": "yesterday", "tags": ["a", "b"]},
+    {"id": 4, "title": "Bad date", "due_date": "2025-4-1", "category": ["unhashable"]},
+]
+
+
+@pytest.mark.parametrize("task", TASKS)
+def test_task_round_trips_losslessly(task):
+    compact = Task.from_dict(task)
+    assert compact.to_dict() == task
+    assert json.dumps(compact.to_dict(), sort_keys=True) == json.dumps(task, sort_keys=True)
+
+
+def test_task_uses_compact_values():
+    compact = Task.from_dict(TASKS[0])
+    assert compact.priority == PRIORITIES.lookup("High")
+    assert compact.due == date_to_ordinal("2025-04-10")
+    assert isinstance(compact.created, int)
+    assert compact.extra is None
+    assert not hasattr(compact, "__dict__")
+    assert Task.from_dict(TASKS[1]).due == MISSING
+
+
+def test_table_round_trips_and_works_with_filters():
+    table = TaskTable.from_dicts(TASKS)
+    assert len(table) == 4
+    assert table.to_dicts() == TASKS
+    assert table.row(2) == TASKS[2]
+    assert filter_tasks_by_priority(table, "High") == [TASKS[0]]
+    assert list(table.column("id")) == [1, 2, 3, 4]
+
+
+def test_date_to_ordinal_rejects_non_canonical_strings():
+    assert date_to_ordinal("2025-04-10") is not None
+    for value in ("2025-4-10", "2025-02-30", None, 20250410, "2025-04-10 00:00:00"):
+        assert date_to_ordinal(value) is None
+
+
+def test_interner_gives_distinct_codes_across_threads():
+    interner = Interner()
+    barrier = threading.Barrier(8)
+
+    def intern(t):
+        barrier.wait()
+        for i in range(500):
+            interner.code(f"value{(i * (t + 1)) % 300}")
+
+    threads = [threading.Thread(target=intern, args=(t,)) for t in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(interner.values) == len(set(interner.values))
+    assert all(interner.value(interner.code(v)) == v for v in interner.values)
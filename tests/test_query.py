@@ -0,0 +1,152 @@
+import random
+import pytest
+from src import query as engine
+from src.model import TaskTable
+from src.query import Query, compile_predicates, plan
+from src.store import TaskStore
+from src.tasks import (
+    add_task_with_category, bulk_complete_tasks, filter_tasks_by_category,
+    filter_tasks_by_completion, filter_tasks_by_priority, get_overdue_tasks, query,
+    search_tasks
+)
+
+
+def make_tasks(n=500, seed=3):
+    rng = random.Random(seed)
+    tasks = []
+    for i in range(1, n + 1):
+        task = {
+            "id": i,
+            "title": rng.choice(["Write report", "Call Bob", "Buy milk", "Review PR"]),
+            "description": rng.choice(["", "urgent", "for the team"]),
+            "priority": rng.choice(["High", "Medium", "Low"]),
+            "category": rng.choice(["Work", "Home", "School"]),
+            "completed": rng.random() < 0.3,
+        }
+        if rng.random() < 0.9:
+            task["due_date"] = f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        tasks.append(task)
+    return tasks
+
+
+@pytest.fixture(params=["list", "store", "table"])
+def tasks(request):
+    tasks = make_tasks()
+    if request.param == "store":
+        return TaskStore(tasks)
+    if request.param == "table":
+        return TaskTable.from_dicts(tasks)
+    return tasks
+
+
+def ids(tasks):
+    return [task["id"] for task in tasks]
+
+
+def test_matches_the_chained_filters(tasks):
+    chained = filter_tasks_by_priority(list(tasks), "High")
+    chained = filter_tasks_by_category(chained, "Work")
+    chained = filter_tasks_by_completion(chained, False)
+    chained = search_tasks(chained, "REPORT", mode="substring")
+    result = query(tasks, priority="High", category="Work", completed=False, text="REPORT")
+    assert sorted(ids(result)) == sorted(ids(chained)) != []
+
+
+def test_overdue_and_due_ranges(tasks):
+    overdue = query(tasks, overdue=True, category="Home")
+    expected = [t for t in get_overdue_tasks(list(tasks)) if t["category"] == "Home"]
+    assert sorted(ids(overdue)) == sorted(ids(expected))
+
+    spring = query(tasks, due_after="2026-03-01", due_before="2026-06-01", completed=False)
+    assert sorted(ids(spring)) == sorted(
+        t["id"] for t in tasks
+        if not t["completed"] and "2026-03-01" <= t.get("due_date", "") < "2026-06-01"
+    )
+
+
+@pytest.mark.parametrize("field", ["due_date", "priority", "title", "id"])
+@pytest.mark.parametrize("descending", [False, True])
+def test_top_k_equals_a_full_sort(tasks, field, descending):
+    full = query(tasks, completed=False, sort=field, descending=descending)
+    top = query(tasks, completed=False, sort=field, descending=descending, limit=10)
+    assert ids(top) == ids(full)[:10]
+    # Tasks without the sort field come last in either direction
+    if field == "due_date":
+        assert all("due_date" not in t for t in full[-5:])
+        assert "due_date" in full[0]
+    if field == "priority" and not descending:
+        assert full[0]["priority"] == "High"
+
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_tasks_without_a_priority_sort_last(descending):
+    tasks = [{"id": 1, "title": "a"}, {"id": 2, "priority": "Low", "title": "b"},
+             {"id": 3, "priority": "High", "title": "c"}]
+    expected = [2, 3, 1] if descending else [3, 2, 1]
+    assert ids(query(tasks, sort="priority", descending=descending)) == expected
+    assert ids(query(tasks, sort="priority", descending=descending, limit=2)) == expected[:2]
+
+
+def test_limit_without_sort_keeps_collection_order():
+    tasks = make_tasks()
+    assert ids(query(tasks, priority="Low", limit=5)) == ids(
+        [t for t in tasks if t["priority"] == "Low"][:5]
+    )
+
+
+def test_plan_puts_the_most_selective_predicate_first():
+    tasks = [{"id": i, "priority": "High", "category": "Rare" if i % 50 == 0 else "Common"}
+             for i in range(1, 1001)]
+    predicates, _ = plan(tasks, Query(priority="High", category="Rare"))
+    assert [name for name, _ in predicates] == ["category", "priority"]
+    # Cheaper predicates go first when they eliminate as much
+    predicates, _ = plan(tasks, Query(text="zzz", category="Nope"))
+    assert predicates[0][0] == "category"
+
+
+def test_store_starts_from_a_small_index_bucket():
+    store = TaskStore([{"id": i, "category": "Rare" if i % 100 == 0 else "Common"}
+                       for i in range(1, 1001)])
+    _, candidates = plan(store, Query(category="Rare"))
+    assert ids(candidates) == list(range(100, 1001, 100))
+    _, candidates = plan(store, Query(category="Common"))
+    assert candidates is None
+
+
+def test_unsorted_results_do_not_depend_on_the_plan():
+    store = TaskStore([{"id": i, "category": "Rare" if i % 100 == 0 else "Common"}
+                       for i in range(1000, 0, -1)])
+    store.apply([{"op": "add", "task": {"id": 500, "category": "Rare"}}])
+    scanned = [t for t in store if t["category"] == "Rare"]
+    _, candidates = plan(store, Query(category="Rare"))
+    assert ids(candidates) == ids(scanned)
+    assert ids(scanned)[-1] == 500
+    assert ids(query(store, category="Rare", limit=3)) == ids(scanned)[:3]
+
+
+def test_compiled_values_are_not_code():
+    test = compile_predicates([("category", '") or True or ("'), ("text", "x")])
+    assert not test({"id": 1, "category": "Work", "title": "x"})
+
+
+def test_results_are_memoized_per_version(tmp_path, monkeypatch):
+    store = TaskStore(make_tasks(), str(tmp_path / "tasks.json"))
+    calls = []
+    execute = engine.execute
+    monkeypatch.setattr(engine, "execute", lambda *args: calls.append(1) or execute(*args))
+
+    first = query(store, category="Work", completed=False, sort="due_date", limit=20)
+    again = query(store, category="Work", completed=False, sort="due_date", limit=20)
+    assert again == first and again is not first
+    assert len(calls) == 1
+
+    bulk_complete_tasks(store, [first[0]["id"]])
+    after = query(store, category="Work", completed=False, sort="due_date", limit=20)
+    assert len(calls) == 2 and first[0]["id"] not in ids(after)
+    add_task_with_category(store, "Fresh", "Work", due_date="2000-01-01")
+    assert query(store, category="Work", completed=False, sort="due_date", limit=1)[0]["title"] == "Fresh"
+
+
+def test_rejects_unknown_sort_fields():
+    with pytest.raises(ValueError):
+        query([], sort="colour")
@@ -0,0 +1,117 @@
+import pytest
+from datetime import date, datetime, timedelta
+from itertools import islice
+from src.model import TaskTable
+from src.recurrence import occurrences, parse_rule
+from src.store import TaskStore
+from src.tasks import (
+    add_task_with_category, bulk_complete_tasks, get_due_soon_tasks, get_occurrences,
+    get_overdue_tasks, load_tasks, new_task_dict
+)
+
+
+def _day(offset):
+    return (datetime.now() + timedelta(days=offset)).strftime("%Y-%m-%d")
+
+
+def _dates(rule, start, n):
+    return [d.isoformat() for d in islice(parse_rule(rule).dates(start, start), n)]
+
+
+@pytest.mark.parametrize("rule,expected", [
+    ("daily", ["2026-01-30", "2026-01-31", "2026-02-01"]),
+    ("every 2 weeks", ["2026-01-30", "2026-02-13", "2026-02-27"]),
+    # Monthly keeps the start's day, clamped to shorter months without drifting
+    ("monthly", ["2026-01-31", "2026-02-28", "2026-03-31"]),
+    ("weekdays", ["2026-01-30", "2026-02-02", "2026-02-03"]),
+    ("cron 1,15 * *", ["2026-02-01", "2026-02-15", "2026-03-01"]),
+    ("cron * 2 0", ["2026-02-01", "2026-02-08", "2026-02-15"]),
+])
+def test_rules_expand_lazily(rule, expected):
+    start = date(2026, 1, 31) if rule == "monthly" else date(2026, 1, 30)
+    assert _dates(rule, start, 3) == expected
+
+
+@pytest.mark.parametrize("rule", ["hourly", "every 0 days", "cron 32 * *", "cron * *"])
+def test_invalid_rules_are_rejected(rule):
+    with pytest.raises(ValueError):
+        parse_rule(rule)
+
+
+def test_new_recurring_task_starts_on_its_rule():
+    task = new_task_dict(1, "Standup", "Work", recurrence="cron * * 1", due_date="2026-01-28")
+    assert task["due_date"] == task["recurrence_start"] == "2026-02-02"  # a Monday
+    with pytest.raises(ValueError):
+        new_task_dict(2, "Bad", "Work", recurrence="fortnightly")
+
+
+def test_occurrences_stay_within_the_window():
+    task = {"id": 1, "due_date": "2026-03-10", "recurrence": "weekly",
+            "recurrence_start": "2026-03-03"}
+    assert list(occurrences(task, "2026-03-01", "2026-03-31")) == [
+        "2026-03-10", "2026-03-17", "2026-03-24", "2026-03-31"
+    ]
+    assert next(occurrences(task, "2030-01-01")) == "2030-01-01"
+    assert list(occurrences({"id": 2, "due_date": "2026-03-05"}, "2026-03-01", "2026-03-31")) == [
+        "2026-03-05"
+    ]
+
+
+@pytest.fixture
+def tasks():
+    return [
+        {"id": 1, "title": "Gym", "due_date": _day(-2), "recurrence": "every 2 days",
+         "recurrence_start": _day(-4), "completed": False},
+        {"id": 2, "title": "Report", "due_date": _day(1), "completed": False},
+        {"id": 3, "title": "Done", "due_date": _day(0), "recurrence": "daily", "completed": True},
+    ]
+
+
+@pytest.mark.parametrize("container", [list, TaskStore, TaskTable.from_dicts])
+def test_get_occurrences_merges_tasks_by_date(tasks, container):
+    window = get_occurrences(container(tasks), datetime.now(), _day(4))
+    assert [(day, task["id"]) for day, task in window] == [
+        (_day(0), 1), (_day(1), 2), (_day(2), 1), (_day(4), 1)
+    ]
+    assert len(get_occurrences(container(tasks), datetime.now(), _day(4), limit=2)) == 2
+
+
+@pytest.mark.parametrize("container", [list, TaskStore])
+def test_completing_advances_the_rule(tasks, container, tmp_path):
+    collection = container(tasks)
+    assert [t["id"] for t in get_overdue_tasks(collection)] == [1]
+    bulk_complete_tasks(collection, [1, 2], file_path=str(tmp_path / "tasks.json"))
+    gym, report = (next(t for t in collection if t["id"] == i) for i in (1, 2))
+    assert gym["due_date"] == _day(0) and gym["last_completed"] == _day(-2)
+    assert gym["completed"] is False and report["completed"] is True
+    assert get_overdue_tasks(collection) == []
+
+
+def test_bulk_complete_persists_the_advanced_rule(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    tasks = add_task_with_category(
+        load_tasks(path), "Water plants", "Home", recurrence="every 3 days", due_date=_day(-1)
+    )
+    bulk_complete_tasks(tasks, [1])
+    reloaded = load_tasks(path)
+    assert reloaded[0]["due_date"] == _day(2)
+    assert reloaded[0]["last_completed"] == _day(-1)
+    assert reloaded[0]["completed"] is False
+    assert [t["id"] for t in get_due_soon_tasks(TaskStore(reloaded), hours_threshold=72)] == [1]
+
+
+@pytest.mark.parametrize("container", [list, TaskStore, TaskTable.from_dicts])
+def test_malformed_due_dates_have_no_occurrences(tasks, container):
+    tasks.append({"id": 4, "title": "Typo", "due_date": "2026/10/01", "recurrence": "daily",
+                  "completed": False})
+    tasks.append({"id": 5, "title": "Odd", "due_date": "bad", "completed": False})
+    window = get_occurrences(container(tasks), datetime.now(), _day(4))
+    assert {task["id"] for _, task in window} == {1, 2}
+    assert list(occurrences(tasks[3], "2026-01-01", "2026-12-31")) == []
+
+
+def test_malformed_recurring_task_completes_without_advancing(tmp_path):
+    tasks = [{"id": 1, "title": "Typo", "due_date": "bad", "recurrence": "daily",
+              "completed": False}]
+    bulk_complete_tasks(tasks, [1], file_path=str(tmp_path / "tasks.json"))
+    assert tasks[0]["completed"] is True and tasks[0]["due_date"] == "bad"
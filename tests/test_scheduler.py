@@ -0,0 +1,102 @@
+import time
+import pytest
+from datetime import datetime, timedelta
+from src import journal
+from src.scheduler import QueueSink, ReminderScheduler
+from src.tasks import (
+    add_task_with_category, bulk_complete_tasks, load_tasks, save_tasks
+)
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+NOW = datetime(2026, 5, 1, 12, 0)
+
+
+@pytest.fixture
+def clock():
+    return Clock(NOW)
+
+
+@pytest.fixture
+def tasks():
+    return [
+        {"id": 1, "title": "Tomorrow", "due_date": "2026-05-02", "completed": False},
+        {"id": 2, "title": "Next week", "due_date": "2026-05-08", "completed": False},
+        {"id": 3, "title": "Done", "due_date": "2026-05-02", "completed": True},
+        {"id": 4, "title": "Past", "due_date": "2026-04-01", "completed": False},
+        {"id": 5, "title": "Undated", "completed": False},
+    ]
+
+
+def test_rebuild_schedules_only_upcoming_pending_tasks(tasks, clock):
+    scheduler = ReminderScheduler(clock=clock)
+    scheduler.rebuild(tasks)
+    assert len(scheduler) == 2
+    # Task 1 entered its 24h window at midnight on May 1st
+    assert scheduler.next_deadline() == datetime(2026, 5, 1)
+    assert [r["id"] for r in scheduler.tick()] == [1]
+    assert scheduler.tick() == []
+    clock.now = datetime(2026, 5, 7, 0, 0)
+    assert [r["id"] for r in scheduler.tick()] == [2]
+
+
+def test_changes_update_the_heap_incrementally(tasks, clock):
+    sink = QueueSink()
+    scheduler = ReminderScheduler([sink], clock=clock)
+    scheduler.rebuild(tasks)
+    scheduler.apply([
+        journal.update_record(1, {"due_date": "2026-05-20"}, {"due_date": "2026-05-02"}),
+        journal.update_record(2, {"completed": True}, {"completed": False}),
+        journal.add_record({"id": 6, "title": "New", "due_date": "2026-05-02"}),
+        journal.update_record(6, {"title": "Renamed"}, {"title": "New"}),
+    ])
+    scheduler.tick()
+    assert [(r["id"], r["title"]) for r in sink.drain()] == [(6, "Renamed")]
+    # Unrelated changes do not remind the same due date again
+    scheduler.apply([journal.update_record(6, {"title": "Again"}, {"title": "Renamed"})])
+    assert scheduler.tick() == []
+    scheduler.apply([journal.delete_record({"id": 1})])
+    clock.now = datetime(2026, 5, 19, 12, 0)
+    assert scheduler.tick() == [] and len(scheduler) == 0
+
+
+def test_follow_tracks_changes_and_survives_restart(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    tomorrow = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+    save_tasks([{"id": 1, "title": "Stored", "due_date": tomorrow, "completed": False}], path)
+    scheduler = ReminderScheduler()
+    scheduler.follow(path)
+    try:
+        add_task_with_category(load_tasks(path), "Added", "Work", due_date=tomorrow)
+        assert len(scheduler) == 2
+        bulk_complete_tasks(load_tasks(path), [1])
+        assert [r["title"] for r in scheduler.tick()] == ["Added"]
+    finally:
+        scheduler.unfollow()
+    # A new process rebuilds the same schedule from storage
+    restarted = ReminderScheduler()
+    restarted.load(path)
+    assert [r["title"] for r in restarted.tick()] == ["Added"]
+
+
+def test_background_thread_delivers_reminders(tasks):
+    sink = QueueSink()
+    scheduler = ReminderScheduler([sink], lead_hours=24 * 365 * 100)
+    scheduler.start()
+    try:
+        scheduler.apply([journal.add_record(
+            {"id": 1, "title": "Soon", "due_date": "2099-01-01", "completed": False}
+        )])
+        deadline = time.monotonic() + 5
+        while not sink.queue.qsize() and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        scheduler.stop()
+    assert [r["title"] for r in sink.drain()] == ["Soon"]
@@ -0,0 +1,68 @@
+import pytest
+from src.search import SearchIndex, tokenize
+from src.storage import TaskList
+from src.store import TaskStore
+from src.tasks import _list_index, search_tasks
+
+
+@pytest.fixture
+def tasks():
+    return [
+        {"id": 1, "title": "Buy milk", "description": "Grocery shopping"},
+        {"id": 2, "title": "Milk the cows", "description": "Farm chores, milk milk"},
+        {"id": 3, "title": "Write report", "description": "Quarterly numbers"},
+    ]
+
+
+def test_tokenize():
+    assert tokenize("Buy MILK, eggs!") == ["buy", "milk", "eggs"]
+    assert tokenize(None) == []
+
+
+def test_index_ranks_by_relevance(tasks):
+    index = SearchIndex(tasks)
+    assert index.search("milk") == [2, 1]
+
+
+def test_prefix_and_multi_term_queries(tasks):
+    index = SearchIndex(tasks)
+    assert index.search("gro") == [1]
+    assert index.search("gro", prefix=False) == []
+    assert index.search("milk shop") == [1]
+    assert index.search("milk report") == []
+
+
+def test_store_index_follows_mutations(tasks):
+    store = TaskStore(tasks)
+    store.update(3, title="Buy bread")
+    assert [t["id"] for t in search_tasks(store, "buy")] == [1, 3]
+    store.delete(1)
+    assert [t["id"] for t in search_tasks(store, "buy")] == [3]
+    assert "grocery" not in store._text._vocab
+
+
+def test_substring_mode_is_still_available(tasks):
+    store = TaskStore(tasks)
+    assert search_tasks(store, "ilk", mode="substring") == tasks[:2]
+    assert search_tasks(store, "ilk") == []
+    with pytest.raises(ValueError):
+        search_tasks(tasks, "milk", mode="fuzzy")
+
+
+def test_bulk_built_index_answers_prefix_queries():
+    index = SearchIndex([{"id": i, "title": f"task{i:04d} zebra"} for i in range(1, 300)])
+    assert index.search("task012") == list(range(120, 130))
+    index.add({"id": 999, "title": "task0125b"})
+    assert 999 in index.search("task0125")
+
+
+def test_index_search_of_a_task_list_is_cached(tasks):
+    tasks = TaskList(tasks, "unused.json")
+    first = search_tasks(tasks, "milk", mode="index")
+    assert search_tasks(tasks, "shop", mode="index") and _list_index(tasks) is _list_index(tasks)
+    built = _list_index(tasks)
+    tasks.append({"id": 99, "title": "More milk"})
+    assert len(search_tasks(tasks, "milk", mode="index")) == len(first) + 1
+    assert _list_index(tasks) is not built
+    with pytest.raises(ValueError):
+        search_tasks(list(tasks), "milk", mode="index")
@@ -0,0 +1,134 @@
+import asyncio
+import threading
+import pytest
+from benchmarks.loadgen import run_load
+from src.client import ServiceError, TaskServiceClient
+from src.service import TaskService
+from src.tasks import load_tasks, save_tasks
+
+
+@pytest.fixture
+def service(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    save_tasks([
+        {"id": 1, "title": "Write report", "priority": "High", "category": "Work",
+         "completed": False, "due_date": "2000-01-01"},
+        {"id": 2, "title": "Buy milk", "priority": "Low", "category": "Groceries",
+         "completed": False, "due_date": "2999-01-01"},
+    ], path)
+    service = TaskService(path)
+    port = service.run_in_thread()
+    yield service, f"http://127.0.0.1:{port}"
+    service.stop()
+
+
+def test_reads(service):
+    _, url = service
+    client = TaskServiceClient(url)
+    assert client.health() == {"status": "ok", "tasks": 2}
+    assert [t["id"] for t in client.list_tasks(priority="High")] == [1]
+    assert [t["id"] for t in client.list_tasks(completed=False, limit=1)] == [1]
+    assert [t["id"] for t in client.search("milk")] == [2]
+    assert [t["id"] for t in client.overdue()] == [1]
+    assert client.get_task(2)["title"] == "Buy milk"
+
+
+def test_writes_are_persisted(service):
+    svc, url = service
+    client = TaskServiceClient(url)
+    task = client.add_task("Call mom", "Personal", priority="Medium")
+    assert task["id"] == 3
+    assert client.complete_tasks([1, 99]) == [1]
+    assert client.update_task(2, title="Buy oat milk")["title"] == "Buy oat milk"
+    client.delete_task(3)
+
+    stored = load_tasks(svc.file_path)
+    assert [(t["id"], t["title"], t["completed"]) for t in stored] == [
+        (1, "Write report", True), (2, "Buy oat milk", False)
+    ]
+
+
+def test_errors(service):
+    _, url = service
+    client = TaskServiceClient(url)
+    with pytest.raises(ServiceError) as error:
+        client.get_task(42)
+    assert error.value.status == 404
+    with pytest.raises(ServiceError) as error:
+        client.add_task("", "Work")
+    assert error.value.status == 400
+    with pytest.raises(ServiceError) as error:
+        client.request("GET", "/nope")
+    assert error.value.status == 404
+    # The id and unknown fields can be neither set nor patched
+    for changes in ({"id": 1}, {"id": "x"}, {"colour": "red"}):
+        with pytest.raises(ServiceError) as error:
+            client.update_task(2, **changes)
+        assert error.value.status == 400
+        with pytest.raises(ServiceError) as error:
+            client.add_task("Sneaky", "Work", **changes)
+        assert error.value.status == 400
+    assert client.get_task(2)["title"] == "Buy milk" and client.get_task(1)["id"] == 1
+    assert len(client.list_tasks()) == 2
+
+
+def test_failed_append_leaves_the_store_unchanged(service, monkeypatch):
+    svc, url = service
+    client = TaskServiceClient(url)
+
+    def fail(records):
+        raise OSError("disk full")
+    monkeypatch.setattr(svc.storage, "append", fail)
+    before = client.list_tasks()
+    for call in (lambda: client.add_task("Lost", "Work"),
+                 lambda: client.update_task(1, title="Lost", description="New field"),
+                 lambda: client.complete_tasks([1, 2]),
+                 lambda: client.delete_task(2)):
+        with pytest.raises(ServiceError):
+            call()
+    # Fields the tasks did not have are gone again, not None
+    assert client.list_tasks() == before
+    assert [t["id"] for t in client.overdue()] == [1]
+    assert [t["id"] for t in client.search("report")] == [1]
+
+
+def test_concurrent_writers_get_unique_ids(service):
+    svc, url = service
+    ids = []
+
+    def worker():
+        client = TaskServiceClient(url)
+        for i in range(10):
+            ids.append(client.add_task(f"Task {i}", "Work")["id"])
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(ids) == list(range(3, 83))
+    assert len(load_tasks(svc.file_path)) == 82
+
+
+def test_load_generator(service):
+    svc, url = service
+    result = asyncio.run(run_load(url, clients=20, requests=5))
+    assert result["requests"] == 100
+    assert result["errors"] == 0
+    assert result["p50_ms"] <= result["p99_ms"]
+    assert len(load_tasks(svc.file_path)) == len(svc.store)
+
+
+def test_reminders_follow_service_writes(tmp_path):
+    from src.scheduler import QueueSink, ReminderScheduler
+    path = str(tmp_path / "tasks.json")
+    save_tasks([], path)
+    sink = QueueSink()
+    service = TaskService(path, ReminderScheduler([sink], lead_hours=24 * 365 * 2000))
+    client = TaskServiceClient(f"http://127.0.0.1:{service.run_in_thread()}")
+    try:
+        client.add_task("Renew passport", "Personal", due_date="2999-01-01")
+        service.scheduler.tick()
+    finally:
+        service.stop()
+    assert [r["title"] for r in sink.drain()] == ["Renew passport"]
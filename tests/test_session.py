@@ -0,0 +1,95 @@
+import json
+import pytest
+from src.journal import read_records
+from src.session import task_session, import_tasks, export_tasks
+from src.tasks import add_change_listener, load_tasks, remove_change_listener, save_tasks
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    save_tasks([{"id": 1, "title": "Existing", "completed": False}], path)
+    return path
+
+
+def test_session_persists_all_changes_in_one_write(path):
+    with task_session(path) as s:
+        s.add("A", "Work", priority="High")
+        s.add("B", "Home")
+        s.complete(1)
+        s.update(2, title="A renamed")
+        s.delete(3)
+
+    tasks = load_tasks(path)
+    assert [(t["id"], t["title"], t["completed"]) for t in tasks] == [
+        (1, "Existing", True), (2, "A renamed", False)
+    ]
+    assert tasks.next_id == 4
+
+
+def test_small_sessions_append_to_journal(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    save_tasks([{"id": i, "title": f"T{i}", "completed": False} for i in range(1, 11)], path)
+    with task_session(path) as s:
+        s.complete(*[t["id"] for t in s.find("T3")])
+        s.add("T11", "Work")
+    assert [r["op"] for r in read_records(path)] == ["update", "add"]
+    assert load_tasks(path)[2]["completed"] is True
+
+
+def test_commits_reach_change_listeners(path):
+    seen = []
+    listener = lambda file_path, records: seen.append(records and [r["op"] for r in records])
+    add_change_listener(listener)
+    try:
+        with task_session(path) as s:
+            s.complete(1)
+        with task_session(path) as s:
+            s.add("A", "Work")
+        with task_session(path) as s:
+            s.delete(1)
+            s.delete(2)
+    finally:
+        remove_change_listener(listener)
+    # More changes than tasks rewrite the file, which listeners see as None
+    assert seen == [["update"], ["add"], None]
+
+
+def test_session_rolls_back_on_exception(path):
+    with pytest.raises(RuntimeError):
+        with task_session(path) as s:
+            s.add("Lost", "Work")
+            s.complete(1)
+            raise RuntimeError("boom")
+    assert load_tasks(path) == [{"id": 1, "title": "Existing", "completed": False}]
+    assert read_records(path) == []
+
+
+def test_csv_import_and_export_round_trip(path, tmp_path):
+    source = tmp_path / "in.csv"
+    source.write_text(
+        "id,title,priority,category,due_date,completed\n"
+        "99,Imported one,High,Work,2030-01-01,false\n"
+        "100,Imported two,,Home,,true\n"
+    )
+    assert import_tasks(str(source), path) == 2
+    tasks = load_tasks(path)
+    assert [t["id"] for t in tasks] == [1, 2, 3]
+    assert tasks[1]["priority"] == "High" and tasks[1]["completed"] is False
+    assert tasks[2]["completed"] is True and "priority" not in tasks[2]
+
+    out = tmp_path / "out.csv"
+    assert export_tasks(str(out), path) == 3
+    assert out.read_text().splitlines()[0] == (
+        "id,title,description,priority,category,due_date,completed,created_at"
+    )
+
+
+def test_json_export_and_import(path, tmp_path):
+    out = str(tmp_path / "out.json")
+    assert export_tasks(out, path) == 1
+    assert json.load(open(out)) == load_tasks(path)
+
+    other = str(tmp_path / "other.json")
+    assert import_tasks(out, other) == 1
+    assert load_tasks(other)[0]["title"] == "Existing"
@@ -0,0 +1,86 @@
+import os
+import pytest
+from src import journal
+from src.shards import ShardManager, global_summary, shard_paths, tenant_path
+from src.tasks import (
+    add_task_with_category, bulk_complete_tasks, get_overdue_tasks, load_tasks,
+    save_tasks
+)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = ShardManager(str(tmp_path), capacity=2)
+    yield manager
+    manager.close()
+
+
+def test_tenant_paths(tmp_path):
+    root = str(tmp_path)
+    path = tenant_path("alice", root)
+    assert os.path.basename(path) == "alice.json"
+    assert os.path.dirname(os.path.dirname(path)) == root
+    assert tenant_path("alice", root) == path != tenant_path("bob", root)
+    # Keys that are not safe file names are hashed
+    assert ".." not in tenant_path("../etc/passwd", root)
+    assert tenant_path("team list", root, ".tbin").endswith(".tbin")
+    with pytest.raises(ValueError):
+        tenant_path("", root)
+
+
+def test_tenants_are_isolated(manager):
+    add_task_with_category(manager.store("alice"), "Alice's", "Work")
+    add_task_with_category(manager.store("bob"), "Bob's", "Home")
+    assert [t["title"] for t in load_tasks(manager.path("alice"))] == ["Alice's"]
+    assert [t["title"] for t in load_tasks(manager.path("bob"))] == ["Bob's"]
+    assert sorted(shard_paths(manager.root)) == sorted(
+        [manager.path("alice"), manager.path("bob")]
+    )
+
+
+def test_least_recently_used_shard_is_evicted(manager):
+    alice = manager.store("alice")
+    manager.store("bob")
+    assert manager.store("alice") is alice
+    manager.store("carol")
+    assert "bob" not in manager and len(manager) == 2
+    assert manager.stats()["evictions"] == 1
+    # An evicted shard reloads from its file
+    add_task_with_category(alice, "Kept", "Work")
+    manager.evict("alice")
+    assert [t["title"] for t in manager.store("alice")] == ["Kept"]
+
+
+def test_own_changes_keep_the_shard_and_others_reload_it(manager):
+    store = manager.store("alice")
+    add_task_with_category(store, "A", "Work")
+    bulk_complete_tasks(store, [1])
+    assert manager.store("alice") is store
+
+    # Written through another handle on the same file
+    add_task_with_category(load_tasks(manager.path("alice")), "B", "Work")
+    reloaded = manager.store("alice")
+    assert reloaded is not store and len(reloaded) == 2
+
+
+def test_global_summary_fans_out(tmp_path):
+    root = str(tmp_path)
+    for i in range(6):
+        save_tasks([
+            {"id": 1, "title": "Late", "due_date": "2000-01-01", "completed": False},
+            {"id": 2, "title": "Done", "due_date": "2000-01-01", "completed": True},
+        ][:1 + i % 2], tenant_path(f"user{i}", root))
+    paths = shard_paths(root)
+    summary = global_summary(paths, today="2026-01-01", workers=1)
+    assert (summary["tenants"], summary["total"], summary["overdue"]) == (6, 9, 6)
+
+    # Several chunks go through a process pool and add up the same
+    pooled = global_summary(paths * 100, today="2026-01-01", workers=2)
+    assert (pooled["total"], pooled["overdue"]) == (900, 600)
+
+
+def test_overdue_of_one_tenant(manager):
+    store = manager.store("alice")
+    add_task_with_category(store, "Late", "Work", due_date="2000-01-01")
+    assert [t["title"] for t in get_overdue_tasks(store)] == ["Late"]
+    assert not os.path.exists(journal.journal_path(manager.path("bob")))
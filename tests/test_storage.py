@@ -0,0 +1,73 @@
+import pytest
+from src.storage import (
+    JsonStorage, SqliteStorage, get_storage, migrate_json_to_sqlite, BACKEND_ENV
+)
+from src.tasks import (
+    load_tasks, save_tasks, add_task_with_category, bulk_complete_tasks,
+    count_tasks, find_tasks, TaskList
+)
+
+
+@pytest.fixture
+def sample_tasks():
+    return [
+        {"id": 1, "title": "Old", "priority": "High", "category": "Work",
+         "due_date": "2000-01-01", "completed": False, "notes": ["extra"]},
+        {"id": 2, "title": "Done", "priority": "Low", "category": "Home",
+         "due_date": "2000-01-01", "completed": True},
+        {"id": 3, "title": "Later", "priority": "High", "category": "Home",
+         "due_date": "2099-01-01", "completed": False},
+    ]
+
+
+def test_backend_is_detected_from_extension(tmp_path):
+    assert isinstance(get_storage(str(tmp_path / "tasks.json")), JsonStorage)
+    assert isinstance(get_storage(str(tmp_path / "tasks.db")), SqliteStorage)
+    with pytest.raises(ValueError):
+        get_storage(str(tmp_path / "tasks.json"), backend="csv")
+
+
+def test_sqlite_round_trip_and_journal_records(tmp_path, sample_tasks):
+    path = str(tmp_path / "tasks.db")
+    save_tasks(sample_tasks, path)
+    assert load_tasks(path) == sample_tasks
+
+    tasks = load_tasks(path)
+    add_task_with_category(tasks, "New", "Work", priority="Low")
+    bulk_complete_tasks(tasks, [3])
+    reloaded = load_tasks(path)
+    assert reloaded == tasks
+    assert reloaded.next_id == 5
+    assert count_tasks(path) == 4
+
+
+@pytest.mark.parametrize("name", ["tasks.json", "tasks.db"])
+def test_filters_are_consistent_across_backends(tmp_path, sample_tasks, name):
+    path = str(tmp_path / name)
+    save_tasks(sample_tasks, path)
+    assert [t["id"] for t in find_tasks(path, priority="High")] == [1, 3]
+    assert [t["id"] for t in find_tasks(path, category="Home", completed=False)] == [3]
+    assert [t["id"] for t in find_tasks(path, due_before="2050-01-01")] == [1, 2]
+    assert [t["id"] for t in get_storage(path).overdue("2050-01-01")] == [1]
+
+
+def test_env_var_selects_sqlite_and_migrates_json(tmp_path, monkeypatch, sample_tasks):
+    json_path = str(tmp_path / "tasks.json")
+    save_tasks(sample_tasks, json_path)
+    monkeypatch.setenv(BACKEND_ENV, "sqlite")
+
+    assert load_tasks(json_path) == sample_tasks
+    assert (tmp_path / "tasks.db").exists()
+    add_task_with_category(load_tasks(json_path), "New", "Work")
+    assert count_tasks(json_path) == 4
+
+
+def test_migrate_json_to_sqlite(tmp_path, sample_tasks):
+    json_path = str(tmp_path / "tasks.json")
+    db_path = str(tmp_path / "other.db")
+    tasks = TaskList(sample_tasks, json_path)
+    save_tasks(tasks, json_path)
+    add_task_with_category(tasks, "Journaled", "Work")
+
+    assert migrate_json_to_sqlite(json_path, db_path) == 4
+    assert load_tasks(db_path) == load_tasks(json_path)
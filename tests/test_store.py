@@ -0,0 +1,95 @@
+import pytest
+from datetime import datetime, timedelta
+from src.store import TaskStore
+from src.tasks import (
+    filter_tasks_by_priority, filter_tasks_by_category, filter_tasks_by_completion,
+    get_overdue_tasks, get_due_soon_tasks
+)
+
+
+def _day(offset):
+    return (datetime.now() + timedelta(days=offset)).strftime("%Y-%m-%d")
+
+
+@pytest.fixture
+def tasks():
+    return [
+        {"id": 1, "title": "Old", "priority": "High", "category": "Work",
+         "due_date": "2000-01-01", "completed": False},
+        {"id": 2, "title": "Done", "priority": "Low", "category": "Home",
+         "due_date": "2000-01-01", "completed": True},
+        {"id": 3, "title": "Tomorrow", "priority": "High", "category": "Home",
+         "due_date": _day(1), "completed": False},
+        {"id": 4, "title": "Later", "priority": "Medium", "category": "Work",
+         "due_date": "2099-01-01", "completed": False},
+        {"id": 5, "title": "Broken", "priority": "Low", "category": "Work",
+         "due_date": "not-a-date", "completed": False},
+    ]
+
+
+@pytest.mark.parametrize("func,arg", [
+    (filter_tasks_by_priority, "High"),
+    (filter_tasks_by_category, "Work"),
+    (filter_tasks_by_completion, False),
+])
+def test_store_filters_match_list_filters(tasks, func, arg):
+    assert func(TaskStore(tasks), arg) == func(tasks, arg)
+
+
+def test_store_date_queries_match_list_queries(tasks):
+    store = TaskStore(tasks)
+    assert get_overdue_tasks(store) == get_overdue_tasks(tasks)
+    assert get_due_soon_tasks(store, 48) == get_due_soon_tasks(tasks, 48)
+
+
+def test_indexes_follow_mutations(tasks):
+    store = TaskStore(tasks)
+    store.complete(1)
+    assert store.overdue() == []
+    assert [t["id"] for t in store.filter_by("completed", True)] == [2, 1]
+
+    store.update(4, priority="High", due_date="2000-06-01")
+    assert [t["id"] for t in store.filter_by("priority", "High")] == [1, 3, 4]
+    assert [t["id"] for t in store.overdue()] == [4]
+
+    store.delete(4)
+    assert store.get(4) is None
+    assert store.overdue() == []
+    assert "Medium" not in store._index["priority"]
+
+
+def test_mutations_return_journal_records(tasks):
+    store = TaskStore(tasks)
+    records = store.complete(3)
+    assert records == [{"op": "update", "id": 3, "set": {"completed": True},
+                        "old": {"completed": False},
+                        "was": {"category": "Home", "priority": "High",
+                                "completed": False, "due_date": _day(1)}}]
+    assert store.delete(99) == []
+    with pytest.raises(ValueError):
+        store.add({"id": 1, "title": "Duplicate"})
+
+
+def test_bulk_build_matches_adding_one_by_one():
+    tasks = [{"id": i, "title": f"T{i}", "due_date": f"2026-01-{(i * 7) % 28 + 1:02d}",
+              "completed": i % 5 == 0} for i in range(1, 200)]
+    built = TaskStore(tasks)
+    added = TaskStore()
+    for task in tasks:
+        added.add(dict(task))
+    assert built._due == added._due
+    assert [t["id"] for t in built.due_range("2026-01-05", "2026-01-20")] == \
+        [t["id"] for t in added.due_range("2026-01-05", "2026-01-20")]
+
+
+def test_rejected_tasks_leave_the_store_unchanged(tasks):
+    store = TaskStore(tasks)
+    before = (store.to_list(), store.next_id, store.version, dict(store._positions))
+    for task in ({"id": "x", "title": "Bad id"}, {"id": 9, "category": ["Work"]}):
+        with pytest.raises(ValueError):
+            store.add(task)
+    with pytest.raises(ValueError):
+        store.update(1, priority={"level": 1})
+    assert (store.to_list(), store.next_id, store.version, dict(store._positions)) == before
+    assert store.get(1)["priority"] == tasks[0]["priority"]
+    assert [t["id"] for t in store.filter_by("priority", tasks[0]["priority"])][0] == 1
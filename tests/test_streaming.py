@@ -0,0 +1,87 @@
+import io
+import json
+import tracemalloc
+import pytest
+from src.streaming import iter_json_array
+from src.tasks import (
+    iter_tasks, load_tasks, save_tasks, count_tasks, get_overdue_tasks,
+    filter_tasks_by_priority, add_task_with_category, bulk_complete_tasks, get_task_by_title
+)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 4096])
+def test_iter_json_array_handles_any_chunk_boundary(chunk_size):
+    data = [{"id": 1, "title": "a [b], {c}"}, 12345, "x", [], {"nested": {"n": [1, 2]}},
+            True, None, False, "caf\u00e9 \\ \"q\""]
+    text = json.dumps(data, indent=2)
+    assert list(iter_json_array(io.StringIO(text), chunk_size)) == data
+    assert list(iter_json_array(io.StringIO(" [ ] "), chunk_size)) == []
+
+
+@pytest.mark.parametrize("chunk_size", range(1, 80))
+def test_numbers_split_by_a_chunk_boundary(chunk_size):
+    data = [{"id": 1, "w": 12.5, "e": -1.5e-07, "n": [-3, 2E+10, 0.25]}] * 5 + [-12.5e3]
+    text = json.dumps(data, indent=2)
+    assert list(iter_json_array(io.StringIO(text), chunk_size)) == data
+
+
+def test_iter_json_array_rejects_malformed_input():
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(io.StringIO('[{"id": 1},'), 4))
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(io.StringIO('{"id": 1}')))
+
+
+def test_malformed_element_fails_without_reading_the_rest():
+    class CountingReader(io.StringIO):
+        reads = 0
+
+        def read(self, size=-1):
+            self.reads += 1
+            return super().read(size)
+
+    rest = ",".join(json.dumps({"id": i, "title": "filler"}) for i in range(10_000))
+    f = CountingReader('[{"id": 1}, {"id": 2 "title": "x"}, ' + rest + "]")
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(f, 64))
+    assert f.reads < 5
+
+
+def test_iter_tasks_applies_journal(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    save_tasks([{"id": i, "title": f"T{i}", "completed": False} for i in (1, 2, 3)], path)
+    tasks = load_tasks(path)
+    bulk_complete_tasks(tasks, [2])
+    add_task_with_category(tasks, "T4", "Work")
+    assert list(iter_tasks(path)) == load_tasks(path)
+    assert get_task_by_title("T2", path)["completed"] is True
+    assert count_tasks(path) == 4
+
+
+def test_filters_accept_iterables_and_stop_early(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    save_tasks([{"id": i, "title": f"T{i}", "priority": "High", "due_date": "2000-01-01",
+                 "completed": False} for i in range(1, 101)], path)
+    consumed = []
+
+    def watched():
+        for task in iter_tasks(path):
+            consumed.append(task["id"])
+            yield task
+
+    assert [t["id"] for t in get_overdue_tasks(watched(), limit=5)] == [1, 2, 3, 4, 5]
+    assert len(consumed) == 5
+    assert len(filter_tasks_by_priority(iter_tasks(path), "High", limit=10)) == 10
+
+
+def test_count_tasks_memory_is_bounded(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    save_tasks([{"id": i, "title": "x" * 100} for i in range(20000)], path)
+    tracemalloc.start()
+    assert count_tasks(path) == 20000
+    _, streamed_peak = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    load_tasks(path)
+    _, loaded_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert streamed_peak * 10 < loaded_peak
@@ -18,21 +18,22 @@ def test_task_due_soon_notification():
     assert "Urgent task" in due_soon[0]["title"]
 
 # Feature 2: Task categories management
-def test_add_new_category():
+def test_add_new_category(tmp_path):
     """Test adding tasks with new categories"""
     tasks = []
     from src.tasks import add_task_with_category
-    tasks = add_task_with_category(tasks, "New task", "CustomCategory")
+    tasks = add_task_with_category(tasks, "New task", "CustomCategory",
+                                   file_path=str(tmp_path / "tasks.json"))
     assert tasks[0]["category"] == "CustomCategory"
 
 # Feature 3: Bulk task operations
-def test_bulk_complete_tasks():
+def test_bulk_complete_tasks(tmp_path):
     """Test completing multiple tasks at once"""
     tasks = [
         {"id": 1, "title": "Task 1", "completed": False},
         {"id": 2, "title": "Task 2", "completed": False}
     ]
     from src.tasks import bulk_complete_tasks
-    updated_tasks = bulk_complete_tasks(tasks, [1, 2])
+    updated_tasks = bulk_complete_tasks(tasks, [1, 2], file_path=str(tmp_path / "tasks.json"))
     assert updated_tasks[0]["completed"] is True
     assert updated_tasks[1]["completed"] is True
\ No newline at end of file
@@ -0,0 +1,119 @@
+import os
+import sys
+import pytest
+from src.testrunner import (
+    PROJECT_ROOT, TestRunner, inputs_hash, pytest_command, run_behave_parallel,
+    scenario_locations
+)
+
+
+@pytest.fixture
+def project(tmp_path):
+    for directory in ("src", "tests", "features"):
+        (tmp_path / directory).mkdir()
+    (tmp_path / "src" / "a.py").write_text("x = 1\n")
+    return tmp_path
+
+
+def test_inputs_hash_tracks_source_changes(project):
+    before = inputs_hash(str(project))
+    assert inputs_hash(str(project)) == before
+    (project / "src" / "__pycache__").mkdir()
+    (project / "src" / "__pycache__" / "a.pyc").write_bytes(b"junk")
+    assert inputs_hash(str(project)) == before
+    # Saving tasks next to the sources does not invalidate cached results
+    for name in ("tasks.json", "tasks.json.journal", "tasks.json.stats", "tasks.tbin",
+                 "tasks.db", "tasks.db-wal", "tasks.db-shm"):
+        (project / "src" / name).write_text("[]")
+    assert inputs_hash(str(project)) == before
+    (project / "features" / "add.feature").write_text("Feature: Add\n")
+    assert inputs_hash(str(project)) != before
+    before = inputs_hash(str(project))
+    (project / "tests" / "test_a.py").write_text("def test(): pass\n")
+    assert inputs_hash(str(project)) != before
+
+
+def test_runner_streams_output_and_caches(project):
+    runner = TestRunner(str(project), cache_dir="cache")
+    command = [sys.executable, "-c", "print('one'); print('two')"]
+    run = runner.submit("demo", command)
+    assert run.wait(30)
+    assert run.status == "passed"
+    assert run.output() == "one\ntwo\n"
+
+    again = runner.submit("demo", command)
+    assert again.done and again.status == "cached"
+    assert again.output() == "one\ntwo\n"
+    assert runner.latest("demo") is again
+
+    (project / "src" / "a.py").write_text("x = 2\n")
+    rerun = runner.submit("demo", command)
+    assert rerun.wait(30)
+    assert rerun.status == "passed"
+
+
+def test_cached_result_needs_its_outputs(project):
+    runner = TestRunner(str(project), cache_dir="cache")
+    command = [sys.executable, "-c", "open('out.txt', 'w').write('x')"]
+    assert runner.submit("out", command, outputs=("out.txt",)).wait(30)
+    assert runner.submit("out", command, outputs=("out.txt",)).status == "cached"
+    os.remove(project / "out.txt")
+    run = runner.submit("out", command, outputs=("out.txt",))
+    assert run.wait(30) and run.status == "passed"
+
+
+def test_failures_are_reported(project):
+    runner = TestRunner(str(project), cache_dir="cache")
+    run = runner.submit("fail", [sys.executable, "-c", "raise SystemExit(3)"])
+    assert run.wait(30)
+    assert run.status == "failed" and run.returncode == 3
+
+
+def test_pytest_command_runs_in_parallel():
+    command = pytest_command(["tests/test_basic.py"])
+    assert command[1:3] == ["-m", "pytest"]
+    assert "-n" in command and "--cov=src" not in command
+    assert "--cov=src" in pytest_command(coverage=True, parallel=False)
+
+
+def test_behave_parallel_without_features(tmp_path, capsys):
+    assert run_behave_parallel([str(tmp_path)], stream=sys.stdout) == 1
+    assert "No feature files" in capsys.readouterr().out
+
+
+def test_scenario_locations(tmp_path):
+    feature = tmp_path / "a.feature"
+    feature.write_text(
+        "Feature: A\n\n  Scenario: one\n    Given x\n\n"
+        "  Scenario Outline: two\n    Given <y>\n"
+    )
+    assert scenario_locations([str(tmp_path)]) == [f"{feature}:3", f"{feature}:6"]
+
+
+def test_feature_suite_runs_across_workers(tmp_path, monkeypatch):
+    monkeypatch.chdir(PROJECT_ROOT)
+    tasks_file = os.path.join(PROJECT_ROOT, "tasks.json")
+    before = open(tasks_file).read()
+    out = tmp_path / "out.txt"
+    with open(out, "w") as stream:
+        assert run_behave_parallel(["features"], workers=2, stream=stream) == 0
+    text = out.read_text()
+    assert "=== worker 2/2 ===" in text
+    assert text.endswith("2 workers: 5 scenarios passed, 0 failed\n")
+    # Scenarios work on their own temp files, never the shared tasks.json
+    assert open(tasks_file).read() == before
+
+
+def test_run_finishes_when_its_result_cannot_be_stored(project, monkeypatch):
+    (project / "cache").write_text("not a directory")
+    runner = TestRunner(str(project), cache_dir="cache")
+    run = runner.submit("demo", [sys.executable, "-c", "print('ok')"])
+    assert run.wait(30)
+    assert run.status == "passed" and "Could not cache" in run.output()
+
+    def broken(*args):
+        raise RuntimeError("boom")
+    monkeypatch.setattr(runner, "_store", broken)
+    run = runner.submit("broken", [sys.executable, "-c", "print('ok')"])
+    assert run.wait(30)
+    assert run.status == "failed" and "boom" in run.output()
@@ -0,0 +1,83 @@
+import pytest
+from src.model import TaskTable
+from src.tasks import save_tasks, add_task_with_category, load_tasks
+from src.views import (
+    cached_sort_order, cached_task_frame, page_rows, select_rows, sort_order, task_frame
+)
+
+TASKS = [
+    {"id": 1, "title": "Write report", "description": "Quarterly", "priority": "Low",
+     "category": "Work", "due_date": "2026-03-01", "completed": False,
+     "created_at": "2026-01-01 09:30:00"},
+    {"id": 2, "title": "Buy milk", "priority": "High", "category": "Groceries",
+     "completed": True},
+    {"id": 3, "title": "Call mom", "description": "About the report", "priority": "Medium",
+     "category": "Personal", "due_date": "2026-02-01", "completed": False},
+]
+
+
+@pytest.fixture
+def frame():
+    return task_frame(TaskTable.from_dicts(TASKS))
+
+
+def test_frame_columns(frame):
+    assert frame["id"].tolist() == [1, 2, 3]
+    assert frame["priority"].tolist() == ["Low", "High", "Medium"]
+    assert str(frame["due_date"][0].date()) == "2026-03-01"
+    assert frame["due_date"].isna().tolist() == [False, True, False]
+    assert str(frame["created_at"][0]) == "2026-01-01 09:30:00"
+    assert frame["completed"].tolist() == [False, True, False]
+
+
+@pytest.mark.parametrize("sort_by, descending, expected", [
+    ("due_date", False, [3, 1, 2]),
+    ("due_date", True, [1, 3, 2]),
+    ("priority", False, [2, 3, 1]),
+    ("priority", True, [1, 3, 2]),
+    ("category", False, [2, 3, 1]),
+    ("title", False, [2, 3, 1]),
+])
+def test_sort_order(frame, sort_by, descending, expected):
+    order = sort_order(frame, sort_by, descending)
+    assert frame["id"].to_numpy()[order].tolist() == expected
+
+
+def test_select_and_page(frame):
+    order = sort_order(frame, "due_date")
+    rows = select_rows(frame, order, completed=False)
+    assert frame["id"].to_numpy()[rows].tolist() == [3, 1]
+    rows = select_rows(frame, order, search="REPORT")
+    assert frame["id"].to_numpy()[rows].tolist() == [3, 1]
+    rows = select_rows(frame, order, priority="High", category="Groceries")
+    assert frame["id"].to_numpy()[rows].tolist() == [2]
+    page = page_rows(frame, order, 1, 2)
+    assert page["id"].tolist() == [2]
+
+
+def test_cached_frame_is_rebuilt_per_version(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    save_tasks(TASKS, path)
+    frame = cached_task_frame(path)
+    assert cached_task_frame(path) is frame
+    order = cached_sort_order(path, "priority")
+    assert cached_sort_order(path, "priority") is order
+
+    add_task_with_category(load_tasks(path), "New", "Work", due_date="2026-01-15")
+    rebuilt = cached_task_frame(path)
+    assert rebuilt is not frame and len(rebuilt) == 4
+    assert rebuilt["id"].to_numpy()[cached_sort_order(path, "due_date")][0] == 4
+
+
+def test_cached_order_matches_the_frame_it_is_for(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    save_tasks(TASKS, path)
+    frame = cached_task_frame(path)
+    # Same number of tasks, different order
+    tasks = load_tasks(path)
+    tasks[0]["due_date"] = "2026-01-01"
+    save_tasks(tasks, path)
+    newer = cached_task_frame(path)
+    assert frame["id"].to_numpy()[cached_sort_order(path, "due_date", frame=frame)].tolist() == [3, 1, 2]
+    assert newer["id"].to_numpy()[cached_sort_order(path, "due_date", frame=newer)].tolist() == [1, 3, 2]
+    assert cached_sort_order(path, "due_date", frame=newer) is cached_sort_order(path, "due_date")